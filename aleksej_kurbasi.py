@@ -4,9 +4,21 @@
 
 import tkinter as tk
 from tkinter import messagebox
+import tkinter.font as tkfont
 import csv
+import io
+import os
+import queue
+import threading
+import time
 # XML bonus:
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+import zlib
+from functools import partial
+
+from tablica_ucenika import TablicaUcenika, RedakUcenika
+from pretraga_ucenika import IndeksUcenika, PogledRezultata
 
 #  RAM se briše kada se program zatvori, dok datoteke omogućuju da podaci sačuvani trajno.
 
@@ -29,8 +41,425 @@ class Ucenik:
         return f"{self.ime} {self.prezime} ({self.razred})"
 
 
+class UcenikRedak(RedakUcenika):
+    """Ucenik spremljen u TablicaUcenika (isti prikaz kao Ucenik)."""
+    __slots__ = ()
+    __str__ = Ucenik.__str__
+
+
+# --- VIRTUALNI PRIKAZ ---
+class VirtualniPopis(tk.Frame):
+    """Listbox koji formatira i drži samo retke vidljive na ekranu.
+
+    `izvor` je bilo koji niz s len() i [] (npr. self.ucenici), a indeksi koje
+    vraća curselection() su indeksi u izvoru, ne u vidljivom prozoru.
+    """
+
+    def __init__(self, master, izvor, formatiraj=str, **opcije):
+        bg = master.cget("bg")
+        super().__init__(master, bg=bg)
+        self.izvor = izvor
+        self.formatiraj = formatiraj
+        self.pocetak = 0        # indeks prvog vidljivog retka u izvoru
+        self.odabrani = None    # indeks odabranog retka u izvoru
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.lb = tk.Listbox(self, exportselection=False, **opcije)
+        self.lb.grid(row=0, column=0, sticky="NSEW")
+        self.sc = tk.Scrollbar(self, orient="vertical", command=self._pomakni)
+        self.sc.grid(row=0, column=1, sticky="NS")
+
+        font = tkfont.Font(font=self.lb.cget("font"))
+        self.visina_retka = font.metrics("linespace") + 2 * int(self.lb.cget("selectborderwidth"))
+
+        self.lb.bind("<Configure>", lambda _e: self.osvjezi())
+        self.lb.bind("<<ListboxSelect>>", self._odaberi)
+        self.lb.bind("<MouseWheel>", lambda e: self._pomakni("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.lb.bind("<Button-4>", lambda _e: self._pomakni("scroll", -1, "units"))
+        self.lb.bind("<Button-5>", lambda _e: self._pomakni("scroll", 1, "units"))
+        self.lb.bind("<Up>", lambda _e: self._pomakni_odabir(-1))
+        self.lb.bind("<Down>", lambda _e: self._pomakni_odabir(1))
+
+    def broj_vidljivih(self):
+        return max(1, self.lb.winfo_height() // self.visina_retka)
+
+    def osvjezi(self):
+        """Ponovno iscrtava samo vidljive retke – O(broj vidljivih), ne O(n)."""
+        n = len(self.izvor)
+        vidljivih = self.broj_vidljivih()
+        self.pocetak = max(0, min(self.pocetak, n - vidljivih))
+        kraj = min(n, self.pocetak + vidljivih)
+
+        self.lb.delete(0, tk.END)
+        if kraj > self.pocetak:
+            self.lb.insert(tk.END, *(self.formatiraj(self.izvor[i]) for i in range(self.pocetak, kraj)))
+        if self.odabrani is not None and self.pocetak <= self.odabrani < kraj:
+            self.lb.selection_set(self.odabrani - self.pocetak)
+
+        if n:
+            self.sc.set(self.pocetak / n, kraj / n)
+        else:
+            self.sc.set(0, 1)
+
+    def _pomakni(self, akcija, kolicina, jedinica=None):
+        n = len(self.izvor)
+        vidljivih = self.broj_vidljivih()
+        if akcija == "moveto":
+            self.pocetak = int(float(kolicina) * n)
+        elif jedinica == "pages":
+            self.pocetak += int(kolicina) * vidljivih
+        else:
+            self.pocetak += int(kolicina)
+        self.osvjezi()
+        return "break"
+
+    def _pomakni_odabir(self, korak):
+        if not len(self.izvor):
+            return "break"
+        novi = 0 if self.odabrani is None else self.odabrani + korak
+        self.selection_set(max(0, min(novi, len(self.izvor) - 1)))
+        self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    def _odaberi(self, _e):
+        sel = self.lb.curselection()
+        if not sel:
+            return  # brisanje retka pri skrolanju ne smije poništiti odabir
+        self.odabrani = self.pocetak + sel[0]
+        self.event_generate("<<ListboxSelect>>")
+
+    def postavi_izvor(self, izvor):
+        """Zamjena prikazanog niza (npr. rezultati pretrage umjesto svih učenika)."""
+        self.izvor = izvor
+        self.pocetak = 0
+        self.odabrani = None
+        self.osvjezi()
+
+    # --- sučelje kao kod tk.Listbox ---
+    def curselection(self):
+        return () if self.odabrani is None else (self.odabrani,)
+
+    def selection_set(self, index):
+        self.odabrani = index
+        self.see(index)
+
+    def selection_clear(self):
+        self.odabrani = None
+        self.osvjezi()
+
+    def see(self, index):
+        vidljivih = self.broj_vidljivih()
+        if index < self.pocetak:
+            self.pocetak = index
+        elif index >= self.pocetak + vidljivih:
+            self.pocetak = index - vidljivih + 1
+        self.osvjezi()
+
+
+# --- POZADINSKO UČITAVANJE ---
+# Čitači rade u radnoj dretvi i šalju poruke (vrsta, podaci, udio) u red:
+# ("serija", [Ucenik...], 0.0–1.0), ("kraj", None, 1.0) ili ("greska", iznimka, 0.0).
+
+def _salji_u_serijama(ucenici, red, prekid, udio, velicina_serije=5000, prva_serija=200):
+    """Skuplja učenike u serije i šalje ih u red; vraća False ako je prekinuto.
+
+    Prva serija je mala kako bi se prvi retci pojavili odmah, neovisno o
+    veličini datoteke.
+    """
+    serija = []
+    granica = prva_serija
+    for u in ucenici:
+        serija.append(u)
+        if len(serija) >= granica:
+            if prekid.is_set():
+                return False
+            red.put(("serija", serija, udio()))
+            serija = []
+            granica = velicina_serije
+    red.put(("serija", serija, 1.0))
+    return True
+
+
+def citaj_csv_u_serijama(putanja, red, prekid, dnevnik=None):
+    """Parsira CSV pomoću DictReader i šalje serije Ucenik objekata u red.
+
+    Ako je zadan dnevnik, nakon snimke šalje i ("dnevnik", operacije, 1.0)
+    koje treba primijeniti na učitane učenike.
+    """
+    try:
+        ukupno = os.path.getsize(putanja) or 1
+        with open(putanja, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            ucenici = (Ucenik(row["ime"], row["prezime"], row["razred"]) for row in reader)
+            if not _salji_u_serijama(ucenici, red, prekid, lambda: f.buffer.tell() / ukupno):
+                return
+        if dnevnik is not None:
+            red.put(("dnevnik", dnevnik.procitaj(), 1.0))
+        red.put(("kraj", None, 1.0))
+    except Exception as e:
+        red.put(("greska", e, 0.0))
+
+
+def iterparse_ucenike(izvor):
+    """Generator koji inkrementalno parsira <evidencija> i vraća Ucenik objekte.
+
+    Svaki <ucenik> se briše čim postane Ucenik, pa memorija ne raste s
+    veličinom datoteke (za razliku od ET.parse koje gradi cijelo stablo).
+    """
+    dubina = 0
+    korijen = None
+    for dogadjaj, e in ET.iterparse(izvor, events=("start", "end")):
+        if dogadjaj == "start":
+            dubina += 1
+            if korijen is None:
+                korijen = e
+            continue
+        dubina -= 1
+        if e.tag == "ucenik" and dubina == 1:     # kao root.findall("ucenik")
+            ime = e.findtext("ime", default="")
+            prezime = e.findtext("prezime", default="")
+            razred = e.findtext("razred", default="")
+            if ime and prezime and razred:
+                yield Ucenik(ime, prezime, razred)
+            korijen.clear()
+
+
+def citaj_xml_u_serijama(putanja, red, prekid):
+    """Streaming XML uvoz: iterparse_ucenike + slanje serija u red."""
+    try:
+        ukupno = os.path.getsize(putanja) or 1
+        with open(putanja, "rb") as f:
+            if not _salji_u_serijama(iterparse_ucenike(f), red, prekid, lambda: f.tell() / ukupno):
+                return
+        red.put(("kraj", None, 1.0))
+    except Exception as e:
+        red.put(("greska", e, 0.0))
+
+
+# --- STREAMING XML ZAPIS ---
+def _xml_polje(tag, tekst):
+    # isto kao ElementTree: prazan tekst daje kratki oblik <tag />
+    if not tekst:
+        return f"<{tag} />"
+    return f"<{tag}>{escape(tekst)}</{tag}>"
+
+
+def zapisi_xml(ucenici, putanja, velicina_serije=10000):
+    """Zapisuje <evidencija> inkrementalno, bez gradnje ET stabla.
+
+    Izlaz je bajt-identičan ElementTree.write(..., encoding="utf-8",
+    xml_declaration=True), a u memoriji je istovremeno samo jedna serija
+    redaka.
+    """
+    with open(putanja, "w", encoding="utf-8", errors="xmlcharrefreplace", buffering=1 << 20) as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        if not ucenici:
+            f.write("<evidencija />")
+            return
+        f.write("<evidencija>")
+        serija = []
+        for u in ucenici:
+            serija.append("<ucenik>" + _xml_polje("ime", u.ime) + _xml_polje("prezime", u.prezime)
+                          + _xml_polje("razred", u.razred) + "</ucenik>")
+            if len(serija) >= velicina_serije:
+                f.write("".join(serija))
+                serija.clear()
+        f.write("".join(serija))
+        f.write("</evidencija>")
+
+
+# --- DNEVNIK PROMJENA (CSV) ---
+def _crc32_datoteke(putanja):
+    crc = 0
+    with open(putanja, "rb") as f:
+        for blok in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(blok, crc)
+    return crc
+
+
+def _fsync_mape(putanja):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(putanja)), os.O_RDONLY)
+    except OSError:
+        return  # npr. Windows – mape se ne mogu otvoriti
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class DnevnikCSV:
+    """ucenici.csv kao sažeta snimka + append-only dnevnik promjena.
+
+    - ucenici.csv      snimka, isti format kao prije (DictWriter)
+    - ucenici.csv.log  "#dnevnik,<crc32 snimke>", zatim dodani učenici
+                       d,ime,prezime,razred i redak "k" na kraju svakog spremanja
+
+    Spremanje samo dopisuje promjene (O(broj promjena)); serija bez "k"
+    (pad usred pisanja) se odbacuje. Dnevnik vrijedi samo za snimku čiji
+    crc ima u zaglavlju. Sažimanje piše novu snimku i novi dnevnik
+    (.log.novi) sa strane pa ih zamjenjuje s os.replace, tako da pad u bilo
+    kojem trenutku ostavlja staru ili novu ispravnu kombinaciju.
+    """
+
+    ZAGLAVLJE = "#dnevnik"
+
+    def __init__(self, putanja="ucenici.csv", prag=5000):
+        self.putanja = putanja
+        self.log = putanja + ".log"
+        self.prag = prag                # sažimanje kad dnevnik naraste do ovoliko operacija
+        self.na_cekanju = []            # operacije koje još nisu zapisane
+        self.broj_operacija = 0         # operacija u dnevniku od zadnjeg sažimanja
+        self.uskladeno = False          # vrijedi li: memorija == snimka + dnevnik + na_cekanju
+        self._brava = threading.Lock()
+        self._sazimanje = None
+
+    # --- bilježenje promjena ---
+    def dodan(self, u):
+        self.na_cekanju.append(["d", u.ime, u.prezime, u.razred])
+
+    def oznaci_neuskladeno(self):
+        """Memorija više ne odgovara datotekama – sljedeće spremanje je puno."""
+        self.uskladeno = False
+        self.na_cekanju.clear()
+
+    # --- čitanje ---
+    def procitaj(self):
+        """Vraća operacije važećeg dnevnika za trenutnu snimku.
+
+        Dovršava prekinuto sažimanje i odsijeca nedovršenu seriju s kraja.
+        """
+        self.pricekaj()
+        crc = _crc32_datoteke(self.putanja)
+        novi = self.log + ".novi"
+        for kandidat in (self.log, novi):
+            operacije = self._procitaj_log(kandidat, crc)
+            if operacije is None:
+                continue
+            if kandidat == novi:
+                os.replace(novi, self.log)
+            elif os.path.exists(novi):
+                os.remove(novi)
+            return operacije
+        self._zapisi_log(self.log, crc, b"")
+        return []
+
+    def _procitaj_log(self, putanja, crc):
+        try:
+            with open(putanja, "rb") as f:
+                podaci = f.read()
+        except FileNotFoundError:
+            return None
+        zaglavlje = f"{self.ZAGLAVLJE},{crc}\n".encode()
+        if not podaci.startswith(zaglavlje):
+            return None
+        kraj = podaci.rfind(b"\nk\n")
+        valjano = podaci[:kraj + 3] if kraj >= 0 else zaglavlje
+        if len(valjano) < len(podaci):
+            with open(putanja, "r+b") as f:
+                f.truncate(len(valjano))
+        operacije = []
+        for row in csv.reader(io.StringIO(valjano[len(zaglavlje):].decode("utf-8"))):
+            if row[0] != "k":
+                operacije.append(row)
+        return operacije
+
+    @staticmethod
+    def primijeni(operacije, ucenici):
+        for op in operacije:
+            if op[0] == "d":
+                ucenici.append(Ucenik(op[1], op[2], op[3]))
+
+    def postavi(self, broj_operacija):
+        """Poziva se nakon što su snimka i dnevnik učitani u memoriju.
+
+        Promjene na čekanju ostaju: to su učenici dodani dok je učitavanje
+        trajalo (starije briše oznaci_neuskladeno() na početku učitavanja).
+        """
+        self.broj_operacija = broj_operacija
+        self.uskladeno = True
+
+    # --- pisanje ---
+    def spremi(self):
+        """Dopisuje promjene na čekanju u dnevnik (uz fsync); vraća njihov broj."""
+        if not self.na_cekanju:
+            return 0
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerows(self.na_cekanju)
+        buf.write("k\n")
+        with self._brava:
+            with open(self.log, "a", newline="", encoding="utf-8") as f:
+                f.write(buf.getvalue())
+                f.flush()
+                os.fsync(f.fileno())
+            self.broj_operacija += len(self.na_cekanju)
+        n = len(self.na_cekanju)
+        self.na_cekanju.clear()
+        return n
+
+    def treba_sazeti(self):
+        return self.broj_operacija >= self.prag and self._sazimanje is None
+
+    def sazmi_u_pozadini(self, ucenici):
+        """Piše novu snimku u dretvi; promjene spremljene u međuvremenu se prenose."""
+        with self._brava:
+            pomak = os.path.getsize(self.log)
+            broj = self.broj_operacija
+        self._sazimanje = threading.Thread(target=self._sazmi, args=(ucenici.kopija(), pomak, broj), daemon=True)
+        self._sazimanje.start()
+
+    def sazmi(self, ucenici):
+        """Puno spremanje: nova snimka i prazan dnevnik."""
+        self.pricekaj()
+        self._sazmi(ucenici, None, self.broj_operacija)
+        self.na_cekanju.clear()
+        self.uskladeno = True
+
+    def pricekaj(self):
+        if self._sazimanje is not None:
+            self._sazimanje.join()
+
+    def _sazmi(self, snimka, pomak, broj):
+        try:
+            tmp = self.putanja + ".tmp"
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=["ime", "prezime", "razred"])
+                writer.writeheader()
+                for u in snimka:
+                    writer.writerow({"ime": u.ime, "prezime": u.prezime, "razred": u.razred})
+                f.flush()
+                os.fsync(f.fileno())
+            crc = _crc32_datoteke(tmp)
+            with self._brava:
+                rep = b""
+                if pomak is not None:
+                    with open(self.log, "rb") as f:
+                        f.seek(pomak)
+                        rep = f.read()
+                novi = self.log + ".novi"
+                self._zapisi_log(novi, crc, rep)
+                os.replace(tmp, self.putanja)
+                os.replace(novi, self.log)
+                _fsync_mape(self.putanja)
+                self.broj_operacija -= broj
+        finally:
+            if threading.current_thread() is self._sazimanje:
+                self._sazimanje = None
+
+    def _zapisi_log(self, putanja, crc, rep):
+        with open(putanja, "wb") as f:
+            f.write(f"{self.ZAGLAVLJE},{crc}\n".encode())
+            f.write(rep)
+            f.flush()
+            os.fsync(f.fileno())
+
+
 # --- APP ---
 class EvidencijaApp:
+    MAX_REZULTATA = 10000   # pretraga staje nakon ovoliko pogodaka
+
     def __init__(self, root):
         self.root = root
         self.root.title("📘 Evidencija učenika – provjera")
@@ -39,8 +468,14 @@ class EvidencijaApp:
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(1, weight=1)
 
-        self.ucenici = []
+        self.ucenici = TablicaUcenika(UcenikRedak)
         self.odabrani_index = None
+        self._prekid = None     # threading.Event aktivnog pozadinskog učitavanja
+        self.nepotpuno = False  # zadnje učitavanje je prekinuto ili nije uspjelo
+        self.dnevnik = DnevnikCSV("ucenici.csv")
+        self.indeks = IndeksUcenika(self.ucenici)   # None dok se gradi nakon učitavanja
+        self._indeks_posao = None
+        self.rezultati = None   # brojevi redaka prikazanih rezultata, None = svi učenici
 
         self.kreiraj_gui()
 
@@ -76,26 +511,43 @@ class EvidencijaApp:
         btn("💾 XML", "#9C27B0", self.spremi_u_xml).pack(side="left", padx=5)
         btn("📂 XML", "#7B1FA2", self.ucitaj_iz_xml).pack(side="left", padx=5)
 
+        # --- Pretraga ---
+        trazi = tk.Frame(unos, bg="#e6f0ff")
+        trazi.grid(row=4, column=0, columnspan=2, sticky="EW")
+        trazi.columnconfigure(1, weight=1)
+        self.v_upit = tk.StringVar()
+        self.v_filtar_razreda = tk.StringVar()
+        tk.Label(trazi, text="🔍 Traži:", bg="#e6f0ff", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="W")
+        tk.Entry(trazi, textvariable=self.v_upit, font=("Arial", 10)).grid(row=0, column=1, sticky="EW", padx=(0, 10))
+        tk.Label(trazi, text="Razred:", bg="#e6f0ff", font=("Arial", 10, "bold")).grid(row=0, column=2, sticky="W")
+        tk.Entry(trazi, textvariable=self.v_filtar_razreda, font=("Arial", 10), width=6).grid(row=0, column=3, sticky="W")
+        self.v_upit.trace_add("write", lambda *_: self.filtriraj())
+        self.v_filtar_razreda.trace_add("write", lambda *_: self.filtriraj())
+
         # --- Prikaz učenika ---
         prikaz = tk.Frame(self.root, padx=10, pady=10, bg="#f4f8ff")
         prikaz.grid(row=1, column=0, sticky="NSEW")
         prikaz.columnconfigure(0, weight=1)
         prikaz.rowconfigure(0, weight=1)
 
-        self.lb = tk.Listbox(prikaz, font=("Consolas", 11), bg="#ffffff", fg="#333",
-                             selectbackground="#cce5ff", selectforeground="#000")
+        # Virtualizirani prikaz: formatiraju se samo retci vidljivi na ekranu
+        self.lb = VirtualniPopis(prikaz, self.ucenici, font=("Consolas", 11), bg="#ffffff", fg="#333",
+                                 selectbackground="#cce5ff", selectforeground="#000")
         self.lb.grid(row=0, column=0, sticky="NSEW")
 
-        sc = tk.Scrollbar(prikaz, orient="vertical", command=self.lb.yview)
-        sc.grid(row=0, column=1, sticky="NS")
-        self.lb.configure(yscrollcommand=sc.set)
-
         self.lb.bind("<<ListboxSelect>>", self.odaberi)
 
+        # --- Stanje učitavanja ---
+        stanje = tk.Frame(prikaz, bg="#f4f8ff")
+        stanje.grid(row=1, column=0, sticky="EW", pady=(6, 0))
+        self.l_stanje = tk.Label(stanje, text="", bg="#f4f8ff", fg="#555", anchor="w")
+        self.l_stanje.pack(side="left", fill="x", expand=True)
+        self.b_odustani = tk.Button(stanje, text="✖ Odustani", state="disabled",
+                                    command=self.prekini_ucitavanje)
+        self.b_odustani.pack(side="right")
+
     def osvjezi(self):
-        self.lb.delete(0, tk.END)
-        for u in self.ucenici:
-            self.lb.insert(tk.END, str(u))
+        self.lb.osvjezi()
 
     def ocisti_unos(self):
         self.e_ime.delete(0, tk.END)
@@ -109,80 +561,204 @@ class EvidencijaApp:
         if not (ime and prezime and razred):
             messagebox.showwarning("Upozorenje", "Sva polja moraju biti popunjena.")
             return
-        self.ucenici.append(Ucenik(ime, prezime, razred))
-        self.osvjezi()
+        u = Ucenik(ime, prezime, razred)
+        try:
+            self.ucenici.append(u)
+        except ValueError as e:
+            messagebox.showwarning("Upozorenje", f"Učenik nije dodan: {e}")
+            return
+        self.dnevnik.dodan(u)
+        if self.indeks is not None:
+            self.indeks.dodaj(len(self.ucenici) - 1)
+        if self.rezultati is None:
+            self.lb.see(len(self.ucenici) - 1)
+        else:
+            self.filtriraj()
         self.ocisti_unos()
 
     def odaberi(self, _e):
         sel = self.lb.curselection()
-        self.odabrani_index = sel[0] if sel else None
+        if not sel:
+            self.odabrani_index = None
+        elif self.rezultati is None:
+            self.odabrani_index = sel[0]
+        else:
+            self.odabrani_index = self.rezultati[sel[0]]   # redak u rezultatima -> indeks u self.ucenici
+
+    # --- Pretraga ---
+    def filtriraj(self):
+        """Prikazuje učenike koji odgovaraju upitu i razredu (preko indeksa)."""
+        upit, razred = self.v_upit.get(), self.v_filtar_razreda.get()
+        if self.indeks is None:
+            if upit.strip() or razred.strip():
+                self.l_stanje.config(text="🔍 Indeks za pretragu se još gradi…")
+            return
+        bio_filtar = self.rezultati is not None
+        self.rezultati = self.indeks.trazi(upit, razred, najvise=self.MAX_REZULTATA)
+        if self.rezultati is None:
+            if bio_filtar:
+                self.odabrani_index = None
+                self.lb.postavi_izvor(self.ucenici)
+                self.l_stanje.config(text="")
+            return
+        self.odabrani_index = None
+        self.lb.postavi_izvor(PogledRezultata(self.ucenici, self.rezultati))
+        n = len(self.rezultati)
+        self.l_stanje.config(text=f"🔍 Prikazano prvih {n} rezultata" if n >= self.MAX_REZULTATA
+                             else f"🔍 {n} rezultata")
+
+    def _izgradi_indeks(self):
+        """Gradi indeks nad kopijom tablice u pozadini, pa ga preuzima Tk dretva."""
+        indeks = IndeksUcenika(self.ucenici.kopija())
+        red = queue.Queue()
+
+        def posao():
+            indeks.izgradi()
+            red.put(indeks)
+
+        self._indeks_posao = red
+        threading.Thread(target=posao, daemon=True).start()
+        self.root.after(50, self._preuzmi_indeks, red)
+
+    def _preuzmi_indeks(self, red):
+        if self._indeks_posao is not red:
+            return  # u međuvremenu je pokrenuto novo učitavanje
+        try:
+            indeks = red.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._preuzmi_indeks, red)
+            return
+        # kopija i self.ucenici imaju iste retke; dodani u međuvremenu idu pojedinačno
+        n = len(indeks.ucenici)
+        indeks.ucenici = self.ucenici
+        for i in range(n, len(self.ucenici)):
+            indeks.dodaj(i)
+        self.indeks = indeks
+        self._indeks_posao = None
+        self.filtriraj()
 
     # --- CSV ---
     def spremi_u_csv(self):
-        """Spremanje učenika u CSV pomoću DictWriter."""
+        """Spremanje učenika u CSV: dopisivanje u dnevnik ili puna snimka."""
+        if self._prekid is not None:
+            messagebox.showwarning("Upozorenje", "Pričekajte da učitavanje završi.")
+            return
+        if self._odbij_nepotpuno():
+            return
         try:
-            with open("ucenici.csv", "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["ime", "prezime", "razred"])
-                writer.writeheader()
-                for u in self.ucenici:
-                    writer.writerow({"ime": u.ime, "prezime": u.prezime, "razred": u.razred})
+            if self.dnevnik.uskladeno:
+                self.dnevnik.spremi()
+                if self.dnevnik.treba_sazeti():
+                    self.dnevnik.sazmi_u_pozadini(self.ucenici)
+            else:
+                self.dnevnik.sazmi(self.ucenici)
             messagebox.showinfo("Info", "✅ Podaci su spremljeni u ucenici.csv")
         except Exception as e:
             messagebox.showerror("Greška", f"Nije moguće spremiti CSV: {e}")
 
+    def _odbij_nepotpuno(self):
+        # u memoriji je samo dio datoteke – puno spremanje bi izgubilo neučitane retke
+        if self.nepotpuno:
+            messagebox.showwarning("Upozorenje", "Učitavanje nije dovršeno, pa bi spremanje izgubilo "
+                                                 "neučitane učenike. Najprije ponovno učitajte datoteku.")
+        return self.nepotpuno
+
     def ucitaj_iz_csv(self, silent=False):
-        """Učitavanje učenika iz CSV-a pomoću DictReader."""
-        try:
-            self.ucenici.clear()
-            self.lb.delete(0, tk.END)
-            with open("ucenici.csv", "r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    self.ucenici.append(Ucenik(row["ime"], row["prezime"], row["razred"]))
-            self.osvjezi()
-            if not silent:
-                messagebox.showinfo("Info", "📂 Podaci su učitani iz ucenici.csv")
-        except FileNotFoundError:
+        """Učitavanje učenika iz CSV-a u pozadinskoj dretvi, serija po serija.
+
+        Dretva samo parsira; u self.ucenici i na ekran serije stižu preko
+        root.after, pa Tk glavna petlja nikad ne čeka na datoteku.
+        """
+        if not os.path.exists("ucenici.csv"):
             if not silent:
                 messagebox.showwarning("Upozorenje", "Datoteka ucenici.csv ne postoji.")
-        except Exception as e:
-            messagebox.showerror("Greška", f"Nije moguće učitati CSV: {e}")
+            return
+        self._ucitaj_u_pozadini(partial(citaj_csv_u_serijama, dnevnik=self.dnevnik), "ucenici.csv", "CSV",
+                                None if silent else "📂 Podaci su učitani iz ucenici.csv")
+
+    def _ucitaj_u_pozadini(self, citac, putanja, vrsta_datoteke, poruka_kraj):
+        self.prekini_ucitavanje()
+        self.dnevnik.pricekaj()
+        self.dnevnik.oznaci_neuskladeno()
+        self.nepotpuno = True   # do poruke "kraj"
+        self.ucenici.clear()
+        self.odabrani_index = None
+        self.indeks = None
+        self._indeks_posao = None
+        self.rezultati = None
+        self.lb.postavi_izvor(self.ucenici)
+
+        prekid = threading.Event()
+        red = queue.Queue()
+        self._prekid = prekid
+        threading.Thread(target=citac, args=(putanja, red, prekid), daemon=True).start()
+        self.l_stanje.config(text=f"📂 Učitavanje {putanja}…")
+        self.b_odustani.config(state="normal")
+        posao = {"putanja": putanja, "vrsta": vrsta_datoteke, "poruka": poruka_kraj,
+                 "pocetak": time.perf_counter()}
+        self.root.after(10, self._preuzmi_serije, red, prekid, posao)
+
+    def _preuzmi_serije(self, red, prekid, posao):
+        """Prebacuje gotove serije iz reda u self.ucenici (Tk dretva)."""
+        if prekid.is_set():
+            return
+        rok = time.perf_counter() + 0.03    # ne drži glavnu petlju duže od ~30 ms
+        try:
+            while time.perf_counter() < rok:
+                vrsta, podaci, udio = red.get_nowait()
+                if vrsta == "serija":
+                    self.ucenici.extend(podaci)
+                    self.l_stanje.config(text=f"📂 Učitavanje… {len(self.ucenici)} učenika ({udio:.0%})")
+                elif vrsta == "dnevnik":
+                    DnevnikCSV.primijeni(podaci, self.ucenici)
+                    self.dnevnik.postavi(len(podaci))
+                elif vrsta == "kraj":
+                    self.nepotpuno = False
+                    self.osvjezi()
+                    trajanje = max(time.perf_counter() - posao["pocetak"], 1e-9)
+                    self._zavrsi_ucitavanje(f"📂 Učitano {len(self.ucenici)} učenika iz {posao['putanja']} "
+                                            f"({len(self.ucenici) / trajanje:,.0f} zapisa/s)")
+                    if posao["poruka"]:
+                        messagebox.showinfo("Info", posao["poruka"])
+                    return
+                else:
+                    self.osvjezi()
+                    self._zavrsi_ucitavanje("")
+                    messagebox.showerror("Greška", f"Nije moguće učitati {posao['vrsta']}: {podaci}")
+                    return
+        except queue.Empty:
+            pass
+        self.osvjezi()
+        self.root.after(20, self._preuzmi_serije, red, prekid, posao)
+
+    def prekini_ucitavanje(self):
+        if self._prekid is not None and not self._prekid.is_set():
+            self._prekid.set()
+            self._zavrsi_ucitavanje(f"✖ Učitavanje prekinuto – učitano {len(self.ucenici)} učenika")
+
+    def _zavrsi_ucitavanje(self, poruka):
+        self._prekid = None
+        self.l_stanje.config(text=poruka)
+        self.b_odustani.config(state="disabled")
+        self._izgradi_indeks()
 
     # --- XML (BONUS) ---
     def spremi_u_xml(self):
-        """BONUS: Spremi u XML koristeći ElementTree."""
+        """BONUS: Spremi u XML (streaming zapis, isti format kao ElementTree)."""
+        if self._odbij_nepotpuno():
+            return
         try:
-            root = ET.Element("evidencija")
-            for u in self.ucenici:
-                e = ET.SubElement(root, "ucenik")
-                ET.SubElement(e, "ime").text = u.ime
-                ET.SubElement(e, "prezime").text = u.prezime
-                ET.SubElement(e, "razred").text = u.razred
-            tree = ET.ElementTree(root)
-            tree.write("ucenici.xml", encoding="utf-8", xml_declaration=True)
+            zapisi_xml(self.ucenici, "ucenici.xml")
             messagebox.showinfo("Info", "💾 XML spremljen u ucenici.xml")
         except Exception as e:
             messagebox.showerror("Greška", f"Nije moguće spremiti XML: {e}")
 
     def ucitaj_iz_xml(self):
-        """BONUS: Učitaj iz XML datoteke."""
-        try:
-            self.ucenici.clear()
-            self.lb.delete(0, tk.END)
-            tree = ET.parse("ucenici.xml")
-            root = tree.getroot()
-            for e in root.findall("ucenik"):
-                ime = e.findtext("ime", default="")
-                prezime = e.findtext("prezime", default="")
-                razred = e.findtext("razred", default="")
-                if ime and prezime and razred:
-                    self.ucenici.append(Ucenik(ime, prezime, razred))
-            self.osvjezi()
-            messagebox.showinfo("Info", "📂 XML učitan iz ucenici.xml")
-        except FileNotFoundError:
+        """BONUS: Učitaj iz XML datoteke (streaming, iterparse u pozadini)."""
+        if not os.path.exists("ucenici.xml"):
             messagebox.showwarning("Upozorenje", "Datoteka ucenici.xml ne postoji.")
-        except Exception as e:
-            messagebox.showerror("Greška", f"Nije moguće učitati XML: {e}")
+            return
+        self._ucitaj_u_pozadini(citaj_xml_u_serijama, "ucenici.xml", "XML", "📂 XML učitan iz ucenici.xml")
 
 
 if __name__ == "__main__":
@@ -1,5 +1,10 @@
+import sys
+import time
 import tkinter as tk
 
+from tablica_ucenika import TablicaUcenika, RedakUcenika
+from pretraga_ucenika import IndeksUcenika
+
 class Ucenik:
     def __init__(self, ime, prezime, razred):
         self.ime = ime
@@ -10,18 +15,80 @@ class Ucenik:
         return f"{self.prezime}, {self.ime}, {self.razred}"
 
 
+class UcenikRedak(RedakUcenika):
+    __slots__ = ()
+    __str__ = Ucenik.__str__
+
+
+class PopisUcenika:
+    """Lista učenika koja javlja pretplatnicima svaku promjenu.
+
+    Pretplatnik se poziva kao fn(dogadjaj, index, ucenik), gdje je dogadjaj
+    "dodan", "izmijenjen" ili "obrisan". Tako prikaz može zakrpati samo
+    jedan redak umjesto da sve briše i ponovno upisuje. Indeks za pretragu
+    održava se uz svaku promjenu.
+    """
+
+    def __init__(self):
+        self._ucenici = TablicaUcenika(UcenikRedak)
+        self._pretplatnici = []
+        self.indeks = IndeksUcenika(self._ucenici)
+
+    def pretplati(self, fn):
+        self._pretplatnici.append(fn)
+
+    def _javi(self, dogadjaj, index, ucenik):
+        for fn in self._pretplatnici:
+            fn(dogadjaj, index, ucenik)
+
+    def dodaj(self, ucenik):
+        self._ucenici.append(ucenik)
+        self.indeks.dodaj(len(self._ucenici) - 1)
+        self._javi("dodan", len(self._ucenici) - 1, ucenik)
+
+    def izmijeni(self, index, ime, prezime, razred):
+        self.indeks.ukloni(index)
+        try:
+            self._ucenici.izmijeni(index, ime, prezime, razred)    # sve ili ništa
+        finally:
+            self.indeks.dodaj(index)    # i kad tablica odbije predugo ime
+        self._javi("izmijenjen", index, self._ucenici[index])
+
+    def obrisi(self, index):
+        u = self._ucenici[index]
+        ucenik = Ucenik(u.ime, u.prezime, u.razred)
+        self.indeks.ukloni(index, brisanje=True)
+        del self._ucenici[index]
+        self._javi("obrisan", index, ucenik)
+
+    def __len__(self):
+        return len(self._ucenici)
+
+    def __getitem__(self, index):
+        return self._ucenici[index]
+
+    def __iter__(self):
+        return iter(self._ucenici)
+
+
 class EvidencijaApp:
+    MAX_PRIKAZ = 1000   # najviše redaka rezultata pretrage u Listboxu
+
     def __init__(self, root):
         self.root = root
         self.root.title("Evidencija učenika")
         self.root.geometry("500x400")
 
         
-        self.ucenici = []
+        self.ucenici = PopisUcenika()
+        self.ucenici.pretplati(self.na_promjenu)
 
        
         self.odabrani_index = None
 
+        # brojevi redaka prikazanih u Listboxu kad je pretraga aktivna, inače None
+        self.prikazani = None
+
 
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(1, weight=1)
@@ -59,6 +126,18 @@ class EvidencijaApp:
         self.info_label = tk.Label(unos_frame, text="")
         self.info_label.grid(row=4, column=0, columnspan=2, sticky="W")
 
+        tk.Label(unos_frame, text="Traži:").grid(row=5, column=0, padx=5, pady=5, sticky="W")
+        trazi_frame = tk.Frame(unos_frame)
+        trazi_frame.grid(row=5, column=1, sticky="EW")
+        trazi_frame.columnconfigure(0, weight=1)
+        self.upit_var = tk.StringVar()
+        self.razred_filtar_var = tk.StringVar()
+        tk.Entry(trazi_frame, textvariable=self.upit_var).grid(row=0, column=0, padx=5, sticky="EW")
+        tk.Label(trazi_frame, text="Razred:").grid(row=0, column=1, padx=5)
+        tk.Entry(trazi_frame, textvariable=self.razred_filtar_var, width=6).grid(row=0, column=2, padx=5)
+        self.upit_var.trace_add("write", lambda *_: self.filtriraj())
+        self.razred_filtar_var.trace_add("write", lambda *_: self.filtriraj())
+
        
         self.listbox = tk.Listbox(prikaz_frame)
         self.listbox.grid(row=0, column=0, sticky="NSEW")
@@ -76,8 +155,11 @@ class EvidencijaApp:
 
         if ime and prezime and razred:
             novi = Ucenik(ime, prezime, razred)
-            self.ucenici.append(novi)
-            self.osvjezi_prikaz()
+            try:
+                self.ucenici.dodaj(novi)
+            except ValueError as e:
+                self.info_label.config(text=f"Učenik nije dodan: {e}")
+                return
             self.ocisti_polja()
             self.info_label.config(text="Učenik dodan.")
         else:
@@ -85,14 +167,48 @@ class EvidencijaApp:
 
     def osvjezi_prikaz(self):
         self.listbox.delete(0, tk.END)
-        for ucenik in self.ucenici:
+        if self.prikazani is None:
+            for ucenik in self.ucenici:
+                self.listbox.insert(tk.END, str(ucenik))
+        else:
+            for i in self.prikazani:
+                self.listbox.insert(tk.END, str(self.ucenici[i]))
+
+    def filtriraj(self):
+        upit, razred = self.upit_var.get(), self.razred_filtar_var.get()
+        bio_filtar = self.prikazani is not None
+        self.prikazani = self.ucenici.indeks.trazi(upit, razred, najvise=self.MAX_PRIKAZ)
+        if self.prikazani is None and not bio_filtar:
+            return
+        self.odabrani_index = None
+        self.osvjezi_prikaz()
+        if self.prikazani is None:
+            self.info_label.config(text="")
+        elif len(self.prikazani) >= self.MAX_PRIKAZ:
+            self.info_label.config(text=f"Prikazano prvih {self.MAX_PRIKAZ} rezultata.")
+        else:
+            self.info_label.config(text=f"Pronađeno: {len(self.prikazani)}")
+
+    def na_promjenu(self, dogadjaj, index, ucenik):
+        if self.prikazani is not None:
+            # promjena može dodati ili maknuti redak iz rezultata – ponovi pretragu
+            self.filtriraj()
+            return
+        # Krpa samo redak na kojem se dogodila promjena – O(1) rada na widgetu
+        if dogadjaj == "dodan":
             self.listbox.insert(tk.END, str(ucenik))
+        elif dogadjaj == "izmijenjen":
+            self.listbox.delete(index)
+            self.listbox.insert(index, str(ucenik))
+        elif dogadjaj == "obrisan":
+            self.listbox.delete(index)
 
     def odaberi_ucenika(self, event):
         izbor = self.listbox.curselection()
         if not izbor:
             return
-        self.odabrani_index = izbor[0]
+        # redak u Listboxu -> indeks u self.ucenici (i kad je prikazan samo rezultat pretrage)
+        self.odabrani_index = izbor[0] if self.prikazani is None else self.prikazani[izbor[0]]
         ucenik = self.ucenici[self.odabrani_index]
         self.ime_entry.delete(0, tk.END)
         self.ime_entry.insert(0, ucenik.ime)
@@ -115,9 +231,11 @@ class EvidencijaApp:
             self.info_label.config(text="Popuni sva polja.")
             return
 
-        ucenik = self.ucenici[self.odabrani_index]
-        ucenik.ime, ucenik.prezime, ucenik.razred = ime, prezime, razred
-        self.osvjezi_prikaz()
+        try:
+            self.ucenici.izmijeni(self.odabrani_index, ime, prezime, razred)
+        except ValueError as e:
+            self.info_label.config(text=f"Izmjena nije spremljena: {e}")
+            return
         self.ocisti_polja()
         self.info_label.config(text="Izmjene su spremljene.")
         self.odabrani_index = None
@@ -128,8 +246,34 @@ class EvidencijaApp:
         self.razred_entry.delete(0, tk.END)
 
 
+def benchmark(n=100_000, ponavljanja=100):
+    """Usporedba jedne izmjene: krpanje retka naspram punog osvježavanja."""
+    root = tk.Tk()
+    root.withdraw()
+    app = EvidencijaApp(root)
+    for i in range(n):
+        app.ucenici.dodaj(Ucenik(f"Ime{i}", f"Prezime{i}", "4a"))
+
+    t = time.perf_counter()
+    for k in range(ponavljanja):
+        app.ucenici.izmijeni(n // 2, "Novo", f"Prezime{k}", "4b")
+    krpa = (time.perf_counter() - t) / ponavljanja
+
+    t = time.perf_counter()
+    app.osvjezi_prikaz()
+    puno = time.perf_counter() - t
+
+    print(f"{n} učenika: izmjena retka {krpa * 1e6:.1f} µs, puno osvježavanje {puno * 1e3:.1f} ms")
+    root.destroy()
+
+
 if __name__ == "__main__":
 
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit()
+
+
     print(Ucenik("blabla", "blablabonvic", "19m"))
 
     root = tk.Tk()
@@ -1,5 +1,13 @@
 
+import csv
+import os
+import queue
+import re
+import threading
+import time
 import tkinter as tk
+from array import array
+from tkinter import filedialog
 
 
 class Kontakt:
@@ -11,11 +19,330 @@ class Kontakt:
     def __str__(self):
         return f"{self.ime} - {self.email} - {self.telefon}"
 
+
+POZIVNI_BROJ = "385"     # za brojeve u nacionalnom obliku (091...)
+
+
+def kljuc_emaila(email):
+    return email.strip().casefold()
+
+
+def kljuc_telefona(telefon):
+    znamenke = "".join(filter(str.isdigit, telefon))
+    if telefon.lstrip().startswith("+"):
+        return znamenke
+    if znamenke.startswith("00"):
+        return znamenke[2:]
+    if znamenke.startswith("0"):
+        return POZIVNI_BROJ + znamenke[1:]
+    return znamenke
+
+
+class SpremisteKontakata:
+    """Kontakti pod stabilnim id-evima.
+
+    Id se ne mijenja dok kontakt postoji, pa brisanje ne pomiče ostale
+    kontakte: del iz rječnika je O(1), a rječnik obrisana mjesta ostavlja
+    kao prazna i sažima ih tek kad naraste. Iteracija ide redoslijedom
+    dodavanja. Obrisani id se više nikad ne dodjeljuje, pa indeksi koji još
+    sadrže stari id prepoznaju ga kao obrisan.
+    """
+
+    def __init__(self):
+        self.po_id = {}
+        self.sljedeci_id = 0
+
+    def dodaj(self, k):
+        id_ = self.sljedeci_id
+        self.sljedeci_id += 1
+        self.po_id[id_] = k
+        return id_
+
+    def obrisi(self, id_):
+        return self.po_id.pop(id_)
+
+    def ocisti(self):
+        self.po_id = {}
+
+    def stavke(self):
+        return self.po_id.items()
+
+    def __getitem__(self, id_):
+        return self.po_id[id_]
+
+    def __len__(self):
+        return len(self.po_id)
+
+    def __iter__(self):
+        return iter(self.po_id.values())
+
+
+class Deduplikator:
+    """Prepoznaje duplikate po normaliziranom emailu i telefonu.
+
+    "Ana@Mail.hr" i "ana@mail.hr ", odnosno "091 123 4567", "+385 91 1234567"
+    i "00385911234567" daju isti ključ, pa je provjera jedan pogled u
+    rječnik – cijeli popis se obrađuje u jednom O(n) prolazu.
+    """
+
+    def __init__(self):
+        self.po_kljucu = {}
+
+    @staticmethod
+    def kljuc(k):
+        return kljuc_emaila(k.email) + "\x00" + kljuc_telefona(k.telefon)
+
+    def pronadi(self, k):
+        """Vraća id postojećeg kontakta koji je duplikat od k ili None."""
+        return self.po_kljucu.get(self.kljuc(k))
+
+    def dodaj(self, id_, k):
+        self.po_kljucu[self.kljuc(k)] = id_
+
+    def ukloni(self, id_, k):
+        kljuc = self.kljuc(k)
+        if self.po_kljucu.get(kljuc) == id_:
+            del self.po_kljucu[kljuc]
+
+    @staticmethod
+    def spoji_u(postojeci, novi):
+        """Nadopunjuje postojeći kontakt podacima duplikata; True ako se promijenio."""
+        if not postojeci.ime.strip() and novi.ime.strip():
+            postojeci.ime = novi.ime
+            return True
+        return False
+
+    def spoji(self, kontakti, spremiste):
+        """Dodaje kontakte u spremište bez duplikata; vraća broj spojenih."""
+        self.po_kljucu = {}
+        spojeno = 0
+        for k in kontakti:
+            kljuc = self.kljuc(k)
+            postojeci = self.po_kljucu.get(kljuc)
+            if postojeci is None:
+                self.po_kljucu[kljuc] = spremiste.dodaj(k)
+            else:
+                self.spoji_u(spremiste[postojeci], k)
+                spojeno += 1
+        return spojeno
+
+
+class TrigramIndeks:
+    """Pretraga podniza u imenu, emailu i telefonu preko indeksa trigrama.
+
+    Za svaki trigram pamti se uzlazni array id-eva kontakata (iz
+    SpremisteKontakata) koji ga sadrže. Kandidati za upit su popis njegovog
+    najrjeđeg trigrama, a svaki se provjerava pravim traženjem podniza.
+    Obrisani id-evi ostaju u popisima kao "mrtvi" i preskaču se; popis koji
+    je pretraga prošla do kraja i u kojem su mrtvi većina sažima se odmah.
+    Upit mora imati barem 3 znaka.
+    """
+
+    def __init__(self, spremiste):
+        self.spremiste = spremiste
+        self.postinzi = {}
+
+    @staticmethod
+    def tekst(k):
+        return "\x00".join((k.ime, k.email, k.telefon)).casefold()
+
+    @staticmethod
+    def trigrami(tekst):
+        return {tekst[i:i + 3] for i in range(len(tekst) - 2)}
+
+    def dodaj(self, id_, k):
+        postinzi = self.postinzi
+        for t in self.trigrami(self.tekst(k)):
+            p = postinzi.get(t)
+            if p is None:
+                postinzi[t] = p = array("I")
+            p.append(id_)
+
+    def izgradi(self):
+        self.postinzi = {}
+        for id_, k in self.spremiste.stavke():
+            self.dodaj(id_, k)
+
+    def trazi(self, upit, najvise=None):
+        """Vraća id-eve kontakata koji sadrže upit, redoslijedom dodavanja."""
+        upit = upit.casefold()
+        po_id = self.spremiste.po_id
+        trigram = min(self.trigrami(upit), key=lambda t: len(self.postinzi.get(t, ())))
+        kandidati = self.postinzi.get(trigram, ())
+        rezultat = []
+        mrtvih = 0
+        for id_ in kandidati:
+            k = po_id.get(id_)
+            if k is None:
+                mrtvih += 1
+            elif upit in self.tekst(k):
+                rezultat.append(id_)
+                if najvise is not None and len(rezultat) >= najvise:
+                    break
+        else:
+            if mrtvih * 2 > len(kandidati):
+                self.postinzi[trigram] = array("I", (i for i in kandidati if i in po_id))
+        return rezultat
+
+
+# --- vCard ---
+# Čitač i pisač rade karticu po karticu, pa ni datoteka s milijun kontakata
+# nikad nije cijela u memoriji. U pozadinskoj dretvi šalju poruke
+# (vrsta, podaci, udio) u ograničeni red: ("serija", [Kontakt...], 0.0–1.0),
+# ("izvezeno", broj, 0.0–1.0), ("kraj", broj, 1.0) ili ("greska", iznimka, 0.0).
+
+def _vcard_u_tekst(vrijednost):
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) in "nN" else m.group(1), vrijednost)
+
+
+def _tekst_u_vcard(tekst):
+    return tekst.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;").replace("\n", "\\n")
+
+
+def _odmotani_retci(f):
+    # nastavak presavijenog retka počinje razmakom ili tabom; spaja se prije
+    # dekodiranja, jer prijelom smije pasti usred UTF-8 znaka
+    prethodni = None
+    for redak in f:
+        redak = redak.rstrip(b"\r\n")
+        if redak[:1] in (b" ", b"\t") and prethodni is not None:
+            prethodni += redak[1:]
+            continue
+        if prethodni:
+            yield prethodni.decode("utf-8", "replace")
+        prethodni = redak
+    if prethodni:
+        yield prethodni.decode("utf-8", "replace")
+
+
+def citaj_vcard(f):
+    """Generator Kontakt objekata iz .vcf datoteke otvorene u binarnom načinu.
+
+    Iz svake kartice uzima FN (ili N ako FN nema), prvi EMAIL i prvi TEL;
+    kartice bez emaila i telefona se preskaču.
+    """
+    ime = n = email = telefon = None
+    for redak in _odmotani_retci(f):
+        naziv, _, vrijednost = redak.partition(":")
+        svojstvo = naziv.split(";", 1)[0].rsplit(".", 1)[-1].upper()      # "item1.EMAIL;TYPE=..." -> EMAIL
+        if svojstvo == "BEGIN":
+            ime = n = email = telefon = None
+        elif svojstvo == "FN":
+            ime = _vcard_u_tekst(vrijednost)
+        elif svojstvo == "N":
+            n = vrijednost
+        elif svojstvo == "EMAIL" and email is None:
+            email = _vcard_u_tekst(vrijednost)
+        elif svojstvo == "TEL" and telefon is None:
+            telefon = _vcard_u_tekst(vrijednost).removeprefix("tel:")
+        elif svojstvo == "END" and (email or telefon):
+            if not ime and n:
+                prezime, ime_osobe = (re.split(r"(?<!\\);", n) + ["", ""])[:2]
+                ime = " ".join(_vcard_u_tekst(d) for d in (ime_osobe, prezime) if d)
+            yield Kontakt(ime or "", email or "", telefon or "")
+
+
+def _presavij(redak):
+    """Presavija redak dulji od 75 okteta (RFC 6350, 3.2)."""
+    if len(redak.encode("utf-8")) <= 75:
+        return redak
+    dijelovi = []
+    pocetak = 0
+    okteta = 0
+    for i, znak in enumerate(redak):
+        duljina = len(znak.encode("utf-8"))
+        if okteta + duljina > (75 if not dijelovi else 74):
+            dijelovi.append(redak[pocetak:i])
+            pocetak, okteta = i, 0
+        okteta += duljina
+    dijelovi.append(redak[pocetak:])
+    return "\r\n ".join(dijelovi)
+
+
+def vcard_kartica(k):
+    """Kontakt kao vCard 3.0 kartica (s CRLF na kraju svakog retka)."""
+    ime_osobe, _, prezime = k.ime.strip().rpartition(" ")
+    retci = ["BEGIN:VCARD", "VERSION:3.0",
+             f"FN:{_tekst_u_vcard(k.ime)}",
+             f"N:{_tekst_u_vcard(prezime)};{_tekst_u_vcard(ime_osobe)};;;",
+             f"EMAIL;TYPE=INTERNET:{_tekst_u_vcard(k.email)}",
+             f"TEL:{_tekst_u_vcard(k.telefon)}",
+             "END:VCARD"]
+    return "".join(_presavij(redak) + "\r\n" for redak in retci)
+
+
+def _posalji(red, prekid, poruka):
+    """Stavlja poruku u ograničeni red; vraća False ako je posao u međuvremenu prekinut."""
+    while not prekid.is_set():
+        try:
+            red.put(poruka, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def uvezi_vcard_u_serijama(putanja, red, prekid, velicina_serije=5000):
+    try:
+        ukupno = os.path.getsize(putanja) or 1
+        broj = 0
+        with open(putanja, "rb") as f:
+            serija = []
+            for k in citaj_vcard(f):
+                serija.append(k)
+                if len(serija) >= velicina_serije:
+                    if not _posalji(red, prekid, ("serija", serija, f.tell() / ukupno)):
+                        return
+                    broj += len(serija)
+                    serija = []
+        if _posalji(red, prekid, ("serija", serija, 1.0)):
+            _posalji(red, prekid, ("kraj", broj + len(serija), 1.0))
+    except Exception as e:
+        _posalji(red, prekid, ("greska", e, 0.0))
+
+
+def izvezi_vcard_u_serijama(kontakti, ukupno, putanja, red, prekid, korak=10000):
+    """Zapisuje kontakte u privremenu datoteku i tek na kraju je preimenuje u putanja."""
+    privremena = putanja + ".tmp"
+    try:
+        broj = 0
+        with open(privremena, "w", encoding="utf-8", newline="") as f:
+            for broj, k in enumerate(kontakti, 1):
+                f.write(vcard_kartica(k))
+                if broj % korak == 0 and not _posalji(red, prekid, ("izvezeno", broj, broj / max(ukupno, 1))):
+                    break
+        if prekid.is_set():
+            os.remove(privremena)
+            return
+        os.replace(privremena, putanja)
+        _posalji(red, prekid, ("kraj", broj, 1.0))
+    except Exception as e:
+        if os.path.exists(privremena):
+            os.remove(privremena)
+        _posalji(red, prekid, ("greska", e, 0.0))
+
+
+def uzastopni_rasponi(redci):
+    """(0, 1, 2, 5, 6) -> [(0, 2), (5, 6)] za uzlazni niz redaka."""
+    rasponi = []
+    for r in redci:
+        if rasponi and rasponi[-1][1] == r - 1:
+            rasponi[-1][1] = r
+        else:
+            rasponi.append([r, r])
+    return rasponi
+
+
 class ImenikApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Digitalni imenik")
-        self.kontakti = []
+        self.kontakti = SpremisteKontakata()
+        self.indeks = TrigramIndeks(self.kontakti)
+        self.duplikati = Deduplikator()
+        self.prikazani_id = array("I")
+        self._prikazani_kljuc = ""     # _kljuc_prikaza() upita koji je u Listboxu
+        self._prekid = None
 
         frame_unos = tk.Frame(root)
         frame_unos.pack(padx=10, pady=10)
@@ -35,20 +362,35 @@ class ImenikApp:
         tk.Button(frame_unos, text="Dodaj", command=self.dodaj).grid(row=3, column=0, pady=5)
         tk.Button(frame_unos, text="Obriši", command=self.obrisi).grid(row=3, column=1, pady=5)
 
+        frame_trazi = tk.Frame(root)
+        frame_trazi.pack(padx=10, fill="x")
+        self.l_trazi = tk.Label(frame_trazi, text="Traži:")
+        self.l_trazi.pack(side=tk.LEFT)
+        self.upit = tk.StringVar()
+        tk.Entry(frame_trazi, textvariable=self.upit).pack(side=tk.LEFT, fill="x", expand=True)
+        self.upit.trace_add("write", lambda *_: self._na_upit())
+
         frame_lista = tk.Frame(root)
         frame_lista.pack(padx=10, pady=10, fill="both", expand=True)
 
-        self.listbox = tk.Listbox(frame_lista, width=50, height=10)
+        self.listbox = tk.Listbox(frame_lista, width=50, height=10, selectmode=tk.EXTENDED)
         self.listbox.pack(side=tk.LEFT, fill="both", expand=True)
-        scrollbar = tk.Scrollbar(frame_lista, command=self.listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill="y")
-        self.listbox.config(yscrollcommand=scrollbar.set)
+        self.scrollbar = tk.Scrollbar(frame_lista, command=self.listbox.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.listbox.config(yscrollcommand=self.scrollbar.set)
 
         frame_gumbi = tk.Frame(root)
         frame_gumbi.pack(padx=10, pady=10)
 
         tk.Button(frame_gumbi, text="Spremi kontakte", command=self.spremi).grid(row=0, column=0, padx=5)
         tk.Button(frame_gumbi, text="Učitaj kontakte", command=self.ucitaj).grid(row=0, column=1, padx=5)
+        tk.Button(frame_gumbi, text="Uvezi vCard", command=self.uvezi_vcard).grid(row=1, column=0, padx=5, pady=(5, 0))
+        tk.Button(frame_gumbi, text="Izvezi vCard", command=self.izvezi_vcard).grid(row=1, column=1, padx=5, pady=(5, 0))
+        self.b_odustani = tk.Button(frame_gumbi, text="Odustani", state="disabled", command=self.prekini_posao)
+        self.b_odustani.grid(row=1, column=2, padx=5, pady=(5, 0))
+
+        self.status = tk.Label(root, text="", anchor="w")
+        self.status.pack(padx=10, pady=(0, 5), fill="x")
 
         self.ucitaj()
 
@@ -57,40 +399,280 @@ class ImenikApp:
         email = self.entry_email.get()
         telefon = self.entry_telefon.get()
         if ime and email and telefon:
-            self.kontakti.append(Kontakt(ime, email, telefon))
-            self.osvjezi()
+            self.status.config(text=self._unesi(Kontakt(ime, email, telefon)))
             self.entry_ime.delete(0, tk.END)
             self.entry_email.delete(0, tk.END)
             self.entry_telefon.delete(0, tk.END)
 
+    def _unesi(self, k):
+        """Dodaje kontakt ili ga spaja s postojećim duplikatom; vraća poruku za status."""
+        postojeci_id = self.duplikati.pronadi(k)
+        if postojeci_id is None:
+            id_ = self._dodaj_u_spremiste(k)
+            if len(self.upit.get().strip()) >= 3:
+                self.osvjezi()
+            else:
+                self.prikazani_id.append(id_)
+                self.listbox.insert(tk.END, str(k))
+            return "Kontakt dodan."
+        postojeci = self.kontakti[postojeci_id]
+        if self._spoji_s_postojecim(postojeci_id, k):
+            self.osvjezi()
+        return f"Kontakt već postoji ({postojeci.ime}) – spojeno."
+
+    def _dodaj_u_spremiste(self, k):
+        id_ = self.kontakti.dodaj(k)
+        self.duplikati.dodaj(id_, k)
+        self.indeks.dodaj(id_, k)
+        return id_
+
+    def _spoji_s_postojecim(self, postojeci_id, k):
+        postojeci = self.kontakti[postojeci_id]
+        if not self.duplikati.spoji_u(postojeci, k):
+            return False
+        # izmijenjeni kontakt dobiva novi id, a stari ostaje mrtav u indeksu
+        self.kontakti.obrisi(postojeci_id)
+        self._dodaj_u_spremiste(postojeci)
+        return True
+
+    def _uvezi_seriju(self, kontakti):
+        """Dodaje seriju uvezenih kontakata; vraća broj spojenih duplikata."""
+        spojeno = 0
+        for k in kontakti:
+            postojeci_id = self.duplikati.pronadi(k)
+            if postojeci_id is None:
+                self._dodaj_u_spremiste(k)
+            else:
+                self._spoji_s_postojecim(postojeci_id, k)
+                spojeno += 1
+        return spojeno
+
+    def _kontakti_za_izvoz(self):
+        # kopija popisa, da brisanje za vrijeme izvoza ne smeta dretvi
+        return list(self.kontakti), len(self.kontakti)
+
     def obrisi(self):
         odabrani = self.listbox.curselection()
-        if odabrani:
-            indeks = odabrani[0]
-            self.kontakti.pop(indeks)
+        if not odabrani:
+            return
+        self._obrisi_kontakte([self.prikazani_id[r] for r in odabrani])
+        # iz Listboxa se brišu cijeli rasponi, od kraja
+        rasponi = uzastopni_rasponi(odabrani)
+        if len(rasponi) > 200:
             self.osvjezi()
+        else:
+            for pocetak, kraj in reversed(rasponi):
+                self.listbox.delete(pocetak, kraj)
+                del self.prikazani_id[pocetak:kraj + 1]
+        self.status.config(text=f"Obrisano kontakata: {len(odabrani)}")
+
+    def _obrisi_kontakte(self, idevi):
+        # u indeksu id-evi samo postaju mrtvi
+        for id_ in idevi:
+            self.duplikati.ukloni(id_, self.kontakti.obrisi(id_))
+
+    def _zauzeto(self):
+        # dok uvoz traje, u memoriji je samo dio uvezenih kontakata
+        if self._prekid is not None:
+            self.status.config(text="Pričekajte da uvoz/izvoz završi ili ga prekinite.")
+        return self._prekid is not None
 
     def spremi(self):
+        if self._zauzeto():
+            return
         with open("kontakti.csv", "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
             for k in self.kontakti:
                 writer.writerow([k.ime, k.email, k.telefon])
 
     def ucitaj(self):
+        if self._zauzeto():
+            return
         try:
             with open("kontakti.csv", "r", encoding="utf-8") as f:
                 reader = csv.reader(f)
-                self.kontakti = [Kontakt(r[0], r[1], r[2]) for r in reader]
+                self.kontakti.ocisti()
+                spojeno = self.duplikati.spoji((Kontakt(r[0], r[1], r[2]) for r in reader), self.kontakti)
+                self.indeks.izgradi()
                 self.osvjezi()
+                self.status.config(text=f"Učitano {len(self.kontakti)} kontakata, spojeno duplikata: {spojeno}")
         except FileNotFoundError:
             pass
 
+    # --- vCard uvoz/izvoz u pozadini ---
+    def uvezi_vcard(self):
+        putanja = filedialog.askopenfilename(filetypes=[("vCard", "*.vcf"), ("Sve datoteke", "*.*")])
+        if putanja:
+            self._pokreni_posao(uvezi_vcard_u_serijama, (putanja,), f"Uvoz iz {os.path.basename(putanja)}")
+
+    def izvezi_vcard(self):
+        putanja = filedialog.asksaveasfilename(defaultextension=".vcf", filetypes=[("vCard", "*.vcf")])
+        if putanja:
+            kontakti, ukupno = self._kontakti_za_izvoz()
+            self._pokreni_posao(izvezi_vcard_u_serijama, (kontakti, ukupno, putanja),
+                                f"Izvoz u {os.path.basename(putanja)}")
+
+    def _pokreni_posao(self, radnik, argumenti, opis):
+        """Pokreće radnika u pozadinskoj dretvi; poruke iz reda preuzima Tk dretva."""
+        self.prekini_posao()
+        prekid = threading.Event()
+        red = queue.Queue(maxsize=4)        # radnik čeka ako glavna dretva zaostaje
+        self._prekid = prekid
+        threading.Thread(target=radnik, args=(*argumenti, red, prekid), daemon=True).start()
+        self.b_odustani.config(state="normal")
+        self.status.config(text=f"{opis}…")
+        posao = {"opis": opis, "uvezeno": 0, "spojeno": 0, "pocetak": time.perf_counter()}
+        self.root.after(10, self._preuzmi_poruke, red, prekid, posao)
+
+    def _preuzmi_poruke(self, red, prekid, posao):
+        if prekid.is_set():
+            return
+        rok = time.perf_counter() + 0.03    # ne drži glavnu petlju duže od ~30 ms
+        try:
+            while time.perf_counter() < rok:
+                vrsta, podaci, udio = red.get_nowait()
+                if vrsta == "serija":
+                    posao["spojeno"] += self._uvezi_seriju(podaci)
+                    posao["uvezeno"] += len(podaci)
+                    self.status.config(text=f"{posao['opis']}… {posao['uvezeno']} kontakata ({udio:.0%})")
+                elif vrsta == "izvezeno":
+                    self.status.config(text=f"{posao['opis']}… {podaci} kontakata ({udio:.0%})")
+                elif vrsta == "kraj":
+                    trajanje = max(time.perf_counter() - posao["pocetak"], 1e-9)
+                    spojeno = f", spojeno duplikata: {posao['spojeno']}" if posao["spojeno"] else ""
+                    self._zavrsi_posao(f"{posao['opis']}: {podaci} kontakata{spojeno} "
+                                       f"({podaci / trajanje:,.0f} kontakata/s)")
+                    return
+                else:
+                    self._zavrsi_posao(f"{posao['opis']} nije uspio: {podaci}")
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(20, self._preuzmi_poruke, red, prekid, posao)
+
+    def prekini_posao(self):
+        if self._prekid is not None and not self._prekid.is_set():
+            self._prekid.set()
+            self._zavrsi_posao("Prekinuto.")
+
+    def _zavrsi_posao(self, poruka):
+        self._prekid = None
+        self.b_odustani.config(state="disabled")
+        self.status.config(text=poruka)
+        self.osvjezi()
+
+    @staticmethod
+    def _kljuc_prikaza(upit):
+        """Upiti s istim ključem prikazuju iste kontakte: kraći od 3 znaka sve."""
+        return upit if len(upit) >= 3 else ""
+
+    def _na_upit(self):
+        # tipkanje koje ne mijenja prikaz (npr. prvi i drugi znak) ne puni Listbox ponovno
+        kljuc = self._kljuc_prikaza(self.upit.get().strip())
+        if kljuc != self._prikazani_kljuc:
+            self._prikazani_kljuc = kljuc
+            self.osvjezi()
+
     def osvjezi(self):
+        upit = self.upit.get().strip()
+        if len(upit) >= 3:
+            self.prikazani_id = array("I", self.indeks.trazi(upit, najvise=1000))
+        else:
+            self.prikazani_id = array("I", self.kontakti.po_id)
         self.listbox.delete(0, tk.END)
-        for k in self.kontakti:
-            self.listbox.insert(tk.END, str(k))
+        if self.prikazani_id:
+            self.listbox.insert(tk.END, *(str(self.kontakti[i]) for i in self.prikazani_id))
+
+
+def _primjer_kontakata(n):
+    return (Kontakt(f"Osoba{i} Prezime{i % 977}", f"osoba{i}@primjer{i % 50}.hr", f"09{i % 10}{i:07d}")
+            for i in range(n))
+
+
+def benchmark(n=500_000):
+    spremiste = SpremisteKontakata()
+    for k in _primjer_kontakata(n):
+        spremiste.dodaj(k)
+    indeks = TrigramIndeks(spremiste)
+    t = time.perf_counter()
+    indeks.izgradi()
+    print(f"{n} kontakata: izgradnja indeksa {time.perf_counter() - t:.2f} s")
+    for upit in ["osoba12345", "prezime97", "primjer4", "0951234", "x@prim"]:
+        t = time.perf_counter()
+        rezultat = indeks.trazi(upit, najvise=1000)
+        print(f"  trazi({upit!r}): {len(rezultat)} rezultata, {(time.perf_counter() - t) * 1e3:.2f} ms")
+
+
+def benchmark_duplikata(n=1_000_000):
+    # od svaka tri retka drugi je ista osoba kao prvi, s drukčije napisanim emailom i telefonom
+    redci = []
+    for i in range(n):
+        j = i // 3
+        if i % 3 == 0:
+            redci.append((f"Osoba {j}", f"osoba{j}@primjer.hr", f"091 {j:07d}"))
+        elif i % 3 == 1:
+            redci.append((f"Osoba {j}", f"Osoba{j}@Primjer.HR ", f"+385 91 {j:07d}"))
+        else:
+            redci.append((f"Druga osoba {j}", f"druga{j}@primjer.hr", f"00385-91-{j:07d}"))
+    t = time.perf_counter()
+    spremiste = SpremisteKontakata()
+    spojeno = Deduplikator().spoji((Kontakt(*r) for r in redci), spremiste)
+    print(f"{n} redaka: {len(spremiste)} jedinstvenih, spojeno {spojeno}, {time.perf_counter() - t:.2f} s")
+
+
+def benchmark_vcard(n=1_000_000):
+    """Propusnost izvoza i uvoza vCard datoteke kroz pozadinske radnike i red."""
+    import tempfile
+
+    def isprazni(red, dretva):
+        while dretva.is_alive() or not red.empty():
+            try:
+                vrsta, podaci, _ = red.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if vrsta == "kraj":
+                return podaci
+            if vrsta == "greska":
+                raise podaci
+
+    with tempfile.TemporaryDirectory() as mapa:
+        putanja = os.path.join(mapa, "kontakti.vcf")
+        for opis, radnik, argumenti in [("izvoz", izvezi_vcard_u_serijama, (_primjer_kontakata(n), n, putanja)),
+                                        ("uvoz", uvezi_vcard_u_serijama, (putanja,))]:
+            red, prekid = queue.Queue(maxsize=4), threading.Event()
+            t = time.perf_counter()
+            dretva = threading.Thread(target=radnik, args=(*argumenti, red, prekid))
+            dretva.start()
+            broj = isprazni(red, dretva)
+            trajanje = time.perf_counter() - t
+            print(f"vCard {opis}: {broj} kontakata, {trajanje:.2f} s ({broj / trajanje:,.0f} kontakata/s, "
+                  f"{os.path.getsize(putanja) / trajanje / 1e6:.1f} MB/s)")
+
+
+def benchmark_brisanja(n=1_000_000, broj=10_000):
+    # isti posao kao ImenikApp.obrisi() za označeni blok redaka, bez Tk-a
+    spremiste = SpremisteKontakata()
+    duplikati = Deduplikator()
+    duplikati.spoji(_primjer_kontakata(n), spremiste)
+    prikazani_id = array("I", spremiste.po_id)
+    odabrani = range(n // 2, n // 2 + broj)
+    t = time.perf_counter()
+    for r in odabrani:
+        id_ = prikazani_id[r]
+        duplikati.ukloni(id_, spremiste.obrisi(id_))
+    for pocetak, kraj in reversed(uzastopni_rasponi(odabrani)):
+        del prikazani_id[pocetak:kraj + 1]
+    print(f"brisanje {broj} od {n} kontakata: {(time.perf_counter() - t) * 1e3:.1f} ms")
+
 
 if __name__ == "__main__":
+    import sys
+    if "--bench" in sys.argv:
+        benchmark()
+        benchmark_duplikata()
+        benchmark_brisanja()
+        benchmark_vcard()
+        sys.exit()
     root = tk.Tk()
     app = ImenikApp(root)
     root.mainloop()
@@ -0,0 +1,261 @@
+# SQLite spremište za imenik
+#
+# Umjesto da se kontakti.csv pri svakom spremanju prepisuje cijeli, a pri
+# pokretanju cijeli učitava u Kontakt objekte, kontakti stoje u SQLite bazi:
+# svaka promjena je jedna mala transakcija (WAL dnevnik, bez prepisivanja
+# datoteke), a Listbox dobiva kontakte u stranicama po id-u, pa pokretanje i
+# spremanje ne ovise o broju kontakata. Pretraga je po početku imena ili
+# emaila (indeks), ne po bilo kojem dijelu teksta kao u imenik.py.
+#
+#   python imenik_baza.py                      – imenik nad kontakti.db
+#   python imenik_baza.py --migriraj [csv] [db] – uvoz postojećeg kontakti.csv
+#   python imenik_baza.py --bench
+
+import csv
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tkinter as tk
+from itertools import islice
+
+from imenik import Deduplikator, ImenikApp, Kontakt, _primjer_kontakata
+
+_KRAJ = "\U0010ffff"    # veći od svakog znaka – gornja granica raspona prefiksa
+
+_SHEMA = """
+CREATE TABLE IF NOT EXISTS kontakti (
+    id INTEGER PRIMARY KEY,
+    ime TEXT NOT NULL COLLATE NOCASE,
+    email TEXT NOT NULL COLLATE NOCASE,
+    telefon TEXT NOT NULL,
+    kljuc TEXT NOT NULL UNIQUE          -- Deduplikator.kljuc(): email + telefon
+);
+CREATE INDEX IF NOT EXISTS kontakti_ime ON kontakti (ime);
+CREATE INDEX IF NOT EXISTS kontakti_email ON kontakti (email);
+"""
+
+# duplikat (isti ključ) samo nadopunjuje prazno ime, kao Deduplikator.spoji_u()
+_UMETNI = """
+INSERT INTO kontakti (ime, email, telefon, kljuc) VALUES (?, ?, ?, ?)
+ON CONFLICT (kljuc) DO UPDATE SET ime = excluded.ime
+WHERE trim(kontakti.ime) = '' AND trim(excluded.ime) <> ''
+"""
+
+
+class BazaKontakata:
+    """Kontakti u SQLite bazi, s istim id-evima kao SpremisteKontakata.
+
+    Id je rowid retka i ne mijenja se dok kontakt postoji. Duplikati se
+    prepoznaju po istom ključu kao u Deduplikatoru (UNIQUE stupac kljuc).
+    Pretraga je po početku imena ili emaila (indeksi s NOCASE, koji
+    zanemaruje velika/mala slova samo za ASCII znakove).
+    """
+
+    def __init__(self, putanja="kontakti.db"):
+        self.putanja = putanja
+        self.veza = sqlite3.connect(putanja)
+        self.veza.execute("PRAGMA journal_mode=WAL")
+        self.veza.execute("PRAGMA synchronous=NORMAL")     # u WAL načinu ne gubi konzistentnost
+        self.veza.executescript(_SHEMA)
+
+    def zatvori(self):
+        self.veza.close()
+
+    def dodaj(self, k):
+        """Dodaje kontakt; vraća (id, None) ili (id, postojeci) ako je duplikat."""
+        with self.veza:
+            red = self.veza.execute("SELECT id, ime, email, telefon FROM kontakti WHERE kljuc = ?",
+                                    (Deduplikator.kljuc(k),)).fetchone()
+            if red is None:
+                kursor = self.veza.execute("INSERT INTO kontakti (ime, email, telefon, kljuc) VALUES (?, ?, ?, ?)",
+                                           (k.ime, k.email, k.telefon, Deduplikator.kljuc(k)))
+                return kursor.lastrowid, None
+            postojeci = Kontakt(*red[1:])
+            if Deduplikator.spoji_u(postojeci, k):
+                self.veza.execute("UPDATE kontakti SET ime = ? WHERE id = ?", (postojeci.ime, red[0]))
+            return red[0], postojeci
+
+    def dodaj_sve(self, kontakti, velicina_serije=10000):
+        """Dodaje niz kontakata u serijama (jedna transakcija po seriji); vraća (dodano, spojeno)."""
+        prvi_id = self.veza.execute("SELECT coalesce(max(id), 0) FROM kontakti").fetchone()[0]
+        redci = ((k.ime, k.email, k.telefon, Deduplikator.kljuc(k)) for k in kontakti)
+        ukupno = 0
+        while serija := list(islice(redci, velicina_serije)):
+            with self.veza:
+                self.veza.executemany(_UMETNI, serija)
+            ukupno += len(serija)
+        dodano = self.veza.execute("SELECT count(*) FROM kontakti WHERE id > ?", (prvi_id,)).fetchone()[0]
+        return dodano, ukupno - dodano
+
+    def obrisi(self, idevi):
+        with self.veza:
+            self.veza.executemany("DELETE FROM kontakti WHERE id = ?", ((id_,) for id_ in idevi))
+
+    def spremi(self):
+        # promjene su već zapisane; prenosi WAL u glavnu datoteku ako nitko ne čita
+        self.veza.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def stranica(self, nakon_id=0, velicina=500):
+        """Sljedećih `velicina` kontakata s id-em većim od nakon_id, kao (id, Kontakt)."""
+        kursor = self.veza.execute("SELECT id, ime, email, telefon FROM kontakti WHERE id > ? ORDER BY id LIMIT ?",
+                                   (nakon_id, velicina))
+        return [(red[0], Kontakt(*red[1:])) for red in kursor]
+
+    def broj(self):
+        return self.veza.execute("SELECT count(*) FROM kontakti").fetchone()[0]
+
+    def svi_kontakti(self, velicina_stranice=10000):
+        """Generator svih kontakata po id-u.
+
+        Otvara vlastitu vezu tek kad se počne čitati, pa ga smije trošiti
+        druga dretva (npr. izvoz u vCard) dok aplikacija radi s bazom.
+        """
+        veza = sqlite3.connect(self.putanja)
+        try:
+            nakon_id = 0
+            while redci := veza.execute("SELECT id, ime, email, telefon FROM kontakti WHERE id > ? "
+                                        "ORDER BY id LIMIT ?", (nakon_id, velicina_stranice)).fetchall():
+                for red in redci:
+                    yield Kontakt(*red[1:])
+                nakon_id = redci[-1][0]
+        finally:
+            veza.close()
+
+    def trazi(self, upit, najvise=1000):
+        """Kontakti čije ime ili email počinje upitom, kao (id, Kontakt) – po imenu pa po emailu."""
+        rezultat = {}
+        for stupac in ("ime", "email"):
+            kursor = self.veza.execute(
+                f"SELECT id, ime, email, telefon FROM kontakti WHERE {stupac} >= ? AND {stupac} < ? "
+                f"ORDER BY {stupac} LIMIT ?", (upit, upit + _KRAJ, najvise))
+            for red in kursor:
+                rezultat.setdefault(red[0], Kontakt(*red[1:]))
+        return list(islice(rezultat.items(), najvise))
+
+
+def migriraj(putanja_csv, baza):
+    """Uvozi kontakti.csv u bazu, čitajući redak po redak; vraća (dodano, spojeno)."""
+    with open(putanja_csv, "r", newline="", encoding="utf-8") as f:
+        return baza.dodaj_sve(Kontakt(r[0], r[1], r[2]) for r in csv.reader(f))
+
+
+class ImenikBazaApp(ImenikApp):
+    """ImenikApp nad BazaKontakata: Listbox se puni stranicama dok se lista."""
+
+    STRANICA = 500
+
+    def __init__(self, root, baza):
+        self.baza = baza
+        self.zadnji_id = 0
+        self.sve_ucitano = False
+        super().__init__(root)
+        self.root.title("Digitalni imenik (SQLite)")
+        # baza traži početak imena ili emaila, a ImenikApp bilo koji dio imena, emaila ili telefona
+        self.l_trazi.config(text="Traži (početak imena ili emaila):")
+        self.listbox.config(yscrollcommand=self._na_pomak)
+
+    def _na_pomak(self, prvi, zadnji):
+        self.scrollbar.set(prvi, zadnji)
+        if float(zadnji) > 0.9 and not self.sve_ucitano:
+            self._ucitaj_stranicu()
+
+    def _ucitaj_stranicu(self):
+        redci = self.baza.stranica(self.zadnji_id, self.STRANICA)
+        self.sve_ucitano = len(redci) < self.STRANICA
+        if redci:
+            self.zadnji_id = redci[-1][0]
+        self._prikazi(redci)
+
+    def _prikazi(self, redci):
+        if redci:
+            self.prikazani_id.extend(id_ for id_, _ in redci)
+            self.listbox.insert(tk.END, *(str(k) for _, k in redci))
+
+    def _unesi(self, k):
+        _, postojeci = self.baza.dodaj(k)
+        self.osvjezi()
+        if postojeci is None:
+            return "Kontakt dodan."
+        return f"Kontakt već postoji ({postojeci.ime}) – spojeno."
+
+    def _obrisi_kontakte(self, idevi):
+        self.baza.obrisi(idevi)
+
+    def _uvezi_seriju(self, kontakti):
+        return self.baza.dodaj_sve(kontakti)[1]
+
+    def _kontakti_za_izvoz(self):
+        return self.baza.svi_kontakti(), self.baza.broj()
+
+    def spremi(self):
+        self.baza.spremi()
+        self.status.config(text="Sve promjene su spremljene u bazu.")
+
+    def ucitaj(self):
+        self.osvjezi()
+
+    @staticmethod
+    def _kljuc_prikaza(upit):
+        return upit     # baza traži i po jednom znaku
+
+    def osvjezi(self):
+        upit = self.upit.get().strip()
+        self.listbox.delete(0, tk.END)
+        self.prikazani_id = self.prikazani_id[:0]
+        if upit:
+            self.sve_ucitano = True
+            self._prikazi(self.baza.trazi(upit))
+        else:
+            self.zadnji_id = 0
+            self._ucitaj_stranicu()
+
+
+def benchmark(n=1_000_000):
+    with tempfile.TemporaryDirectory() as mapa:
+        putanja = os.path.join(mapa, "kontakti.db")
+        baza = BazaKontakata(putanja)
+        t = time.perf_counter()
+        dodano, spojeno = baza.dodaj_sve(_primjer_kontakata(n))
+        print(f"{n} kontakata: uvoz {time.perf_counter() - t:.2f} s ({dodano} dodano, {spojeno} spojeno)")
+        baza.zatvori()
+
+        t = time.perf_counter()
+        baza = BazaKontakata(putanja)
+        stranica = baza.stranica()
+        print(f"  otvaranje baze i prva stranica ({len(stranica)}): {(time.perf_counter() - t) * 1e3:.2f} ms")
+        t = time.perf_counter()
+        stranica = baza.stranica(n // 2)
+        print(f"  stranica iz sredine: {(time.perf_counter() - t) * 1e3:.2f} ms")
+        t = time.perf_counter()
+        baza.dodaj(Kontakt("Nova Osoba", "nova@primjer.hr", "099 1234567"))
+        baza.spremi()
+        print(f"  dodavanje i spremanje jednog kontakta: {(time.perf_counter() - t) * 1e3:.2f} ms")
+        for upit in ["Osoba12345", "osoba777", "nova@"]:
+            t = time.perf_counter()
+            rezultat = baza.trazi(upit)
+            print(f"  trazi({upit!r}): {len(rezultat)} rezultata, {(time.perf_counter() - t) * 1e3:.2f} ms")
+        t = time.perf_counter()
+        baza.obrisi(range(1, 10_001))
+        print(f"  brisanje 10000 kontakata: {(time.perf_counter() - t) * 1e3:.1f} ms")
+        baza.zatvori()
+
+
+if __name__ == "__main__":
+    if "--bench" in sys.argv:
+        benchmark()
+        sys.exit()
+    if "--migriraj" in sys.argv:
+        argumenti = sys.argv[sys.argv.index("--migriraj") + 1:]
+        putanja_csv = argumenti[0] if argumenti else "kontakti.csv"
+        baza = BazaKontakata(argumenti[1] if len(argumenti) > 1 else "kontakti.db")
+        dodano, spojeno = migriraj(putanja_csv, baza)
+        baza.zatvori()
+        print(f"Uvezeno {dodano} kontakata iz {putanja_csv}, spojeno duplikata: {spojeno}")
+        sys.exit()
+    baza = BazaKontakata()
+    root = tk.Tk()
+    app = ImenikBazaApp(root, baza)
+    root.mainloop()
+    baza.zatvori()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Kviz znanja - poslužitelj za više istovremenih kvizova (asyncio, bez Tk-a)
+
+Koristi isti model (Pitanje) i ista pravila bodovanja (AnswerKey) kao
+kviz_znanja.py, ali svaka sesija ima svoje stanje, pa jedan proces vodi
+tisuće kvizova odjednom. Isti JSON API dostupan je preko HTTP-a i preko
+WebSocketa (/ws):
+
+    POST /sessions                {"count": 5}            -> {"session", "count"}
+    GET  /sessions/<id>/question?index=k                  -> {"index", "tip", "tekst", "opcije"}
+    POST /sessions/<id>/answer    {"index": k, "answer": v}
+    POST /sessions/<id>/finish                            -> {"correct", "total", "percent"}
+
+    WebSocket: {"op": "start" | "question" | "answer" | "finish", "session": id, ...}
+
+    python kviz_server.py [--port 8765] [--bank pitanja.json|.kvb] [--log pokusaji] [--fsync interval]
+    python kviz_server.py --load [--sessions 2000] [--concurrency 500] [--ws]
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import sys
+import time
+from array import array
+
+from kviz_znanja import AnswerKey, AttemptLog, BINARY_SUFFIX, BinaryBank, _sample_bank, attempt_record, iter_bank_file
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+_MAX_BODY = 1 << 16         # bytes of an HTTP body; API calls are a few dozen
+_MAX_MESSAGE = 1 << 16      # bytes of a WebSocket frame payload
+
+
+# ========== Sessions ==========
+class QuizSession:
+    """State of one quiz: indices of its questions in the bank and the answers.
+
+    Answers are stored as answer + 1 (0 = unanswered) in a bytearray, so a
+    5-question session is a few hundred bytes instead of lists of objects.
+    """
+
+    __slots__ = ("questions", "answers", "last_used", "started")
+
+    def __init__(self, questions):
+        self.questions = array("I", questions)
+        self.answers = bytearray(len(questions))
+        self.last_used = time.monotonic()
+        self.started = time.time()
+
+
+class QuizServer:
+    def __init__(self, bank, max_idle=3600, log=None):
+        self.bank = bank
+        self.sessions = {}
+        self.next_id = 1
+        self.max_idle = max_idle
+        self.log = log          # AttemptLog for finished sessions, or None
+
+    # --- API, shared by HTTP and WebSocket ---
+    def start(self, count=5):
+        count = max(1, min(int(count), len(self.bank)))
+        session_id = self.next_id
+        self.next_id += 1
+        self.sessions[session_id] = QuizSession(random.sample(range(len(self.bank)), count))
+        return {"session": session_id, "count": count}
+
+    def question(self, session, index):
+        q = self.bank[session.questions[_position(session, index)]]
+        return {"index": index, "tip": q.tip, "tekst": q.tekst, "opcije": getattr(q, "opcije", None)}
+
+    def answer(self, session, index, answer):
+        session.answers[_position(session, index)] = int(answer) + 1
+        return {"index": index}
+
+    def finish(self, session_id, session):
+        # the same rules as KvizApp.finish_quiz
+        questions = [self.bank[j] for j in session.questions]
+        sheet = [a - 1 for a in session.answers]
+        report = AnswerKey(questions).grade([sheet])
+        del self.sessions[session_id]
+        correct = int(report.scores[0])
+        if self.log is not None:
+            self.log.record(attempt_record(questions, sheet, correct, session.started, time.time(), "server"))
+        return {"correct": correct, "total": report.question_count, "percent": report.percentages()[0]}
+
+    def dispatch(self, op, session_id=None, **params):
+        """Run one API call; raises KeyError/IndexError/ValueError for bad requests."""
+        if op == "start":
+            return self.start(params.get("count", 5))
+        session = self.sessions[int(session_id)]
+        session.last_used = time.monotonic()
+        if op == "question":
+            return self.question(session, int(params["index"]))
+        if op == "answer":
+            return self.answer(session, int(params["index"]), params["answer"])
+        if op == "finish":
+            return self.finish(int(session_id), session)
+        raise ValueError(f"Nepoznata operacija {op!r}")
+
+    async def expire_idle(self, every=60):
+        while True:
+            await asyncio.sleep(every)
+            limit = time.monotonic() - self.max_idle
+            for session_id in [s for s, session in self.sessions.items() if session.last_used < limit]:
+                del self.sessions[session_id]
+
+    # --- HTTP ---
+    def _route(self, method, target, body):
+        path, _, query = target.partition("?")
+        parts = [p for p in path.split("/") if p]
+        params = dict(p.split("=", 1) for p in query.split("&") if "=" in p)
+        if body:
+            params.update(_json_object(body))
+        if method == "POST" and parts == ["sessions"]:
+            return self.dispatch("start", **params)
+        if len(parts) == 3 and parts[0] == "sessions":
+            op = {("GET", "question"), ("POST", "answer"), ("POST", "finish")}
+            if (method, parts[2]) in op:
+                return self.dispatch(parts[2], parts[1], **params)
+        raise KeyError(path)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    # no end of the headers within the reader's limit (64 KiB)
+                    self._respond(writer, 400, {"error": "zaglavlje je predugo"})
+                    await writer.drain()
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, _ = request_line.split(" ", 2)
+                    headers = {}
+                    for line in header_lines:
+                        if ":" in line:
+                            name, value = line.split(":", 1)
+                            headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                    if not 0 <= length <= _MAX_BODY:
+                        raise ValueError(length)
+                except ValueError:
+                    # the rest of the stream cannot be framed, so the connection ends here
+                    self._respond(writer, 400, {"error": "neispravan zahtjev"})
+                    await writer.drain()
+                    return
+                if headers.get("upgrade", "").lower() == "websocket":
+                    if "sec-websocket-key" not in headers:
+                        self._respond(writer, 400, {"error": "nedostaje Sec-WebSocket-Key"})
+                        await writer.drain()
+                    else:
+                        await self._websocket(reader, writer, headers)
+                    return
+                try:
+                    body = await reader.readexactly(length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                try:
+                    status, result = 200, self._route(method, target, body)
+                except (KeyError, IndexError):
+                    status, result = 404, {"error": "nije pronađeno"}
+                except (ValueError, TypeError) as e:
+                    status, result = 400, {"error": str(e)}
+                self._respond(writer, status, result)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, result):
+        data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+
+    # --- WebSocket ---
+    async def _websocket(self, reader, writer, headers):
+        accept = base64.b64encode(hashlib.sha1(headers["sec-websocket-key"].encode() + _WS_GUID).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        while True:
+            try:
+                opcode, payload = await read_frame(reader, _MAX_MESSAGE)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except FrameError as e:
+                writer.write(encode_frame(8, struct.pack("!H", e.code)))
+                await writer.drain()
+                return
+            if opcode == 8:         # close
+                writer.write(encode_frame(8, b""))
+                await writer.drain()
+                return
+            if opcode == 9:         # ping
+                writer.write(encode_frame(10, payload))
+                continue
+            if opcode != 1:
+                continue
+            try:
+                message = _json_object(payload)
+                result = self.dispatch(message.pop("op"), message.pop("session", None), **message)
+            except (KeyError, IndexError, ValueError, TypeError) as e:
+                result = {"error": f"{type(e).__name__}: {e}"}
+            writer.write(encode_frame(1, json.dumps(result, ensure_ascii=False).encode("utf-8")))
+            await writer.drain()
+
+
+def _position(session, index):
+    # a negative index would silently count from the end of the session
+    index = int(index)
+    if not 0 <= index < len(session.questions):
+        raise IndexError(f"Kviz nema pitanje {index}")
+    return index
+
+
+def _json_object(data):
+    message = json.loads(data)
+    if not isinstance(message, dict):
+        raise ValueError("Poruka mora biti JSON objekt")
+    return message
+
+
+# ========== WebSocket frames (RFC 6455) ==========
+class FrameError(ValueError):
+    """A frame that is not accepted; `code` is the close code to answer with."""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+async def read_frame(reader, max_length=None):
+    """(opcode, payload) of the next frame. Fragmented messages are not
+    supported, and a payload over max_length is refused before it is read."""
+    first, second = await reader.readexactly(2)
+    if not first & 0x80 or first & 0x0F == 0:
+        raise FrameError("fragmentirane poruke nisu podržane", 1003)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    if max_length is not None and length > max_length:
+        raise FrameError(f"okvir od {length} bajtova je prevelik", 1009)
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = _apply_mask(payload, mask)
+    return first & 0x0F, payload
+
+
+def encode_frame(opcode, payload, mask=None):
+    """A single final frame; clients must pass a 4-byte mask, the server must not."""
+    length = len(payload)
+    if length < 126:
+        head = struct.pack("!BB", 0x80 | opcode, length | (0x80 if mask else 0))
+    elif length < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126 | (0x80 if mask else 0), length)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127 | (0x80 if mask else 0), length)
+    if mask:
+        return head + mask + _apply_mask(payload, mask)
+    return head + payload
+
+
+def _apply_mask(payload, mask):
+    # XOR of the whole payload at once, as one big integer
+    n = len(payload)
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+
+
+# ========== Load generator ==========
+class _HttpClient:
+    def __init__(self, reader, writer, host):
+        self.reader, self.writer, self.host = reader, writer, host
+
+    async def call(self, op, session=None, **params):
+        if op == "start":
+            method, target = "POST", "/sessions"
+        elif op == "question":
+            method, target = "GET", f"/sessions/{session}/question?index={params.pop('index')}"
+        else:
+            method, target = "POST", f"/sessions/{session}/{op}"
+        body = json.dumps(params).encode() if params else b""
+        self.writer.write(f"{method} {target} HTTP/1.1\r\nHost: {self.host}\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        return json.loads(await self.reader.readexactly(length))
+
+
+class _WebSocketClient:
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+
+    async def handshake(self, host):
+        key = base64.b64encode(random.randbytes(16)).decode()
+        self.writer.write(f"GET /ws HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode("latin-1"))
+        await self.reader.readuntil(b"\r\n\r\n")
+
+    async def call(self, op, session=None, **params):
+        message = json.dumps({"op": op, "session": session, **params}).encode()
+        self.writer.write(encode_frame(1, message, random.randbytes(4)))
+        _, payload = await read_frame(self.reader)
+        return json.loads(payload)
+
+
+async def _virtual_user(host, port, rounds, latencies, websocket):
+    reader, writer = await asyncio.open_connection(host, port)
+    if websocket:
+        client = _WebSocketClient(reader, writer)
+        await client.handshake(host)
+    else:
+        client = _HttpClient(reader, writer, host)
+
+    async def timed(op, session=None, **params):
+        t = time.perf_counter()
+        result = await client.call(op, session, **params)
+        latencies.append(time.perf_counter() - t)
+        return result
+
+    try:
+        for _ in range(rounds):
+            started = await timed("start", count=5)
+            session = started["session"]
+            for index in range(started["count"]):
+                q = await timed("question", session, index=index)
+                await timed("answer", session, index=index,
+                            answer=random.randrange(4) if q["tip"] == "MCQ" else random.randrange(2))
+            await timed("finish", session)
+    finally:
+        writer.close()
+
+
+def _percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+async def run_load(host="127.0.0.1", port=8765, sessions=2000, concurrency=500, websocket=False, server=None):
+    """Play `sessions` quizzes over `concurrency` connections and report request latency."""
+    if server is not None:
+        tcp = await asyncio.start_server(server.handle_connection, host, port, backlog=concurrency)
+    latencies = []
+    t = time.perf_counter()
+    rounds = [sessions // concurrency + (i < sessions % concurrency) for i in range(concurrency)]
+    await asyncio.gather(*(_virtual_user(host, port, r, latencies, websocket) for r in rounds if r))
+    elapsed = time.perf_counter() - t
+    if server is not None:
+        tcp.close()
+        await tcp.wait_closed()
+    latencies.sort()
+    print(f"{sessions} kvizova preko {concurrency} veza ({'WebSocket' if websocket else 'HTTP'}): "
+          f"{len(latencies)} zahtjeva za {elapsed:.2f} s ({len(latencies) / elapsed:,.0f} zahtjeva/s), "
+          f"p50 {_percentile(latencies, 50) * 1e3:.2f} ms, p99 {_percentile(latencies, 99) * 1e3:.2f} ms")
+
+
+# ========== Run ==========
+def _option(name, default):
+    return type(default)(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+
+def main():
+    bank_path = _option("--bank", "")
+    if not bank_path:
+        bank = list(_sample_bank(1000))
+    elif bank_path.endswith(BINARY_SUFFIX):
+        bank = BinaryBank(bank_path)
+    else:
+        bank = list(iter_bank_file(bank_path))
+    log_folder = _option("--log", "")
+    log = AttemptLog(log_folder, fsync=_option("--fsync", "interval")) if log_folder else None
+    server = QuizServer(bank, log=log)
+    host, port = _option("--host", "127.0.0.1"), _option("--port", 8765)
+    if "--load" in sys.argv:
+        asyncio.run(run_load(host, port, _option("--sessions", 2000), _option("--concurrency", 500),
+                             "--ws" in sys.argv, server=None if "--external" in sys.argv else server))
+        return
+
+    async def serve():
+        tcp = await asyncio.start_server(server.handle_connection, host, port, backlog=1024)
+        print(f"Kviz poslužitelj na http://{host}:{port} ({len(bank)} pitanja)")
+        asyncio.get_running_loop().create_task(server.expire_idle())
+        async with tcp:
+            await tcp.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
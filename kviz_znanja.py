@@ -13,10 +13,33 @@ Funkcionalnosti:
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import atexit
+import hashlib
+import heapq
 import json
+import math
+import mmap
+import os
+import queue
 import random
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from itertools import chain, compress
+from statistics import NormalDist
 from dataclasses import dataclass, asdict, field
 from typing import List, Optional
+from zlib import crc32
+
+try:
+    import numpy as np
+except ImportError:     # grading falls back to the pure-Python byte engine
+    np = None
 
 # ========== Model ==========
 @dataclass
@@ -66,12 +89,1637 @@ class PitanjeMCQ(Pitanje):
         return f"[MCQ] {self.tekst} (A) {self.opcije[0]} (B) {self.opcije[1]} (C) {self.opcije[2]} (D) {self.opcije[3]} (Točno: {chr(65+self.tocan_index)})"
 
 
+# ========== Grading ==========
+# An answer sheet has one int per question, as in KvizApp.user_answers:
+# 1/0 for TF (True/False), the option index for MCQ and -1 if unanswered.
+
+def expected_answer(q):
+    return (1 if q.tocan else 0) if q.tip == "TF" else q.tocan_index
+
+
+@dataclass
+class GradeReport:
+    scores: Sequence            # correct answers per sheet (a NumPy array when NumPy is available)
+    correct_rate: List[float]   # share of sheets that answered each question correctly
+    question_count: int
+
+    def percentages(self):
+        return [s * 100 / self.question_count if self.question_count else 0.0 for s in self.scores]
+
+
+class AnswerKey:
+    """Expected answers of a list of questions, compiled once to grade many sheets.
+
+    With NumPy the sheets become one int16 matrix compared against the key in
+    a single vectorized operation. Without it every sheet is stored as bytes
+    (answer + 1, so unanswered is 0) and each question's column is processed
+    at C speed with bytes slicing, translate() and count(), see _grade_bytes.
+    """
+
+    def __init__(self, questions):
+        self.answers = array("B", (expected_answer(q) for q in questions))
+        self._hit_tables = None
+
+    def __len__(self):
+        return len(self.answers)
+
+    def grade(self, sheets):
+        """Score answer sheets (rows of a matrix, len(self) answers each)."""
+        if np is not None:
+            return self._grade_numpy(sheets)
+        return self._grade_bytes(sheets)
+
+    def _grade_numpy(self, sheets):
+        nq = len(self.answers)
+        # the same check as _grade_bytes; reshape alone would regroup a wrong-length sheet
+        if isinstance(sheets, np.ndarray) and sheets.ndim == 2:
+            lengths = [sheets.shape[1]]
+        else:
+            sheets = list(sheets)
+            lengths = map(len, sheets)
+        for n in lengths:
+            if n != nq:
+                raise _wrong_length(nq, n)
+        matrix = np.asarray(sheets, dtype=np.int16).reshape(-1, nq)
+        hits = matrix == np.frombuffer(self.answers, dtype=np.uint8)
+        rates = hits.mean(axis=0).tolist() if len(matrix) else [0.0] * nq
+        return GradeReport(hits.sum(axis=1), rates, nq)
+
+    def _grade_bytes(self, sheets):
+        nq = len(self.answers)
+        flat = bytearray()
+        count = 0
+        for row in sheets:
+            if len(row) != nq:
+                raise _wrong_length(nq, len(row))
+            flat.extend(map(_PLUS_ONE, row))
+            count += 1
+        if self._hit_tables is None:
+            # table for question j maps (answer + 1) to 1 if correct, else 0
+            self._hit_tables = [bytes(int(b == a + 1) for b in range(256)) for a in self.answers]
+
+        # Columns are added as big integers with one byte per sheet: each byte
+        # is 0 or 1, so up to 255 columns can be summed without a carry.
+        scores = [0] * count
+        rates = []
+        for start in range(0, nq, 255):
+            total = 0
+            for j in range(start, min(start + 255, nq)):
+                hits = flat[j::nq].translate(self._hit_tables[j])
+                rates.append(hits.count(1) / count if count else 0.0)
+                total += int.from_bytes(hits, "little")
+            part = total.to_bytes(count, "little")
+            scores = list(part) if start == 0 else list(map(int.__add__, scores, part))
+        return GradeReport(array("I", scores), rates, nq)
+
+
+_PLUS_ONE = (1).__add__
+
+
+def _wrong_length(expected, actual):
+    return ValueError(f"List odgovora mora imati {expected} odgovora, a ima {actual}")
+
+
+# ========== Sampling ==========
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted draw (with replacement)."""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("Težine moraju imati pozitivan zbroj")
+        self.prob = array("d", (w * n / total for w in weights))
+        self.alias = array("I", bytes(4 * n))
+        self.positive = sum(1 for w in weights if w > 0)
+        small = [i for i, p in enumerate(self.prob) if p < 1.0]
+        large = [i for i, p in enumerate(self.prob) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.alias[s] = l
+            self.prob[l] -= 1.0 - self.prob[s]
+            (small if self.prob[l] < 1.0 else large).append(l)
+        for i in small + large:     # only rounding errors are left
+            self.prob[i] = 1.0 if weights[i] > 0 else 0.0
+
+    def draw(self, rng):
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class QuestionSampler:
+    """Draws k distinct questions from a bank in O(k) per quiz.
+
+    Everything that depends on the bank size is built once and reused: the
+    buckets of positions per stratum (question type by default, read from
+    the tip column of a BinaryBank without decoding) and, for weighted
+    sampling, an alias table per bucket. The bank itself is never copied.
+    `weights` is a sequence aligned with the bank or a function of a
+    question; `stratum` is a function of a question.
+    """
+
+    def __init__(self, bank, weights=None, stratum=None):
+        self.bank = bank
+        self.weights = weights
+        self.stratum = stratum
+        self._buckets = None
+        self._tables = {}
+
+    def buckets(self):
+        if self._buckets is None:
+            if self.stratum is None and hasattr(self.bank, "positions_by_tip"):
+                self._buckets = self.bank.positions_by_tip()
+            else:
+                key = self.stratum or (lambda q: q.tip)
+                self._buckets = {}
+                for i, q in enumerate(self.bank):
+                    self._buckets.setdefault(key(q), array("I")).append(i)
+        return self._buckets
+
+    def sample(self, k, mix=None, seed=None):
+        """Positions of up to k distinct questions, in random order.
+
+        mix maps strata to shares, e.g. {"MCQ": 60, "TF": 40}; strata with a
+        share of 0 or not listed are left out. If a stratum has too few
+        questions the others make up the difference. The same seed on the
+        same bank always gives the same quiz.
+        """
+        rng = random.Random(seed)
+        if mix is None:
+            positions = self._draw(None, range(len(self.bank)), k, rng)
+        else:
+            buckets = self.buckets()
+            positions = []
+            for label, count in self._allocate(k, mix, buckets).items():
+                positions += self._draw(label, buckets[label], count, rng)
+        rng.shuffle(positions)
+        return positions
+
+    @staticmethod
+    def _allocate(k, mix, buckets):
+        # largest remainder method, capped by the bucket sizes
+        shares = {label: share for label, share in mix.items() if share > 0 and buckets.get(label)}
+        total = sum(shares.values())
+        if not total:
+            return {}
+        wanted = {label: k * share / total for label, share in shares.items()}
+        counts = {label: min(int(w), len(buckets[label])) for label, w in wanted.items()}
+        order = sorted(shares, key=lambda label: wanted[label] - counts[label], reverse=True)
+        missing = k - sum(counts.values())
+        while missing > 0:
+            room = [label for label in order if counts[label] < len(buckets[label])]
+            if not room:
+                break
+            for label in room[:missing]:
+                counts[label] += 1
+                missing -= 1
+        return counts
+
+    def _weights_of(self, positions):
+        if callable(self.weights):
+            return [self.weights(self.bank[i]) for i in positions]
+        return [self.weights[i] for i in positions]
+
+    def _draw(self, label, positions, count, rng):
+        if self.weights is None:
+            return [positions[i] for i in rng.sample(range(len(positions)), min(count, len(positions)))]
+        table = self._tables.get(label)
+        if table is None:
+            table = self._tables[label] = AliasTable(self._weights_of(positions))
+        count = min(count, table.positive)
+        # repeated alias draws, skipping repeats, are weighted sampling without replacement
+        chosen = set()
+        attempts = 0
+        while len(chosen) < count and attempts < 20 * count + 100:
+            chosen.add(table.draw(rng))
+            attempts += 1
+        if len(chosen) < count:
+            # a few questions hold almost all the weight: exact O(n) fallback (Efraimidis-Spirakis)
+            keys = ((rng.random() ** (1 / w), i) for i, w in enumerate(self._weights_of(positions)) if w > 0)
+            chosen = {i for _, i in heapq.nlargest(count, keys)}
+        return [positions[i] for i in sorted(chosen)]
+
+
+# ========== Streaming load ==========
+# The loader runs in a worker thread and puts messages (kind, data, fraction)
+# on a bounded queue: ("batch", (questions, errors), 0.0-1.0), ("done", errors, 1.0)
+# or ("error", exception, fraction). `errors` is a list of (item_number, message).
+
+_WHITESPACE = re.compile(r"\s*")
+_SEPARATOR = re.compile(r"\s*([,\]])\s*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+def iter_json_array(f, chunk_size=1 << 20):
+    """Yield the items of a top-level JSON array from text file f, one at a time.
+
+    Only the current chunk and the item being decoded are held in memory, so
+    the whole document is never parsed into one tree as with json.load().
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    consumed = 0    # characters dropped from the front of buf, for error positions
+
+    def refill():
+        nonlocal buf, pos, eof, consumed
+        chunk = f.read(chunk_size)
+        consumed += pos
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+    def next_char():
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                raise ValueError("Neočekivan kraj datoteke")
+            refill()
+
+    if next_char() != "[":
+        raise ValueError("Datoteka mora sadržavati JSON listu pitanja")
+    pos += 1
+    if next_char() == "]":
+        return
+    while True:
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"Neispravan JSON kod znaka {consumed + e.pos}: {e.msg}") from None
+                refill()
+                continue
+            # a number cut by the chunk end (e.g. "2." or "1e") continues in the next one
+            if not eof and (end == len(buf) or type(item) in (int, float) and _NUMBER_TAIL.fullmatch(buf, end)):
+                refill()
+                continue
+            break
+        pos = end
+        yield item
+        m = _SEPARATOR.match(buf, pos)
+        if m is not None and m.end() < len(buf):
+            pos = m.end()
+            sep = m.group(1)
+        else:
+            sep = next_char()
+            pos += 1
+            if sep == ",":
+                next_char()
+        if sep == "]":
+            return
+        if sep != ",":
+            raise ValueError(f"Očekivan ',' ili ']' kod znaka {consumed + pos - 1}, a ne {sep!r}")
+
+
+def load_questions_in_batches(path, out, cancel, batch_size=2000, first_batch=100):
+    """Worker: parse the bank at path and send batches of Pitanje objects to out.
+
+    A record that is not a valid question is skipped and reported with its
+    position; only a JSON syntax error stops the load.
+    """
+    errors = []
+    batch, batch_errors = [], []
+    try:
+        total = os.path.getsize(path) or 1
+        with open(path, "r", encoding="utf-8") as f:
+            limit = first_batch     # first rows appear immediately regardless of file size
+            for n, item in enumerate(iter_json_array(f), 1):
+                try:
+                    batch.append(Pitanje.from_dict(item))
+                except Exception as e:
+                    batch_errors.append((n, f"{type(e).__name__}: {e}"))
+                if len(batch) + len(batch_errors) >= limit:
+                    if not _put(out, cancel, ("batch", (batch, batch_errors), f.buffer.tell() / total)):
+                        return
+                    errors += batch_errors
+                    batch, batch_errors, limit = [], [], batch_size
+            _put(out, cancel, ("batch", (batch, batch_errors), 1.0))
+            errors += batch_errors
+        _put(out, cancel, ("done", errors, 1.0))
+    except Exception as e:
+        # questions read before the error are kept
+        if _put(out, cancel, ("batch", (batch, batch_errors), 1.0)):
+            _put(out, cancel, ("error", e, 0.0))
+
+
+# ========== Streaming save ==========
+_encode = json.encoder.encode_basestring      # str -> JSON string literal, non-ASCII kept
+
+
+def _question_json(p, nl, step, colon):
+    # nl is the line break + indentation of the question itself ("" when compact)
+    k = nl + step
+    text = "{" + k + '"tip"' + colon + _encode(p.tip) + "," + k + '"tekst"' + colon + _encode(p.tekst)
+    if p.tip == "TF":
+        text += "," + k + '"tocan"' + colon + json.dumps(p.tocan)
+    else:
+        o = k + step
+        opcije = "[" + o + ("," + o).join(map(_encode, p.opcije)) + k + "]" if p.opcije else "[]"
+        text += "," + k + '"opcije"' + colon + opcije + "," + k + '"tocan_index"' + colon + json.dumps(p.tocan_index)
+    return text + nl + "}"
+
+
+def iter_json_chunks(questions, compact=False):
+    """Yield a JSON bank piece by piece, one question at a time.
+
+    The output is the same as json.dump(records, ensure_ascii=False, indent=2)
+    (or with compact separators) for records in the layout the editor has
+    always saved, with "tip" first (to_dict puts "tekst" first), so existing
+    files come out byte for byte. Nothing is built for the whole list.
+    json.dumps(indent=...) falls back to the pure-Python encoder, so the
+    layout is written here and only strings go through the C encoder.
+    """
+    nl, step, colon = ("", "", ":") if compact else ("\n  ", "  ", ": ")
+    first = True
+    for p in questions:
+        yield ("[" if first else ",") + nl + _question_json(p, nl, step, colon)
+        first = False
+    yield "[]" if first else nl[:1] + "]"
+
+
+def write_bank(questions, path, compact=False, progress=None, step=10000):
+    """Write questions to path: binary if it ends with BINARY_SUFFIX, JSON otherwise.
+
+    The file is written to path.tmp, fsynced and renamed over path, so a
+    reader never sees a half-written bank. progress(count) is called every
+    `step` chunks; if it returns False the write stops, path is left
+    untouched and False is returned.
+
+    A BinaryBank cannot be written over the file it maps: the rename would
+    replace a mapped file (an error on Windows) while its strings are still
+    being read. Save it under another name instead.
+    """
+    if isinstance(questions, BinaryBank) and _same_file(questions.path, path):
+        raise ValueError(f"{path} je otvoren; spremite bazu pod drugim imenom")
+    tmp = path + ".tmp"
+    binary = path.endswith(BINARY_SUFFIX)
+    chunks = iter_binary_chunks(questions) if binary else iter_json_chunks(questions, compact)
+    stopped = False
+    try:
+        with (open(tmp, "wb") if binary else open(tmp, "w", encoding="utf-8")) as f:
+            for count, chunk in enumerate(chunks, 1):
+                f.write(chunk)
+                if progress is not None and count % step == 0 and not progress(count):
+                    stopped = True
+                    break
+            f.flush()
+            os.fsync(f.fileno())
+        if stopped:
+            os.remove(tmp)
+            return False
+        os.replace(tmp, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def save_questions_in_background(questions, total, path, out, cancel, compact=False):
+    """Worker: write_bank() that reports ("progress", count, fraction), then
+    ("done", total, 1.0) or ("error", exception, 0.0)."""
+    try:
+        if write_bank(questions, path, compact,
+                      lambda count: _put(out, cancel, ("progress", count, count / max(total, 1)))):
+            _put(out, cancel, ("done", total, 1.0))
+    except Exception as e:
+        _put(out, cancel, ("error", e, 0.0))
+    finally:
+        _release(questions)
+
+
+def _release(questions):
+    """Closes a worker's copy of a BinaryBank so the file can be unmapped."""
+    if isinstance(questions, BinaryBank):
+        questions.close()
+
+
+def _same_file(a, b):
+    return os.path.exists(a) and os.path.exists(b) and os.path.samefile(a, b)
+
+
+# ========== Binary bank ==========
+# Layout of a .kvb file (all integers little-endian):
+#   b"KVZB" + version (uint32)
+#   question strings, one region per question: TF is the UTF-8 tekst; MCQ is
+#     uint32 k, k uint32 lengths, then the k strings (tekst, opcije...)
+#   tip column (1 byte per question: 0 = TF, 1 = MCQ)
+#   answer column (1 byte: tocan for TF, tocan_index for MCQ), zero padding to 8
+#   n + 1 uint64 offsets of the string regions
+#   footer: n (uint64), start of the tip column (uint64)
+
+BINARY_SUFFIX = ".kvb"
+_BINARY_HEADER = b"KVZB" + struct.pack("<I", 1)
+_TIP_CODES = {"TF": 0, "MCQ": 1}
+_TIP_NAMES = {code: tip for tip, code in _TIP_CODES.items()}
+_FOOTER = struct.Struct("<QQ")
+
+
+def iter_binary_chunks(questions):
+    """Yield a .kvb bank piece by piece; only the small columns are kept in memory."""
+    tips, answers = bytearray(), bytearray()
+    offsets = array("Q", [len(_BINARY_HEADER)])
+    yield _BINARY_HEADER
+    for p in questions:
+        if p.tip == "TF":
+            data = p.tekst.encode("utf-8")
+            answers.append(1 if p.tocan else 0)
+        else:
+            strings = [s.encode("utf-8") for s in (p.tekst, *p.opcije)]
+            data = struct.pack(f"<{len(strings) + 1}I", len(strings), *map(len, strings)) + b"".join(strings)
+            answers.append(p.tocan_index)
+        tips.append(_TIP_CODES[p.tip])
+        offsets.append(offsets[-1] + len(data))
+        yield data
+    n, meta = len(tips), offsets[-1]
+    yield bytes(tips) + bytes(answers) + bytes(-(meta + 2 * n) % 8)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    yield offsets.tobytes()
+    yield _FOOTER.pack(n, meta)
+
+
+class BinaryBank(Sequence):
+    """Question bank backed by a memory-mapped .kvb file.
+
+    Opening reads only the footer: the tip and answer columns and the offset
+    index are views into the mapping, and a question's strings are decoded
+    only when bank[i] is accessed. Deleting and appending leave the file
+    alone: the first change creates an order array that maps positions to
+    stored questions, and appended questions stay in memory until saved.
+
+    The mapping stays open until close(); copies share it, and the file is
+    unmapped when the bank and all its copies are closed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(_BINARY_HEADER)] != _BINARY_HEADER:
+            self._mm.close()
+            raise ValueError(f"{path} nije binarna baza pitanja")
+        n, meta = _FOOTER.unpack_from(self._mm, len(self._mm) - _FOOTER.size)
+        view = memoryview(self._mm)
+        self._n = n
+        self._tips = view[meta:meta + n]
+        self._answers = view[meta + n:meta + 2 * n]
+        start = meta + 2 * n + (-(meta + 2 * n) % 8)
+        self._offsets = view[start:start + 8 * (n + 1)].cast("Q")
+        if sys.byteorder != "little":
+            self._offsets = array("Q", self._offsets)
+            self._offsets.byteswap()
+        self._order = None      # None: position i is stored question i
+        self._extra = []        # appended questions, stored index n, n+1, ...
+        self._users = [1]       # open banks sharing the mapping (this one and its copies)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop using the mapping; the last of the bank and its copies to close unmaps the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._users[0] -= 1
+        if self._users[0] == 0:
+            for view in (self._tips, self._answers, self._offsets):
+                if isinstance(view, memoryview):
+                    view.release()
+            self._mm.close()
+
+    def __len__(self):
+        return self._n if self._order is None else len(self._order)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        j = self._stored_index(i)
+        return self._decode(j) if j < self._n else self._extra[j - self._n]
+
+    def __delitem__(self, i):
+        self._materialize_order()
+        del self._order[i]
+
+    def append(self, p):
+        self._materialize_order()
+        self._order.append(self._n + len(self._extra))
+        self._extra.append(p)
+
+    def extend(self, questions):
+        for p in questions:
+            self.append(p)
+
+    def copy(self):
+        """A snapshot that shares the mapping, e.g. for saving in a worker thread."""
+        other = object.__new__(BinaryBank)
+        other.__dict__.update(self.__dict__)
+        other._order = None if self._order is None else array("I", self._order)
+        other._extra = list(self._extra)
+        self._users[0] += 1
+        return other
+
+    def positions_by_tip(self):
+        """{tip: array of positions}, read from the tip column without decoding questions."""
+        if self._order is None:
+            tips = bytes(self._tips)
+            return {tip: array("I", compress(range(self._n), tips.translate(bytes(int(b == code) for b in range(256)))))
+                    for tip, code in _TIP_CODES.items()}
+        result = {tip: array("I") for tip in _TIP_CODES}
+        for pos, j in enumerate(self._order):
+            result[_TIP_NAMES[self._tips[j]] if j < self._n else self._extra[j - self._n].tip].append(pos)
+        return result
+
+    def _stored_index(self, i):
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("indeks pitanja izvan raspona")
+        return i if self._order is None else self._order[i]
+
+    def _materialize_order(self):
+        if self._order is None:
+            self._order = array("I", range(self._n))
+
+    def _decode(self, j):
+        mm = self._mm
+        start, end = self._offsets[j], self._offsets[j + 1]
+        if self._tips[j] == _TIP_CODES["TF"]:
+            return PitanjeTF(mm[start:end].decode("utf-8"), bool(self._answers[j]))
+        k, = struct.unpack_from("<I", mm, start)
+        pos = start + 4 + 4 * k
+        strings = []
+        for length in struct.unpack_from(f"<{k}I", mm, start + 4):
+            strings.append(mm[pos:pos + length].decode("utf-8"))
+            pos += length
+        return PitanjeMCQ(strings[0], strings[1:], self._answers[j])
+
+
+def iter_bank_file(path):
+    """Questions from a .kvb or JSON bank; invalid JSON records are skipped."""
+    if path.endswith(BINARY_SUFFIX):
+        with BinaryBank(path) as bank:
+            yield from bank
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for item in iter_json_array(f):
+            try:
+                yield Pitanje.from_dict(item)
+            except Exception:
+                continue
+
+
+def convert_bank(src, dst, compact=False):
+    """Convert between JSON and .kvb banks (by extension) in one streaming pass."""
+    if _same_file(src, dst):
+        raise ValueError(f"{dst} je isto što i {src}")
+    write_bank(iter_bank_file(src), dst, compact)
+
+
+def _put(out, cancel, message):
+    """Put message on a bounded queue; False if the job was cancelled meanwhile."""
+    while not cancel.is_set():
+        try:
+            out.put(message, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+# ========== Near-duplicates ==========
+# A question is represented by the CRC32 hashes of the 4-byte shingles of its
+# normalized text. Their MinHash signature (one permutation, 30 bins) is
+# split into 10 LSH bands of 3 values; questions that agree on a whole band
+# are candidates, and only candidates are compared exactly (Jaccard of the
+# shingle sets). No pair of questions is compared otherwise.
+
+_SHINGLE = 4
+_BANDS, _ROWS = 10, 3
+_EMPTY_BIN = 1 << 32
+_MAX_CHAIN = 100        # candidates taken per band; keeps boilerplate buckets cheap
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def shingles(tekst):
+    b = _NON_WORD.sub(" ", tekst.casefold()).strip().encode("utf-8")
+    if len(b) <= _SHINGLE:
+        return {crc32(b)}
+    return {crc32(b[i:i + _SHINGLE]) for i in range(len(b) - _SHINGLE + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def minhash(hashes, size=_BANDS * _ROWS):
+    """One-permutation MinHash: the smallest hash in each of `size` bins,
+    empty bins borrowing (with an offset) from the next filled bin."""
+    # in descending order the smallest hash of a bin is written last
+    smallest = {h % size: h for h in sorted(hashes, reverse=True)}
+    sig = [smallest.get(j, _EMPTY_BIN) for j in range(size)]
+    if len(smallest) < size:
+        base = sig[:]
+        for j in range(size):
+            if base[j] == _EMPTY_BIN:
+                d = 1
+                while base[(j + d) % size] == _EMPTY_BIN:
+                    d += 1
+                sig[j] = base[(j + d) % size] + d * _EMPTY_BIN
+    return sig
+
+
+class NearDuplicateIndex:
+    """LSH index over question texts of a bank; lookups touch only matching buckets.
+
+    Each band is a chained hash table kept in arrays: `_heads` maps a bucket
+    to the last slot stored in it and `_next` links a slot to the previous
+    one in the same bucket, so the index costs about 80 bytes per question
+    and adding one is O(bands). As in SearchIndex, `_ids` holds the slots of
+    the questions in bank order, so a slot's bank position is a bisect;
+    remove() only drops the slot from `_ids`, and removed slots are left out
+    of the chains once they outnumber live ones.
+    """
+
+    def __init__(self, bank, threshold=0.6):
+        self.bank = bank
+        self.threshold = threshold
+        self._ids = array("I")          # slot of each bank position, ascending
+        self._alive = bytearray()       # per slot: 0 once removed
+        self._dead = 0
+        self._keys = [array("I") for _ in range(_BANDS)]
+        self._next = [array("i") for _ in range(_BANDS)]
+        self._heads = [array("i", [-1]) * 1024 for _ in range(_BANDS)]
+
+    @classmethod
+    def build(cls, bank, threshold=0.6, cancel=None):
+        """Index of the whole bank, or None if `cancel` (an Event) gets set meanwhile."""
+        index = cls(bank, threshold)
+        for i, q in enumerate(bank):
+            if cancel is not None and i % 10000 == 0 and cancel.is_set():
+                return None
+            index._insert(minhash(shingles(q.tekst)))
+        return index
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, position):
+        """Indexes bank[position], the question appended at the end of the bank."""
+        if position != len(self._ids):
+            raise ValueError(f"pitanje {position} nije na kraju indeksa ({len(self._ids)})")
+        self._insert(minhash(shingles(self.bank[position].tekst)))
+
+    def remove(self, position):
+        """Forgets the question at bank position `position`, before it is deleted from the bank."""
+        self._alive[self._ids.pop(position)] = 0
+        self._dead += 1
+        if self._dead > max(len(self._ids), 10000):
+            self._compact()
+
+    def similar(self, tekst, limit=10):
+        """[(position, similarity)] of indexed questions similar to tekst, most similar first."""
+        hashes = shingles(tekst)
+        return self._matches(hashes, minhash(hashes), limit)
+
+    def _band_keys(self, sig):
+        return [hash(tuple(sig[b * _ROWS:(b + 1) * _ROWS])) & 0xFFFFFFFF for b in range(_BANDS)]
+
+    def _insert(self, sig):
+        slot = len(self._alive)
+        if slot >= len(self._heads[0]):
+            self._rehash(len(self._heads[0]) * 2)
+        self._ids.append(slot)
+        self._alive.append(1)
+        mask = len(self._heads[0]) - 1
+        for heads, keys, nexts, key in zip(self._heads, self._keys, self._next, self._band_keys(sig)):
+            keys.append(key)
+            nexts.append(heads[key & mask])
+            heads[key & mask] = slot
+
+    def _rehash(self, size):
+        for b in range(_BANDS):
+            heads = array("i", [-1]) * size
+            nexts = self._next[b]
+            for slot, key in enumerate(self._keys[b]):
+                nexts[slot] = heads[key & (size - 1)]
+                heads[key & (size - 1)] = slot
+            self._heads[b] = heads
+
+    def _compact(self):
+        # live slots are renumbered 0, 1, ... in bank order
+        self._keys = [array("I", (keys[slot] for slot in self._ids)) for keys in self._keys]
+        self._next = [array("i", bytes(4 * len(self._ids))) for _ in range(_BANDS)]
+        self._ids = array("I", range(len(self._ids)))
+        self._alive = bytearray([1]) * len(self._ids)
+        self._dead = 0
+        self._rehash(len(self._heads[0]))
+
+    def _candidates(self, sig):
+        mask = len(self._heads[0]) - 1
+        alive = self._alive
+        found = set()
+        for heads, keys, nexts, key in zip(self._heads, self._keys, self._next, self._band_keys(sig)):
+            slot, seen = heads[key & mask], 0
+            while slot >= 0 and seen < _MAX_CHAIN:
+                if keys[slot] == key and alive[slot]:
+                    found.add(slot)
+                    seen += 1
+                slot = nexts[slot]
+        return found
+
+    def _matches(self, hashes, sig, limit=None):
+        result = []
+        for slot in self._candidates(sig):
+            position = bisect_left(self._ids, slot)
+            similarity = jaccard(hashes, shingles(self.bank[position].tekst))
+            if similarity >= self.threshold:
+                result.append((position, similarity))
+        result.sort(key=lambda m: (-m[1], m[0]))
+        return result[:limit]
+
+
+def near_duplicate_groups(bank, threshold=0.6, progress=None, step=10000):
+    """Groups of near-duplicate questions as lists of positions, first occurrence first.
+
+    One pass over the bank: a question similar to an earlier one joins that
+    question's group, otherwise it is indexed as the start of a new group.
+    Only group leaders are indexed, so a large cluster of duplicates does
+    not slow down later lookups. progress(count) is called every `step`
+    questions; returning False stops the scan (the result is then None).
+    """
+    leaders, positions = [], []     # the index's bank is the leaders; positions maps them back
+    index = NearDuplicateIndex(leaders, threshold)
+    groups = {}
+    for i, q in enumerate(bank):
+        if progress is not None and i % step == 0 and i and progress(i) is False:
+            return None
+        hashes = shingles(q.tekst)
+        sig = minhash(hashes)
+        match = index._matches(hashes, sig, 1)
+        if match:
+            leader = positions[match[0][0]]
+            groups.setdefault(leader, [leader]).append(i)
+        else:
+            leaders.append(q)
+            positions.append(i)
+            index._insert(sig)
+    return list(groups.values())
+
+
+def find_duplicates_in_background(questions, out, cancel, threshold=0.6):
+    """Worker: near_duplicate_groups() that reports ("progress", count, fraction),
+    then ("done", groups, 1.0) or ("error", exception, 0.0)."""
+    total = max(len(questions), 1)
+    try:
+        groups = near_duplicate_groups(questions, threshold,
+                                       lambda count: _put(out, cancel, ("progress", count, count / total)))
+        if groups is not None:
+            _put(out, cancel, ("done", groups, 1.0))
+    except Exception as e:
+        _put(out, cancel, ("error", e, 0.0))
+    finally:
+        _release(questions)
+
+
+# ========== Search ==========
+# Inverted index over tekst and MCQ opcije. Questions get increasing internal
+# ids; a posting is id << 2 | fields (1 = word in tekst, 2 = in opcije), so
+# every posting list is sorted by id. `_ids` holds the ids of the questions
+# in bank order, which makes a bank position bisect_left(_ids, id).
+
+_TOKEN = re.compile(r"\w+")
+_FIELD_WEIGHTS = (0.0, 1.0, 0.5, 1.5)      # by the field bits of a posting
+_BM25_K1, _BM25_B = 1.2, 0.75
+_MAX_PREFIX_TERMS = 50      # words a prefix (the last, unfinished word) expands to
+_MAX_SCAN = 5000            # postings scored without NumPy; more makes the result approximate
+
+
+@dataclass
+class SearchResult:
+    positions: Sequence     # bank positions, best match first
+    total: int              # matching questions (at least this many when not complete)
+    complete: bool = True
+
+
+def question_tokens(q):
+    """{word: fields} of a question, with the field bits used in postings."""
+    tokens = dict.fromkeys(_TOKEN.findall(q.tekst.casefold()), 1)
+    if q.tip == "MCQ":
+        for word in _TOKEN.findall(" ".join(q.opcije).casefold()):
+            tokens[word] = tokens.get(word, 0) | 2
+    return tokens
+
+
+class SearchIndex:
+    """Ranked full-text search (BM25 with a weight per field) over a question bank.
+
+    Kept in step with the bank by add()/extend() for appended questions and
+    remove() for deleted ones. A removed question only loses its id; its
+    postings are dropped lazily, once removed ids outnumber live ones.
+    All words of a query must match; the last one also matches as a prefix
+    while it is being typed.
+    """
+
+    def __init__(self):
+        self._postings = {}             # word -> array("I") of postings
+        self._ids = array("I")          # internal id of each bank position
+        self._alive = bytearray()       # per id
+        self._lengths = array("H")      # words per id, for BM25 length normalization
+        self._total_length = 0
+        self._dead = 0
+        self._vocabulary = []           # sorted words, for prefix lookups
+        self._new_words = set()         # words not merged into _vocabulary yet
+
+    @classmethod
+    def build(cls, bank, cancel=None):
+        """Index of the whole bank, or None if `cancel` (an Event) gets set meanwhile."""
+        index = cls()
+        for i, q in enumerate(bank):
+            if cancel is not None and i % 10000 == 0 and cancel.is_set():
+                return None
+            index.add(q)
+        index._merge_vocabulary()
+        return index
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, q):
+        """Indexes q as the question appended at the end of the bank."""
+        doc = len(self._alive)
+        tokens = question_tokens(q)
+        for word, fields in tokens.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = array("I")
+                self._new_words.add(word)
+            postings.append(doc << 2 | fields)
+        self._ids.append(doc)
+        self._alive.append(1)
+        self._lengths.append(min(len(tokens), 0xFFFF))
+        self._total_length += len(tokens)
+
+    def extend(self, questions):
+        for q in questions:
+            self.add(q)
+
+    def remove(self, position):
+        """Forgets the question at bank position `position`, before it is deleted from the bank."""
+        doc = self._ids.pop(position)
+        self._alive[doc] = 0
+        self._total_length -= self._lengths[doc]
+        self._dead += 1
+        if self._dead > max(len(self._ids), 10000):
+            self._compact()
+
+    def _compact(self):
+        alive = self._alive
+        for word, postings in list(self._postings.items()):
+            kept = array("I", (p for p in postings if alive[p >> 2]))
+            if kept:
+                self._postings[word] = kept
+            else:
+                del self._postings[word]
+        self._vocabulary = sorted(self._postings)
+        self._new_words = set()
+        self._dead = 0
+
+    def _merge_vocabulary(self):
+        # timsort merges the sorted run and the new words in about linear time
+        self._vocabulary = sorted(self._vocabulary + list(self._new_words))
+        self._new_words = set()
+
+    def _expand(self, prefix):
+        if len(self._new_words) > 10000:
+            self._merge_vocabulary()
+        start = bisect_left(self._vocabulary, prefix)
+        words = []
+        for word in self._vocabulary[start:start + _MAX_PREFIX_TERMS]:
+            if not word.startswith(prefix):
+                break
+            words.append(word)
+        words += [w for w in self._new_words if w.startswith(prefix)]
+        return [w for w in words[:_MAX_PREFIX_TERMS] if w in self._postings]
+
+    def search(self, query, limit=1000):
+        words = _TOKEN.findall(query.casefold())
+        if not words or not self._ids:
+            return SearchResult(array("I"), 0)
+        terms = [[w] for w in dict.fromkeys(words[:-1])]
+        # the last word is still being typed unless the query ends with a space
+        terms.append(self._expand(words[-1]) if query[-1:].isalnum() else [words[-1]])
+        lists = [[self._postings[w] for w in term if w in self._postings] for term in terms]
+        if not all(lists):
+            return SearchResult(array("I"), 0)
+        n = len(self._ids)
+        idfs = []
+        for postings in lists:
+            df = min(sum(map(len, postings)), n)
+            idfs.append(math.log(1 + (n - df + 0.5) / (df + 0.5)))
+        order = sorted(range(len(lists)), key=lambda t: sum(map(len, lists[t])))
+        terms = [(lists[t], idfs[t]) for t in order]
+        if np is not None:
+            return self._search_numpy(terms, limit)
+        return self._search_python(terms, limit)
+
+    def _norm(self):
+        avg = self._total_length / len(self._ids) or 1.0
+        k1, b = _BM25_K1, _BM25_B
+        return lambda length: (k1 + 1) / (1 + k1 * (1 - b + b * length / avg))
+
+    def _search_python(self, terms, limit):
+        alive, weights = self._alive, _FIELD_WEIGHTS
+        (first, idf), rest = terms[0], terms[1:]
+        scores = {}
+        scanned = 0
+        for postings in first:
+            if scanned >= _MAX_SCAN:
+                break
+            for p in postings[:_MAX_SCAN - scanned]:
+                doc = p >> 2
+                if alive[doc]:
+                    w = idf * weights[p & 3]
+                    if w > scores.get(doc, 0.0):
+                        scores[doc] = w
+            scanned += len(postings)
+        complete = sum(map(len, first)) <= _MAX_SCAN
+        for lists, idf in rest:
+            if not scores:
+                break
+            found = {}
+            low, high = min(scores) << 2, (max(scores) + 1) << 2
+            for postings in lists:
+                # walk the part of the list between the candidates, or look each candidate up
+                start = bisect_left(postings, low)
+                end = bisect_left(postings, high, start)
+                if end - start < 4 * len(scores):
+                    matches = (p for p in postings[start:end] if p >> 2 in scores)
+                else:
+                    matches = []
+                    for doc in scores:
+                        i = bisect_left(postings, doc << 2, start, end)
+                        if i < end and postings[i] >> 2 == doc:
+                            matches.append(postings[i])
+                for p in matches:
+                    doc, w = p >> 2, idf * weights[p & 3]
+                    if w > found.get(doc, 0.0):
+                        found[doc] = w
+            scores = {doc: scores[doc] + w for doc, w in found.items()}
+        norm, lengths = self._norm(), self._lengths
+        best = heapq.nlargest(limit, scores, key=lambda doc: (scores[doc] * norm(lengths[doc]), -doc))
+        return SearchResult(array("I", (bisect_left(self._ids, doc) for doc in best)), len(scores), complete)
+
+    def _search_numpy(self, terms, limit):
+        field_weights = np.array(_FIELD_WEIGHTS, dtype=np.float32)
+        (first, idf), rest = terms[0], terms[1:]
+        postings = np.concatenate([np.frombuffer(p, dtype=np.uint32) for p in first])
+        docs, scores = postings >> 2, field_weights[postings & 3] * idf
+        if len(first) > 1:
+            # a question matching several expansions of a prefix counts once, with its best one
+            order = np.lexsort((-scores, docs))
+            docs, scores = docs[order], scores[order]
+            keep = np.ones(len(docs), dtype=bool)
+            keep[1:] = docs[1:] != docs[:-1]
+            docs, scores = docs[keep], scores[keep]
+        if self._dead:
+            alive = np.frombuffer(self._alive, dtype=np.uint8)[docs].astype(bool)
+            docs, scores = docs[alive], scores[alive]
+        for lists, idf in rest:
+            # the candidates are looked up in the (longer) lists of the other words
+            best = np.zeros(len(docs), dtype=np.float32)
+            for p in lists:
+                postings = np.frombuffer(p, dtype=np.uint32)
+                found = postings[np.minimum(np.searchsorted(postings, docs << 2), len(postings) - 1)]
+                best = np.maximum(best, np.where(found >> 2 == docs, field_weights[found & 3], 0.0))
+            keep = best > 0
+            docs, scores = docs[keep], scores[keep] + best[keep] * idf
+        avg = self._total_length / len(self._ids) or 1.0
+        norm = (_BM25_K1 + 1) / (1 + _BM25_K1 * (1 - _BM25_B + _BM25_B * np.arange(1 << 16) / avg))
+        scores = scores * norm.astype(np.float32)[np.frombuffer(self._lengths, dtype=np.uint16)[docs]]
+        k = min(limit, len(docs))
+        if 0 < k < len(docs):
+            # docs are sorted, so among equal scores the lowest indices are the lowest ids
+            threshold = np.partition(scores, len(docs) - k)[len(docs) - k]
+            above = np.flatnonzero(scores > threshold)
+            top = np.concatenate([above, np.flatnonzero(scores == threshold)[:k - len(above)]])
+        else:
+            top = np.arange(len(docs))
+        top = top[np.lexsort((top, -scores[top]))]
+        positions = np.searchsorted(np.frombuffer(self._ids, dtype=np.uint32), docs[top])
+        return SearchResult(array("I", positions.astype(np.uint32).tobytes()), len(docs))
+
+
+# ========== Attempt log ==========
+# Finished quizzes are appended to JSONL segments (attempts-000001.jsonl, ...),
+# one attempt per line. Questions are identified by question_id(), a hash of
+# their content, so attempts stay meaningful after the bank is edited,
+# reordered or loaded from another file.
+
+ATTEMPT_LOG_FOLDER = "pokusaji"
+_LOG_PREFIX, _LOG_SUFFIX = "attempts-", ".jsonl"
+_FSYNC_POLICIES = ("always", "interval", "never")
+_STOP = object()
+_encode_compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def question_id(q):
+    """Stable id of a question's content (16 hex digits), the same in every bank."""
+    parts = [q.tip, q.tekst] + (q.opcije if q.tip == "MCQ" else [])
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def attempt_record(questions, answers, correct, started, finished, source="app"):
+    """One log line: question ids, answers (-1 = unanswered), the expected
+    answers (key), score and Unix timestamps."""
+    return {"source": source, "started": round(started, 3), "finished": round(finished, 3),
+            "questions": [question_id(q) for q in questions],
+            "answers": [-1 if a is None else a for a in answers],
+            "key": [expected_answer(q) for q in questions],
+            "correct": correct, "total": len(answers)}
+
+
+class AttemptLog:
+    """Append-only log of quiz attempts, written by a background thread.
+
+    record() only puts the attempt on a queue, so the caller never waits for
+    the disk. The writer takes everything that has accumulated (up to
+    `batch_size` attempts), encodes it and writes it with one write() call,
+    then fsyncs according to `fsync`: "always" after every batch (a group
+    commit), "interval" at most every `fsync_interval` seconds, "never" only
+    leaves it to the OS. A segment is closed once it reaches `segment_bytes`
+    (a batch is never split) and never written again. A torn last line left
+    by a crash is cut off when the log is opened again, so new attempts
+    start on a line of their own; iter_attempts() also skips any line it
+    cannot decode.
+    """
+
+    def __init__(self, folder=ATTEMPT_LOG_FOLDER, fsync="interval", fsync_interval=1.0,
+                 segment_bytes=64 << 20, batch_size=5000):
+        if fsync not in _FSYNC_POLICIES:
+            raise ValueError(f"fsync mora biti jedno od {_FSYNC_POLICIES}")
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.written = 0                    # attempts handed to the OS
+        self.error: Optional[Exception] = None
+        segments = log_segments(folder)
+        self._number = int(os.path.basename(segments[-1])[len(_LOG_PREFIX):-len(_LOG_SUFFIX)]) if segments else 1
+        if segments:
+            _cut_torn_line(segments[-1])
+        self._file = open(self._segment_path(), "ab")
+        if self._file.tell() >= segment_bytes:
+            self._rotate()
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="attempt-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, attempt):
+        self._queue.put(attempt)
+
+    def record_many(self, attempts):
+        """Logs a batch (e.g. graded answer sheets) as one queue item."""
+        self._queue.put(list(attempts))
+
+    def close(self):
+        """Writes and syncs everything recorded so far; waits for the writer to finish."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _segment_path(self):
+        return os.path.join(self.folder, f"{_LOG_PREFIX}{self._number:06d}{_LOG_SUFFIX}")
+
+    def _sync(self):
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+
+    def _rotate(self):
+        self._sync()
+        self._file.close()
+        self._number += 1
+        self._file = open(self._segment_path(), "ab")
+
+    def _write(self, lines):
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        if self._file.tell() and self._file.tell() + len(data) > self.segment_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self.written += len(lines)
+
+    def _run(self):
+        last_sync = time.monotonic()
+        dirty = stop = False
+        while not stop:
+            try:
+                wait = self.fsync_interval if dirty and self.fsync == "interval" else None
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:         # nothing new for a while: make the last batch durable
+                item = None
+            lines = []
+            while item is not None:
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, list):
+                    lines += map(_encode_compact, item)
+                else:
+                    lines.append(_encode_compact(item))
+                if len(lines) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            try:
+                if lines:
+                    self._write(lines)
+                    dirty = True
+                now = time.monotonic()
+                if dirty and (stop or self.fsync == "always" or not lines or now - last_sync >= self.fsync_interval):
+                    self._sync()
+                    last_sync, dirty = now, False
+            except OSError as e:
+                self.error = e          # keep draining the queue; the owner can report it
+        self._file.close()
+
+
+def _cut_torn_line(path, block=1 << 16):
+    """Truncates a segment after its last newline (drops a line a crash left half-written)."""
+    with open(path, "r+b") as f:
+        size = end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(0, end - block)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+            os.fsync(f.fileno())
+
+
+def log_segments(folder):
+    names = sorted(n for n in os.listdir(folder) if n.startswith(_LOG_PREFIX) and n.endswith(_LOG_SUFFIX))
+    return [os.path.join(folder, n) for n in names]
+
+
+def log_snapshot(folder):
+    """[(segment, size)] of the log right now, to read it later without newer attempts."""
+    return [(path, os.path.getsize(path)) for path in log_segments(folder)]
+
+
+def iter_attempts(folder, snapshot=None):
+    """All logged attempts, oldest first (only those within `snapshot` if given)."""
+    for path, size in snapshot or ((path, None) for path in log_segments(folder)):
+        with open(path, "rb") as f:
+            read = 0
+            for line in f:
+                read += len(line)
+                if not line.endswith(b"\n") or (size is not None and read > size):
+                    break       # torn write at the end of the log, or written after the snapshot
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue    # a torn line that was appended to before the log was repaired
+                if isinstance(record, dict):
+                    yield record
+
+
+# ========== Item analysis ==========
+# Per question id: difficulty (p-value, the share of correct answers),
+# discrimination (point-biserial correlation of the answer being correct with
+# the rest score, i.e. the share of the attempt's other questions answered
+# correctly) and how often each answer was chosen. All of it comes from
+# running sums, so recording an answer is O(1).
+
+_CHOICES = 5        # unanswered, then answer 0..3 (MCQ option index, TF 0/1)
+
+
+@dataclass
+class ItemStat:
+    attempts: int
+    difficulty: float                   # share of correct answers
+    discrimination: Optional[float]     # None until there is variation in both
+    choices: List[int]                  # unanswered, then per answer index
+
+
+class ItemStatistics:
+    """Streaming item analysis over attempts (records as written by attempt_record).
+
+    The sums live in parallel arrays indexed by a slot per question id:
+    n and sx count answers and correct ones; over answers whose attempt had
+    other questions, m and mx count them and sr, srr and sxr sum the rest
+    score r, r*r and x*r. from_attempts() builds the same arrays in bulk,
+    vectorized with NumPy when it is available.
+    """
+
+    def __init__(self):
+        self._slots = {}
+        self.n, self.sx, self.m, self.mx = (array("I") for _ in range(4))
+        self.sr, self.srr, self.sxr = (array("d") for _ in range(3))
+        self.choices = array("I")
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _slot(self, question):
+        j = self._slots.get(question)
+        if j is None:
+            j = self._slots[question] = len(self._slots)
+            for column in (self.n, self.sx, self.m, self.mx, self.sr, self.srr, self.sxr):
+                column.append(0)
+            self.choices.extend(bytes(_CHOICES))
+        return j
+
+    def add(self, questions, answers, key):
+        """Records one attempt: question ids, answers (-1 = unanswered) and expected answers."""
+        total = len(answers)
+        correct = sum(a == k for a, k in zip(answers, key))
+        for question, a, k in zip(questions, answers, key):
+            j = self._slot(question)
+            x = int(a == k)
+            self.n[j] += 1
+            self.sx[j] += x
+            self.choices[j * _CHOICES + min(max(a + 1, 0), _CHOICES - 1)] += 1
+            if total > 1:
+                r = (correct - x) / (total - 1)
+                self.m[j] += 1
+                self.mx[j] += x
+                self.sr[j] += r
+                self.srr[j] += r * r
+                self.sxr[j] += x * r
+
+    def add_record(self, record):
+        if "key" in record:         # written before the key was logged: nothing to score against
+            self.add(record["questions"], record["answers"], record["key"])
+
+    def get(self, question) -> Optional[ItemStat]:
+        j = self._slots.get(question)
+        if j is None:
+            return None
+        n, m, mx, sr = self.n[j], self.m[j], self.mx[j], self.sr[j]
+        var_x = m * mx - mx * mx
+        var_r = m * self.srr[j] - sr * sr
+        discrimination = None
+        if var_x > 0 and var_r > 1e-9:
+            discrimination = (m * self.sxr[j] - mx * sr) / math.sqrt(var_x * var_r)
+        return ItemStat(n, self.sx[j] / n if n else 0.0, discrimination,
+                        list(self.choices[j * _CHOICES:(j + 1) * _CHOICES]))
+
+    @classmethod
+    def from_attempts(cls, records, cancel=None):
+        """Statistics of many attempts at once, or None if `cancel` (an Event) gets set meanwhile."""
+        stats = cls()
+        if np is None:
+            for i, record in enumerate(records):
+                if cancel is not None and i % 10000 == 0 and cancel.is_set():
+                    return None
+                stats.add_record(record)
+            return stats
+        # flatten to one row per answer; everything after that is vectorized
+        slots, answers, key, attempt = array("I"), array("b"), array("b"), array("I")
+        count = 0
+        for record in records:
+            if cancel is not None and count % 10000 == 0 and cancel.is_set():
+                return None
+            if "key" not in record:
+                continue
+            slots.extend(map(stats._slot, record["questions"]))
+            answers.extend(record["answers"])
+            key.extend(record["key"])
+            attempt.extend([count] * len(record["answers"]))
+            count += 1
+        if not slots:
+            return stats
+        slots, attempt = np.frombuffer(slots, dtype=np.uint32), np.frombuffer(attempt, dtype=np.uint32)
+        answers, key = np.frombuffer(answers, dtype=np.int8), np.frombuffer(key, dtype=np.int8)
+        x = (answers == key).astype(np.float64)
+        total = np.bincount(attempt)[attempt]
+        correct = np.bincount(attempt, weights=x)[attempt]
+        has_rest = total > 1
+        r = np.where(has_rest, (correct - x) / np.maximum(total - 1, 1), 0.0)
+        size = len(stats)
+
+        def sums(weights=None):
+            return np.bincount(slots, weights=weights, minlength=size)
+
+        def as_array(code, values):
+            return array(code, np.asarray(values, dtype=np.uint32 if code == "I" else np.float64).tobytes())
+
+        stats.n, stats.sx = as_array("I", sums()), as_array("I", sums(x))
+        stats.m, stats.mx = as_array("I", sums(has_rest)), as_array("I", sums(x * has_rest))
+        stats.sr, stats.srr, stats.sxr = as_array("d", sums(r)), as_array("d", sums(r * r)), as_array("d", sums(x * r))
+        choice = np.clip(answers.astype(np.int64) + 1, 0, _CHOICES - 1)
+        stats.choices = as_array("I", np.bincount(slots.astype(np.int64) * _CHOICES + choice,
+                                                  minlength=size * _CHOICES))
+        return stats
+
+    @classmethod
+    def from_log(cls, folder=ATTEMPT_LOG_FOLDER, snapshot=None, cancel=None):
+        return cls.from_attempts(iter_attempts(folder, snapshot), cancel)
+
+
+# ========== Adaptive testing ==========
+# 3PL model: P(correct | theta) = c + (1 - c) / (1 + exp(-a (theta - b))).
+# c is the chance of guessing (1/2 for TF, 1/number of options for MCQ); a
+# and b come from the item statistics with the classical approximations
+# a = 1.7 r / sqrt(1 - r^2) and b = -z(p) / r. Questions without enough
+# answers get a = 1, b = 0.
+
+_THETA_GRID = [-4 + 0.1 * k for k in range(81)]
+_LOG_PRIOR = [-t * t / 2 for t in _THETA_GRID]     # standard normal, up to a constant
+_A_EDGES = (0.6, 0.9, 1.2, 1.5, 1.8, 2.1, 2.4)       # discrimination bins of the index
+_B_STEP = 0.5                                       # difficulty bin width
+_MIN_ATTEMPTS = 20
+_MAX_LOOSE = 64         # added questions scored one by one before the index is rebuilt
+_LOOSE = 0xFFFFFFFF     # run of a loose question
+
+
+def item_parameters(q, stat=None):
+    """(a, b, c) of a question, from its ItemStat if it has enough answers."""
+    c = 0.5 if q.tip == "TF" else 1 / len(q.opcije)
+    if stat is None or stat.attempts < _MIN_ATTEMPTS or stat.discrimination is None:
+        return 1.0, 0.0, c
+    p = min(max((stat.difficulty - c) / (1 - c), 0.02), 0.98)     # share that knew it, not guessed
+    r = min(max(stat.discrimination, 0.15), 0.9)
+    a = min(1.7 * r / math.sqrt(1 - r * r), 3.0)
+    b = min(max(-NormalDist().inv_cdf(p) / r, -4.0), 4.0)
+    return a, b, c
+
+
+def _information_bound(theta, a_low, a_high, b_low, b_high, c, d=None):
+    # upper bound of the 3PL information over ranges of a and b (c is the smallest
+    # in the range): the 2PL information a^2/(4 cosh^2(a d / 2)), which peaks at
+    # a d = 2.4, times the guessing factor (1-c) P / P(3PL) at the largest P, and
+    # never more than the 3PL maximum at a_high
+    if d is None:
+        d = max(b_low - theta, theta - b_high, 0.0)
+    a = a_high if d == 0 else min(max(2.4 / d, a_low), a_high)
+    x = theta - b_low
+    p = 1 / (1 + math.exp(-(a_high if x > 0 else a_low) * x))
+    guessing = (1 - c) * p / (c + (1 - c) * p)
+    peak = a_high * a_high * (1 - 20 * c - 8 * c * c + (1 + 8 * c) ** 1.5) / (8 * (1 - c) ** 2)
+    return min(a * a / (4 * math.cosh(a * d / 2) ** 2) * guessing, peak)
+
+
+class ItemParameters:
+    """3PL parameters of every question in a bank, indexed for picking the most informative one.
+
+    Questions are grouped into buckets by discrimination, difficulty and
+    guessing, and sorted by b inside a bucket. Questions with identical
+    parameters (e.g. all those without enough answers yet) form one run,
+    which is scored once and drawn from at random. most_informative()
+    visits buckets in order of the largest information they could hold at
+    theta, looks at the runs nearest to theta in each, and stops once no
+    remaining run or bucket can beat what it already has. The cost depends
+    on the number of buckets and distinct parameters near theta, not on the
+    size of the bank.
+
+    add() appends a question without rebuilding: with the parameters of an
+    existing run (the defaults, until it has enough answers) it joins that
+    run, otherwise it is scored on its own until there are _MAX_LOOSE such
+    questions and the index is rebuilt.
+    """
+
+    def __init__(self, bank, stats=None, parameters=None):
+        self.a, self.b, self.c = array("d"), array("d"), array("d")
+        if parameters is None:
+            parameters = (item_parameters(q, stats.get(question_id(q)) if stats else None) for q in bank)
+        for a, b, c in parameters:
+            self.a.append(a)
+            self.b.append(b)
+            self.c.append(c)
+        self._index()
+
+    def _index(self):
+        groups = {}
+        for i, (a, b, c) in enumerate(zip(self.a, self.b, self.c)):
+            groups.setdefault((bisect_left(_A_EDGES, a), math.floor(b / _B_STEP), round(c, 2)), []).append(i)
+        self._items = array("I")            # positions, bucket by bucket, in runs
+        self._run_start = array("I")        # run r is _items[_run_start[r]:_run_start[r + 1]]
+        self._run_of = array("I", bytes(4 * len(self.a)))  # position -> run
+        self._runs = {}                     # (a, b, c) -> run
+        self._extra = {}                    # run -> positions added to it since the index was built
+        self._loose = array("I")            # added positions with parameters of no run
+        self._buckets = []
+        for items in groups.values():
+            items.sort(key=lambda i: (self.b[i], self.a[i], self.c[i]))
+            a_values = [self.a[i] for i in items]
+            first_run, run_bs, previous = len(self._run_start), array("d"), None
+            for i in items:
+                triple = (self.a[i], self.b[i], self.c[i])
+                if triple != previous:
+                    self._runs[triple] = len(self._run_start)
+                    self._run_start.append(len(self._items))
+                    run_bs.append(self.b[i])
+                    previous = triple
+                self._run_of[i] = len(self._run_start) - 1
+                self._items.append(i)
+            self._buckets.append((min(a_values), max(a_values), self.b[items[0]], self.b[items[-1]],
+                                  min(self.c[i] for i in items), first_run, run_bs))
+        self._run_start.append(len(self._items))
+
+    @classmethod
+    def build(cls, bank, stats=None, cancel=None):
+        """Parameters of the whole bank, or None if `cancel` (an Event) gets set meanwhile."""
+        parameters = []
+        for i, q in enumerate(bank):
+            if cancel is not None and i % 10000 == 0 and cancel.is_set():
+                return None
+            parameters.append(item_parameters(q, stats.get(question_id(q)) if stats else None))
+        return cls(bank, parameters=parameters)
+
+    def __len__(self):
+        return len(self.a)
+
+    def add(self, q, stats=None):
+        """Adds the parameters of q, the question appended at the end of the bank."""
+        a, b, c = item_parameters(q, stats.get(question_id(q)) if stats else None)
+        i = len(self.a)
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+        run = self._runs.get((a, b, c))
+        if run is not None:
+            self._run_of.append(run)
+            self._extra.setdefault(run, array("I")).append(i)
+        elif len(self._loose) < _MAX_LOOSE:
+            self._run_of.append(_LOOSE)
+            self._loose.append(i)
+        else:
+            self._index()
+
+    def probability(self, i, theta):
+        c = self.c[i]
+        return c + (1 - c) / (1 + math.exp(-self.a[i] * (theta - self.b[i])))
+
+    def information(self, i, theta):
+        a, c = self.a[i], self.c[i]
+        p = self.probability(i, theta)
+        return a * a * (1 - p) / p * ((p - c) / (1 - c)) ** 2
+
+    def most_informative(self, theta, exclude=(), rng=random, choices=5):
+        """A bank position chosen at random among the `choices` most informative
+        unused questions at theta (randomesque exposure control); None if all are used."""
+        used = {}
+        for i in exclude:
+            used[self._run_of[i]] = used.get(self._run_of[i], 0) + 1
+        bounds = sorted(((_information_bound(theta, *bucket[:5]), bucket) for bucket in self._buckets),
+                        key=lambda pair: -pair[0])
+        best = []       # min-heap of (information, run, unused questions in it); a loose question is run ~i
+        count = 0       # unused questions in best
+        if _LOOSE in used:
+            used_loose = set(exclude).intersection(self._loose)
+            loose = [i for i in self._loose if i not in used_loose]
+        else:
+            loose = self._loose
+        for i in loose:
+            heapq.heappush(best, (self.information(i, theta), ~i, 1))
+            count += 1
+            while count - best[0][2] >= choices:
+                count -= heapq.heappop(best)[2]
+        for bound, (a_low, a_high, b_low, b_high, c, first_run, bs) in bounds:
+            if count >= choices and bound <= best[0][0]:
+                break
+            # outwards from theta; further runs in the bucket can only be less informative
+            high = bisect_left(bs, theta)
+            low = high - 1
+            while low >= 0 or high < len(bs):
+                if high >= len(bs) or (low >= 0 and theta - bs[low] < bs[high] - theta):
+                    k, low = low, low - 1
+                else:
+                    k, high = high, high + 1
+                if count >= choices and best[0][0] >= _information_bound(
+                        theta, a_low, a_high, b_low, b_high, c, abs(bs[k] - theta)):
+                    break
+                run = first_run + k
+                start = self._run_start[run]
+                unused = self._run_start[run + 1] - start + len(self._extra.get(run, ())) - used.get(run, 0)
+                if unused:
+                    heapq.heappush(best, (self.information(self._items[start], theta), run, unused))
+                    count += unused
+                    while count - best[0][2] >= choices:
+                        count -= heapq.heappop(best)[2]
+        if not best:
+            return None
+        # the `choices` best questions: all of the better runs, part of the weakest one
+        best.sort(reverse=True)
+        weights, left = [], choices
+        for _, run, unused in best:
+            weights.append(min(unused, left))
+            left -= weights[-1]
+        run = rng.choices([run for _, run, _ in best], weights)[0]
+        return self._draw(run, exclude, rng)
+
+    def _draw(self, run, exclude, rng):
+        # an unused question of the run; a run rarely has more than a few used ones
+        if run < 0:
+            return ~run
+        start, end = self._run_start[run], self._run_start[run + 1]
+        extra = self._extra.get(run, ())
+        for _ in range(8):
+            k = rng.randrange(start, end + len(extra))
+            i = self._items[k] if k < end else extra[k - end]
+            if i not in exclude:
+                return i
+        return next(i for i in chain(self._items[start:end], extra) if i not in exclude)
+
+
+class AdaptiveSession:
+    """One adaptive quiz: ability estimate after every answer and the choice of the next question.
+
+    The estimate is EAP (posterior mean) on a grid of theta values with a
+    standard normal prior, so it exists from the first answer on, even if
+    all answers are correct. Answers can be changed; the posterior is
+    recomputed from all of them, which costs ~81 evaluations per answer.
+    """
+
+    def __init__(self, parameters, length, seed=None):
+        self.parameters = parameters
+        self.length = length
+        self.rng = random.Random(seed)
+        self.positions = []         # bank positions, in the order they were asked
+        self.responses = {}         # question number in the quiz -> 1 correct / 0 wrong
+        self.theta, self.se = 0.0, 1.0
+
+    def next_position(self):
+        if len(self.positions) >= self.length:
+            return None
+        i = self.parameters.most_informative(self.theta, set(self.positions), self.rng)
+        if i is not None:
+            self.positions.append(i)
+        return i
+
+    def record(self, index, correct):
+        self.responses[index] = int(correct)
+        log_posterior = list(_LOG_PRIOR)
+        prob = self.parameters.probability
+        for k, x in self.responses.items():
+            i = self.positions[k]
+            for g, theta in enumerate(_THETA_GRID):
+                p = prob(i, theta)
+                log_posterior[g] += math.log(p if x else 1 - p)
+        top = max(log_posterior)
+        weights = [math.exp(v - top) for v in log_posterior]
+        total = sum(weights)
+        self.theta = sum(t * w for t, w in zip(_THETA_GRID, weights)) / total
+        self.se = math.sqrt(sum((t - self.theta) ** 2 * w for t, w in zip(_THETA_GRID, weights)) / total)
+
+
 # ========== Application ==========
+# question type mixes offered in the quiz tab (shares per tip, None = the whole bank)
+QUIZ_MIXES = {
+    "nasumično": None,
+    "60% MCQ / 40% T/F": {"MCQ": 60, "TF": 40},
+    "50% MCQ / 50% T/F": {"MCQ": 50, "TF": 50},
+    "samo MCQ": {"MCQ": 1},
+    "samo T/F": {"TF": 1},
+}
+
+
 class KvizApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Kviz znanja")
-        self.pitanja: List[Pitanje] = []
+        self.pitanja: List[Pitanje] = []     # a list, or a BinaryBank opened from a .kvb file
+        self._listed = 0                    # questions already shown in lb_pitanja
+        self._listing_job = None
+        self._sampler: Optional[QuestionSampler] = None     # rebuilt after the bank changes
+        self._irt: Optional[ItemParameters] = None          # likewise, and after the attempt log is read
+        self._irt_cancel: Optional[threading.Event] = None  # set while a big bank's parameters are computed
+        self._start_when_ready = False                      # start the adaptive quiz once they are
+        self._adaptive: Optional[AdaptiveSession] = None    # the running adaptive quiz
+        self._duplicates: Optional[NearDuplicateIndex] = None  # built on the first add, dropped on load
+        self._index_cancel: Optional[threading.Event] = None
+        self._dedup_cancel: Optional[threading.Event] = None
+        self._search: Optional[SearchIndex] = SearchIndex()    # None while rebuilt in the background
+        self._search_cancel: Optional[threading.Event] = None
+        self._search_rows = None            # bank positions of the rows while search results are shown
+        self._search_job = None
+        self.attempt_log: Optional[AttemptLog] = None    # opened on the first finished quiz
+        self._quiz_started = 0.0
+        self._quiz_positions = []
+        self.item_stats = ItemStatistics()
+        self._stats_pending: Optional[list] = None      # attempts finished while the log is being read
+        self._load_cancel: Optional[threading.Event] = None
+        self._incomplete = False            # the last JSON load failed or is still running
+        self._save_cancel: Optional[threading.Event] = None
 
         # Main layout: notebook with two tabs: Editor i Kviz
         self.notebook = ttk.Notebook(root)
@@ -93,6 +1741,13 @@ class KvizApp:
         # sample questions
         self._load_sample_questions()
 
+        # item statistics of earlier sessions, read from the attempt log in the background
+        if os.path.isdir(ATTEMPT_LOG_FOLDER):
+            snapshot = log_snapshot(ATTEMPT_LOG_FOLDER)
+            self._stats_pending = []
+            self._index_in_background(lambda _, cancel: ItemStatistics.from_log(ATTEMPT_LOG_FOLDER, snapshot, cancel),
+                                      self._attach_stats)
+
     # ========== Editor tab ==========
     def _build_editor(self):
         left = ttk.Frame(self.frame_editor)
@@ -103,9 +1758,17 @@ class KvizApp:
         # Listbox for questions
         lbl = ttk.Label(left, text="Baza pitanja:")
         lbl.pack(anchor="w")
+        search_row = ttk.Frame(left)
+        search_row.pack(fill="x", pady=(0,4))
+        ttk.Label(search_row, text="Traži:").pack(side="left")
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_row, textvariable=self.search_var)
+        search_entry.pack(side="left", fill="x", expand=True, padx=4)
+        search_entry.bind("<KeyRelease>", self._on_search_key)
         self.lb_pitanja = tk.Listbox(left, height=20)
         self.lb_pitanja.pack(fill="both", expand=True)
         self.lb_pitanja.bind("<Double-1>", self.on_edit_selected)
+        self.lb_pitanja.bind("<<ListboxSelect>>", self._show_item_stats)
 
         # Buttons under listbox
         btn_frame = ttk.Frame(left)
@@ -113,6 +1776,9 @@ class KvizApp:
         ttk.Button(btn_frame, text="Obriši odabrano", command=self.delete_selected).pack(side="left")
         ttk.Button(btn_frame, text="Učitaj iz datoteke", command=self.load_from_file).pack(side="left", padx=4)
         ttk.Button(btn_frame, text="Spremi u datoteku", command=self.save_to_file).pack(side="left")
+        self.compact_save = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Kompaktno", variable=self.compact_save).pack(side="left", padx=4)
+        ttk.Button(btn_frame, text="Slična pitanja", command=self.find_duplicates).pack(side="left")
 
         # Right side: form for adding questions
         form_lbl = ttk.Label(right, text="Dodaj novo pitanje", font=("TkDefaultFont", 11, "bold"))
@@ -187,37 +1853,313 @@ class KvizApp:
             except ValueError as e:
                 messagebox.showerror("Greška", str(e))
                 return
+        index = self._duplicate_index()
+        similar = index.similar(tekst, 3) if index is not None else []
+        if similar:
+            lines = [f"{i + 1}. {self.pitanja[i].tekst[:80]} ({s:.0%})" for i, s in similar]
+            if not messagebox.askyesno("Slično pitanje", "U bazi već postoji slično pitanje:\n"
+                                       + "\n".join(lines) + "\n\nDodati svejedno?"):
+                return
         self.pitanja.append(p)
+        self._sampler = None
+        self._add_appended_parameters()
+        if index is not None:
+            index.add(len(self.pitanja) - 1)
+        if self._search is not None:
+            self._search.add(p)
         self.entry_tekst.delete("1.0", "end")
         for v in self.option_vars:
             v.set("")
         self.mcq_correct.set(0)
-        self.status_var.set("Pitanje dodano.")
-        self.refresh_listbox()
+        self.status_var.set("Pitanje dodano." if index is not None
+                            else "Pitanje dodano (provjera sličnih pitanja još se priprema).")
+        if self._search_rows is not None:
+            self._run_search()
+        else:
+            self._list_pending()
+
+    def _listbox_row(self, i, p):
+        row = f"{i+1}. {'[TF]' if p.tip=='TF' else '[MCQ]'} {p.tekst[:80]}"
+        stat = self.item_stats.get(question_id(p)) if self.item_stats else None
+        if stat is not None:
+            row += f"   p={stat.difficulty:.2f}"
+            if stat.discrimination is not None:
+                row += f" r={stat.discrimination:+.2f}"
+            row += f" n={stat.attempts}"
+        return row
+
+    def _refresh_rows(self, positions):
+        if self._search_rows is not None:
+            self._run_search()
+            return
+        for i in sorted(set(positions)):
+            if i < self._listed:
+                self.lb_pitanja.delete(i)
+                self.lb_pitanja.insert(i, self._listbox_row(i, self.pitanja[i]))
+
+    def _show_item_stats(self, event=None):
+        sel = self.lb_pitanja.curselection()
+        if not sel or not self.item_stats:
+            return
+        p = self.pitanja[self._row_position(sel[0])]
+        stat = self.item_stats.get(question_id(p))
+        if stat is None:
+            self.status_var.set("Pitanje još nije bilo u kvizu.")
+            return
+        labels = ["False", "True"] if p.tip == "TF" else [chr(65 + k) for k in range(len(p.opcije))]
+        shares = [f"{label} {stat.choices[k + 1] / stat.attempts:.0%}" for k, label in enumerate(labels)]
+        shares.append(f"bez odgovora {stat.choices[0] / stat.attempts:.0%}")
+        discrimination = "–" if stat.discrimination is None else f"{stat.discrimination:+.2f}"
+        self.status_var.set(f"Odgovora {stat.attempts}, težina p={stat.difficulty:.2f}, "
+                            f"diskriminacija r={discrimination}; " + " · ".join(shares))
+
+    def _attach_stats(self, stats):
+        for record in self._stats_pending:
+            stats.add_record(record)
+        self._stats_pending = None
+        self.item_stats = stats
+        self._drop_item_parameters()
+        if stats:
+            self.refresh_listbox()
+
+    def _item_parameters(self):
+        """3PL parameters of the bank; None while a big bank is being processed in the background."""
+        if self._irt is None and self._irt_cancel is None:
+            if len(self.pitanja) <= 10000:
+                self._irt = ItemParameters.build(self.pitanja, self.item_stats)
+            else:
+                stats = self.item_stats
+                self._irt_cancel = self._index_in_background(
+                    lambda bank, cancel: ItemParameters.build(bank, stats, cancel), self._attach_item_parameters)
+        return self._irt
+
+    def _attach_item_parameters(self, parameters):
+        self._irt_cancel = None
+        # the worker used a copy of the bank; questions added since then are added here
+        self._irt = parameters
+        self._add_appended_parameters()
+        if self._start_when_ready:
+            self.start_quiz()
+
+    def _add_appended_parameters(self):
+        # a build still running in the background picks them up when it is attached
+        if self._irt is not None:
+            for i in range(len(self._irt), len(self.pitanja)):
+                self._irt.add(self.pitanja[i], self.item_stats)
+
+    def _drop_item_parameters(self):
+        self._irt = None
+        if self._irt_cancel is not None:
+            self._irt_cancel.set()
+            self._irt_cancel = None
+        if self._start_when_ready:
+            self._start_when_ready = False
+            self.quiz_info_var.set("Pitanja su se promijenila – ponovno pokrenite kviz.")
 
     def refresh_listbox(self):
+        if self.search_var.get().strip():
+            self._run_search()
+            return
+        self._search_rows = None
         self.lb_pitanja.delete(0, "end")
-        for i, p in enumerate(self.pitanja):
-            display = f"{i+1}. {'[TF]' if p.tip=='TF' else '[MCQ]'} {p.tekst[:80]}"
-            self.lb_pitanja.insert("end", display)
+        self._listed = 0
+        if self._listing_job is not None:
+            self.root.after_cancel(self._listing_job)
+        self._list_pending()
+
+    def _list_pending(self, chunk=5000):
+        # rows for questions not listed yet, one Tk call per chunk; a big bank
+        # is listed chunk by chunk between Tk events so the window stays responsive
+        self._listing_job = None
+        if self._search_rows is not None:
+            return
+        end = min(self._listed + chunk, len(self.pitanja))
+        if self._listed < end:
+            self.lb_pitanja.insert("end", *(self._listbox_row(i, self.pitanja[i])
+                                            for i in range(self._listed, end)))
+            self._listed = end
+        if end < len(self.pitanja):
+            self._listing_job = self.root.after(1, self._list_pending)
+
+    def _on_search_key(self, event=None):
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(150, self._run_search)
+
+    def _run_search(self, limit=1000):
+        self._search_job = None
+        query = self.search_var.get()
+        if not query.strip():
+            if self._search_rows is not None:
+                self.refresh_listbox()
+            return
+        if self._search is None:
+            self.status_var.set("Indeks za pretragu još se gradi…")
+            return
+        t = time.perf_counter()
+        result = self._search.search(query, limit)
+        elapsed = time.perf_counter() - t
+        if self._listing_job is not None:
+            self.root.after_cancel(self._listing_job)
+            self._listing_job = None
+        self.lb_pitanja.delete(0, "end")
+        if result.positions:
+            self.lb_pitanja.insert("end", *(self._listbox_row(i, self.pitanja[i]) for i in result.positions))
+        self._search_rows = result.positions
+        self.status_var.set(f"Pronađeno {result.total}{'' if result.complete else '+'} pitanja "
+                            f"({elapsed * 1e3:.1f} ms)" + (f", prikazano najboljih {limit}" if result.total > limit else ""))
+
+    def _row_position(self, row):
+        return row if self._search_rows is None else self._search_rows[row]
+
+    def _rebuild_search_index(self):
+        if self._search_cancel is not None:
+            self._search_cancel.set()
+            self._search_cancel = None
+        if len(self.pitanja) <= 10000:
+            self._search = SearchIndex.build(self.pitanja)
+        else:
+            self._search = None
+            self._search_cancel = self._index_in_background(SearchIndex.build, self._attach_search)
+
+    def _attach_search(self, index):
+        self._search_cancel = None
+        # the worker indexed a copy; questions added since then are indexed here
+        index.extend(self.pitanja[i] for i in range(len(index), len(self.pitanja)))
+        self._search = index
+        if self.search_var.get().strip():
+            self._run_search()
 
     def delete_selected(self):
         sel = self.lb_pitanja.curselection()
         if not sel:
             messagebox.showinfo("Info", "Nema odabranog pitanja za brisanje.")
             return
-        idx = sel[0]
+        idx = self._row_position(sel[0])
         confirmed = messagebox.askyesno("Potvrda", "Obrisati odabrano pitanje?")
         if confirmed:
+            if self._search is not None:
+                self._search.remove(idx)
+            if self._duplicates is not None:
+                self._duplicates.remove(idx)
+            else:
+                self._drop_duplicate_index()    # a running build saw the question; the next add restarts it
             del self.pitanja[idx]
+            if self._search is None:
+                self._rebuild_search_index()    # restarts the build, which saw the question
+            self._sampler = None
+            self._drop_item_parameters()
             self.refresh_listbox()
             self.status_var.set("Pitanje obrisano.")
 
+    def _duplicate_index(self):
+        """Near-duplicate index of the bank; None while a big bank is being indexed in the background."""
+        if self._duplicates is None and self._index_cancel is None:
+            if len(self.pitanja) <= 10000:
+                self._duplicates = NearDuplicateIndex.build(self.pitanja)
+            else:
+                self._index_cancel = self._index_in_background(NearDuplicateIndex.build, self._attach_duplicates)
+        return self._duplicates
+
+    def _index_in_background(self, build, attach):
+        """Runs build(copy of the bank, cancel=Event) in a worker thread and hands the
+        result to attach() in the Tk thread; returns the Event that cancels it."""
+        cancel = threading.Event()
+        out = queue.Queue(maxsize=1)
+        questions = self.pitanja.copy()
+
+        def work():
+            try:
+                result = build(questions, cancel=cancel)
+            finally:
+                _release(questions)
+            _put(out, cancel, ("done", result, 1.0))
+
+        threading.Thread(target=work, daemon=True).start()
+        self.root.after(100, self._poll_index, out, cancel, attach)
+        return cancel
+
+    def _poll_index(self, out, cancel, attach):
+        if cancel.is_set():
+            return
+        try:
+            _, index, _ = out.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._poll_index, out, cancel, attach)
+            return
+        attach(index)
+
+    def _attach_duplicates(self, index):
+        self._index_cancel = None
+        # the worker indexed a copy; questions added since then are indexed here
+        index.bank = self.pitanja
+        self._duplicates = index
+        self._index_appended_duplicates()
+
+    def _index_appended_duplicates(self):
+        # a build still running in the background picks them up when it is attached
+        if self._duplicates is not None:
+            for i in range(len(self._duplicates), len(self.pitanja)):
+                self._duplicates.add(i)
+
+    def _drop_duplicate_index(self):
+        self._duplicates = None
+        if self._index_cancel is not None:
+            self._index_cancel.set()
+            self._index_cancel = None
+
+    def find_duplicates(self):
+        if not self.pitanja:
+            messagebox.showinfo("Info", "Nema pitanja za provjeru.")
+            return
+        if self._dedup_cancel is not None:
+            self._dedup_cancel.set()
+        cancel = threading.Event()
+        out = queue.Queue(maxsize=8)
+        self._dedup_cancel = cancel
+        threading.Thread(target=find_duplicates_in_background, args=(self.pitanja.copy(), out, cancel),
+                         daemon=True).start()
+        self.status_var.set("Traženje sličnih pitanja…")
+        self.root.after(20, self._poll_duplicates, out, cancel)
+
+    def _poll_duplicates(self, out, cancel):
+        if cancel.is_set():
+            return
+        try:
+            while True:
+                kind, data, fraction = out.get_nowait()
+                if kind == "progress":
+                    self.status_var.set(f"Traženje sličnih pitanja… {fraction:.0%}")
+                    continue
+                self._dedup_cancel = None
+                if kind == "done":
+                    self._show_duplicates(data)
+                else:
+                    self.status_var.set("Traženje sličnih pitanja nije uspjelo.")
+                    messagebox.showerror("Greška", str(data))
+                return
+        except queue.Empty:
+            pass
+        self.root.after(50, self._poll_duplicates, out, cancel)
+
+    def _show_duplicates(self, groups, shown=20):
+        extra = sum(len(g) - 1 for g in groups)
+        self.status_var.set(f"Skupina sličnih pitanja: {len(groups)}, suvišnih pitanja: {extra}")
+        if not groups:
+            messagebox.showinfo("Slična pitanja", "Nema sličnih pitanja.")
+            return
+        # row numbers as in the listbox; the bank may have changed since the scan started
+        lines = [", ".join(str(i + 1) for i in g[:10]) + (" …" if len(g) > 10 else "")
+                 + f": {self.pitanja[g[0]].tekst[:60] if g[0] < len(self.pitanja) else ''}" for g in groups[:shown]]
+        if len(groups) > shown:
+            lines.append(f"… i još {len(groups) - shown} skupina")
+        messagebox.showinfo("Slična pitanja", f"{len(groups)} skupina ({extra} suvišnih pitanja):\n" + "\n".join(lines))
+
     def on_edit_selected(self, event=None):
         sel = self.lb_pitanja.curselection()
         if not sel:
             return
-        idx = sel[0]
+        idx = self._row_position(sel[0])
         p = self.pitanja[idx]
         # switch to editor form and load values
         self.notebook.select(self.frame_editor)
@@ -235,42 +2177,144 @@ class KvizApp:
             self.mcq_correct.set(p.tocan_index)
 
     def save_to_file(self):
+        if self._load_cancel is not None:
+            messagebox.showwarning("Upozorenje", "Pričekajte da učitavanje završi.")
+            return
+        if self._incomplete:
+            # only part of the file is in memory; saving it would drop the rest
+            messagebox.showwarning("Upozorenje", "Učitavanje nije dovršeno, pa bi spremanje izgubilo "
+                                                 "neučitana pitanja. Najprije ponovno učitajte datoteku.")
+            return
         if not self.pitanja:
             messagebox.showinfo("Info", "Nema pitanja za spremiti.")
             return
-        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files","*.json")])
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files","*.json"), ("Binarna baza","*" + BINARY_SUFFIX)])
         if not path:
             return
-        data = [p.to_dict() for p in self.pitanja]
-        # ensure proper fields for each type
-        export = []
-        for p in data:
-            if p["tip"] == "TF":
-                export.append({"tip":"TF","tekst":p["tekst"], "tocan": p.get("tocan", False)})
-            else:
-                export.append({"tip":"MCQ","tekst":p["tekst"], "opcije": p.get("opcije",[]), "tocan_index": p.get("tocan_index",0)})
+        if isinstance(self.pitanja, BinaryBank) and _same_file(self.pitanja.path, path):
+            messagebox.showwarning("Upozorenje", "Ova baza je otvorena iz te datoteke pa je nije moguće "
+                                                 "prepisati. Spremite je pod drugim imenom.")
+            return
+        # the worker serializes straight from the objects; it gets a copy of the
+        # list (references only, or a BinaryBank sharing the same mapping) so
+        # editing during the save does not affect it; the worker closes its copy
+        if self._save_cancel is not None:
+            self._save_cancel.set()
+        cancel = threading.Event()
+        out = queue.Queue(maxsize=8)
+        self._save_cancel = cancel
+        questions = self.pitanja.copy()
+        threading.Thread(target=save_questions_in_background,
+                         args=(questions, len(questions), path, out, cancel, self.compact_save.get()),
+                         daemon=True).start()
+        self.status_var.set(f"Spremanje u {path}…")
+        self.root.after(20, self._poll_save, out, cancel, path)
+
+    def _poll_save(self, out, cancel, path):
+        if cancel.is_set():
+            return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(export, f, ensure_ascii=False, indent=2)
-            self.status_var.set(f"Spremljeno u {path}")
-        except Exception as e:
-            messagebox.showerror("Greška", f"Ne mogu spremiti datoteku: {e}")
+            while True:
+                kind, data, fraction = out.get_nowait()
+                if kind == "progress":
+                    self.status_var.set(f"Spremanje… {fraction:.0%}")
+                    continue
+                self._save_cancel = None
+                if kind == "done":
+                    self.status_var.set(f"Spremljeno {data} pitanja u {path}")
+                else:
+                    self.status_var.set("Spremanje nije uspjelo.")
+                    messagebox.showerror("Greška", f"Ne mogu spremiti datoteku: {data}")
+                return
+        except queue.Empty:
+            pass
+        self.root.after(50, self._poll_save, out, cancel, path)
 
     def load_from_file(self):
-        path = filedialog.askopenfilename(filetypes=[("JSON files","*.json")])
+        path = filedialog.askopenfilename(filetypes=[("Baze pitanja", "*.json *" + BINARY_SUFFIX), ("JSON files","*.json"), ("Binarna baza","*" + BINARY_SUFFIX)])
         if not path:
             return
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            loaded = []
-            for item in data:
-                loaded.append(Pitanje.from_dict(item))
-            self.pitanja = loaded
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+            self._load_cancel = None
+        if path.endswith(BINARY_SUFFIX):
+            # nothing is parsed up front; questions are decoded as they are listed or shown
+            try:
+                t = time.perf_counter()
+                bank = BinaryBank(path)
+                self._close_bank()
+                self.pitanja = bank
+                self._incomplete = False
+                self._sampler = None
+                self._drop_item_parameters()
+                self._drop_duplicate_index()
+                self._rebuild_search_index()
+                elapsed = time.perf_counter() - t
+            except Exception as e:
+                messagebox.showerror("Greška", f"Ne mogu učitati datoteku: {e}")
+                return
             self.refresh_listbox()
-            self.status_var.set(f"Učitano {len(self.pitanja)} pitanja iz {path}")
-        except Exception as e:
-            messagebox.showerror("Greška", f"Ne mogu učitati datoteku: {e}")
+            self.status_var.set(f"Otvoreno {len(self.pitanja)} pitanja iz {path} ({elapsed * 1e3:.1f} ms)")
+            return
+        # parsing happens in a worker thread; batches reach the listbox via root.after
+        cancel = threading.Event()
+        out = queue.Queue(maxsize=8)
+        self._load_cancel = cancel
+        self._incomplete = True     # until "done"
+        self._close_bank()
+        self.pitanja = []
+        self._sampler = None
+        self._drop_item_parameters()
+        self._drop_duplicate_index()
+        self._rebuild_search_index()
+        self.refresh_listbox()
+        threading.Thread(target=load_questions_in_batches, args=(path, out, cancel), daemon=True).start()
+        self.status_var.set(f"Učitavanje {path}…")
+        self.root.after(10, self._poll_load, out, cancel, path, [])
+
+    def _close_bank(self):
+        if isinstance(self.pitanja, BinaryBank):
+            self.pitanja.close()
+
+    def _poll_load(self, out, cancel, path, errors):
+        if cancel.is_set():
+            return
+        deadline = time.perf_counter() + 0.03      # keep the Tk loop responsive
+        try:
+            while time.perf_counter() < deadline:
+                kind, data, fraction = out.get_nowait()
+                if kind == "batch":
+                    questions, batch_errors = data
+                    self.pitanja.extend(questions)
+                    self._sampler = None
+                    self._drop_item_parameters()     # rebuilt once, not question by question
+                    self._index_appended_duplicates()
+                    if self._search is not None:
+                        self._search.extend(questions)
+                    self._list_pending()
+                    errors += batch_errors
+                    self.status_var.set(f"Učitavanje… {len(self.pitanja)} pitanja ({fraction:.0%})")
+                    continue
+                self._load_cancel = None
+                if kind == "done":
+                    self._incomplete = False
+                    self.status_var.set(f"Učitano {len(self.pitanja)} pitanja iz {path}"
+                                        + (f", preskočeno neispravnih: {len(errors)}" if errors else ""))
+                    if errors:
+                        self._show_load_errors(errors)
+                else:
+                    self.status_var.set(f"Učitavanje prekinuto nakon {len(self.pitanja)} pitanja")
+                    messagebox.showerror("Greška", f"Ne mogu učitati datoteku: {data}")
+                return
+        except queue.Empty:
+            pass
+        self.root.after(20, self._poll_load, out, cancel, path, errors)
+
+    def _show_load_errors(self, errors, shown=20):
+        lines = [f"Zapis {n}: {msg}" for n, msg in errors[:shown]]
+        if len(errors) > shown:
+            lines.append(f"… i još {len(errors) - shown}")
+        messagebox.showwarning("Neispravna pitanja", f"Preskočeno {len(errors)} zapisa:\n" + "\n".join(lines))
 
     def _load_sample_questions(self):
         # add few sample questions for quick testing
@@ -283,6 +2327,10 @@ class KvizApp:
         # only add if empty to avoid duplicates
         if not self.pitanja:
             self.pitanja.extend(s)
+            self._sampler = None
+            self._drop_item_parameters()
+            self._index_appended_duplicates()
+            self._search.extend(s)
             self.refresh_listbox()
 
     # ========== Quiz tab ==========
@@ -293,6 +2341,14 @@ class KvizApp:
         ttk.Label(top, text="Broj pitanja u kvizu:").pack(side="left")
         self.quiz_count = tk.IntVar(value=5)
         ttk.Spinbox(top, from_=1, to=50, textvariable=self.quiz_count, width=6).pack(side="left", padx=6)
+        ttk.Label(top, text="Omjer:").pack(side="left")
+        self.quiz_mix = tk.StringVar(value=next(iter(QUIZ_MIXES)))
+        ttk.Combobox(top, textvariable=self.quiz_mix, values=list(QUIZ_MIXES), state="readonly", width=18).pack(side="left", padx=6)
+        ttk.Label(top, text="Sjeme:").pack(side="left")
+        self.quiz_seed = tk.StringVar()     # empty = a different quiz every time
+        ttk.Entry(top, textvariable=self.quiz_seed, width=8).pack(side="left", padx=6)
+        self.quiz_adaptive = tk.BooleanVar(value=False)
+        ttk.Checkbutton(top, text="Prilagodljivo (IRT)", variable=self.quiz_adaptive).pack(side="left", padx=6)
 
         ttk.Button(top, text="Pokreni kviz", command=self.start_quiz).pack(side="left", padx=6)
         ttk.Button(top, text="Reset", command=self.reset_quiz).pack(side="left")
@@ -304,9 +2360,21 @@ class KvizApp:
         self.quiz_question_var = tk.StringVar(value="Niste pokrenuli kviz.")
         ttk.Label(self.quiz_area, textvariable=self.quiz_question_var, wraplength=600, font=("TkDefaultFont", 11)).pack(anchor="w", pady=(0,8))
 
-        # dynamic area for answer controls
+        # area for answer controls; one TF set and one MCQ set are created once
+        # and only reconfigured by show_question (no destroy/create per question)
         self.answer_controls = ttk.Frame(self.quiz_area)
         self.answer_controls.pack(anchor="w")
+        self.tf_ans_var = tk.IntVar(value=-1)
+        self.tf_controls = ttk.Frame(self.answer_controls)
+        for text, value in (("True", 1), ("False", 0)):
+            ttk.Radiobutton(self.tf_controls, text=text, variable=self.tf_ans_var, value=value,
+                            command=lambda: self._record_answer(self._shown_index, self.tf_ans_var.get())).pack(anchor="w")
+        self.mcq_ans_var = tk.IntVar(value=-1)
+        self.mcq_controls = ttk.Frame(self.answer_controls)
+        self.mcq_buttons: List[ttk.Radiobutton] = []
+        self._mcq_packed = 0
+        self._shown_controls: Optional[ttk.Frame] = None
+        self._shown_index: Optional[int] = None
 
         # navigation and feedback
         nav = ttk.Frame(self.frame_quiz)
@@ -330,60 +2398,111 @@ class KvizApp:
         if not self.pitanja:
             messagebox.showinfo("Info", "Nema dostupnih pitanja u bazi.")
             return
-        n = min(self.quiz_count.get(), len(self.pitanja))
-        self.current_quiz_questions = random.sample(self.pitanja, n)
+        seed = self.quiz_seed.get().strip() or None
+        self._start_when_ready = False
+        if self.quiz_adaptive.get():
+            # questions are chosen one at a time, see next_question
+            if self._item_parameters() is None:
+                self._start_when_ready = True
+                self.quiz_info_var.set("Računaju se parametri pitanja – kviz počinje čim budu gotovi…")
+                return
+            self._adaptive = AdaptiveSession(self._irt, min(self.quiz_count.get(), len(self.pitanja)), seed)
+            positions = [self._adaptive.next_position()]
+        else:
+            self._adaptive = None
+            if self._sampler is None:
+                self._sampler = QuestionSampler(self.pitanja)
+            positions = self._sampler.sample(self.quiz_count.get(), QUIZ_MIXES[self.quiz_mix.get()], seed)
+        if not positions:
+            messagebox.showinfo("Info", "Nema pitanja odabranog tipa u bazi.")
+            return
+        self.current_quiz_questions = [self.pitanja[i] for i in positions]
+        self._quiz_positions = positions
+        n = len(self.current_quiz_questions)
         self.user_answers = [None]*n
+        self._quiz_started = time.time()
         self.current_index = 0
         self.show_question(0)
         self.btn_next.config(state="normal")
         self.btn_prev.config(state="normal")
         self.btn_submit.config(state="normal")
-        self.quiz_info_var.set(f"Kviz pokrenut: {n} pitanja")
+        self.quiz_info_var.set(f"Kviz pokrenut: {self._quiz_length()} pitanja"
+                               + (" (prilagodljivo)" if self._adaptive is not None else ""))
+
+    def _quiz_length(self):
+        return self._adaptive.length if self._adaptive is not None else len(self.current_quiz_questions)
 
     def reset_quiz(self):
+        self._adaptive = None
+        self._start_when_ready = False
         self.current_quiz_questions = []
         self.user_answers = []
         self.current_index = 0
         self.quiz_question_var.set("Kviz resetiran.")
-        for widget in self.answer_controls.winfo_children():
-            widget.destroy()
+        self._show_controls(None)
         self.btn_next.config(state="disabled")
         self.btn_prev.config(state="disabled")
         self.btn_submit.config(state="disabled")
         self.quiz_info_var.set("Status kviza: nije započet")
 
     def show_question(self, index):
-        # clear answer controls
-        for widget in self.answer_controls.winfo_children():
-            widget.destroy()
         if index < 0 or index >= len(self.current_quiz_questions):
+            self._show_controls(None)
             return
         q = self.current_quiz_questions[index]
-        self.quiz_question_var.set(f"Pitanje {index+1}/{len(self.current_quiz_questions)}: {q.tekst}")
+        self._shown_index = index
+        self.quiz_question_var.set(f"Pitanje {index+1}/{self._quiz_length()}: {q.tekst}")
+        # preselect if answered, clear the selection otherwise
+        answer = -1 if self.user_answers[index] is None else self.user_answers[index]
         if q.tip == "TF":
-            # Radiobuttons True/False
-            self.tf_ans_var = tk.IntVar(value=-1 if self.user_answers[index] is None else self.user_answers[index])
-            ttk.Radiobutton(self.answer_controls, text="True", variable=self.tf_ans_var, value=1, command=lambda:self._record_answer(index, self.tf_ans_var.get())).pack(anchor="w")
-            ttk.Radiobutton(self.answer_controls, text="False", variable=self.tf_ans_var, value=0, command=lambda:self._record_answer(index, self.tf_ans_var.get())).pack(anchor="w")
-            # preselect if answered
-            if self.user_answers[index] is not None:
-                self.tf_ans_var.set(self.user_answers[index])
+            self.tf_ans_var.set(answer)
+            self._show_controls(self.tf_controls)
         else:
-            # MCQ - radiobuttons for options
-            self.mcq_ans_var = tk.IntVar(value=-1 if self.user_answers[index] is None else self.user_answers[index])
+            # MCQ - reuse the option radiobuttons, adding or hiding some only if the count changes
+            n = len(q.opcije)
+            while len(self.mcq_buttons) < n:
+                i = len(self.mcq_buttons)
+                self.mcq_buttons.append(ttk.Radiobutton(self.mcq_controls, variable=self.mcq_ans_var, value=i,
+                                                        command=lambda i=i: self._record_answer(self._shown_index, i)))
             for i, opt in enumerate(q.opcije):
-                ttk.Radiobutton(self.answer_controls, text=f"{chr(65+i)}: {opt}", variable=self.mcq_ans_var, value=i, command=lambda i=i: self._record_answer(index, i)).pack(anchor="w", pady=2)
-            if self.user_answers[index] is not None:
-                self.mcq_ans_var.set(self.user_answers[index])
+                self.mcq_buttons[i].config(text=f"{chr(65+i)}: {opt}")
+            for button in self.mcq_buttons[n:self._mcq_packed]:
+                button.pack_forget()
+            for button in self.mcq_buttons[self._mcq_packed:n]:
+                button.pack(anchor="w", pady=2)
+            self._mcq_packed = n
+            self.mcq_ans_var.set(answer)
+            self._show_controls(self.mcq_controls)
+
+    def _show_controls(self, frame):
+        # switch between the TF and MCQ sets only when the question type changes
+        if frame is self._shown_controls:
+            return
+        if self._shown_controls is not None:
+            self._shown_controls.pack_forget()
+        if frame is not None:
+            frame.pack(anchor="w")
+        self._shown_controls = frame
 
     def _record_answer(self, qindex, val):
         # val for TF: 1=True,0=False ; for MCQ: index 0-3
         self.user_answers[qindex] = int(val)
+        if self._adaptive is not None:
+            self._adaptive.record(qindex, int(val) == expected_answer(self.current_quiz_questions[qindex]))
         self.status_var.set(f"Odgovor za pitanje {qindex+1} spremljen.")
 
     def next_question(self):
         if not self.current_quiz_questions:
             return
+        if self._adaptive is not None and self.current_index == len(self.current_quiz_questions)-1:
+            # the next question is the most informative one at the current ability estimate
+            position = self._adaptive.next_position()
+            if position is None:
+                self.status_var.set("To je bilo zadnje pitanje – završite kviz.")
+                return
+            self._quiz_positions.append(position)
+            self.current_quiz_questions.append(self.pitanja[position])
+            self.user_answers.append(None)
         if self.current_index < len(self.current_quiz_questions)-1:
             self.current_index += 1
             self.show_question(self.current_index)
@@ -402,27 +2521,360 @@ class KvizApp:
         confirmed = messagebox.askyesno("Potvrda", "Jeste li sigurni da želite završiti kviz?")
         if not confirmed:
             return
-        correct = 0
-        total = len(self.current_quiz_questions)
-        for i, q in enumerate(self.current_quiz_questions):
-            ans = self.user_answers[i]
-            if ans is None:
-                continue
-            if q.tip == "TF":
-                expected = 1 if q.tocan else 0
-                if ans == expected:
-                    correct += 1
-            else:
-                if ans == q.tocan_index:
-                    correct += 1
-        pct = (correct/total)*100 if total>0 else 0
+        sheet = [-1 if ans is None else ans for ans in self.user_answers]
+        report = AnswerKey(self.current_quiz_questions).grade([sheet])
+        correct = int(report.scores[0])
+        total = report.question_count
+        pct = report.percentages()[0]
+        if self.attempt_log is None:
+            self.attempt_log = AttemptLog()
+        record = attempt_record(self.current_quiz_questions, self.user_answers, correct,
+                                self._quiz_started, time.time())
+        self.attempt_log.record(record)
+        if self._stats_pending is not None:
+            self._stats_pending.append(record)
+        else:
+            self.item_stats.add_record(record)
+            self._refresh_rows(self._quiz_positions)
         messagebox.showinfo("Rezultat kviza", f"Točnih odgovora: {correct}/{total}\nPostotak: {pct:.1f}%")
-        self.quiz_info_var.set(f"Kviz završen: {correct}/{total} točno ({pct:.1f}%)")
+        self.quiz_info_var.set(f"Kviz završen: {correct}/{total} točno ({pct:.1f}%)"
+                               + (f", procjena sposobnosti θ = {self._adaptive.theta:+.2f} ± {self._adaptive.se:.2f}"
+                                  if self._adaptive is not None else ""))
+        if self.attempt_log.error is not None:
+            self.status_var.set(f"Zapis pokušaja nije uspio: {self.attempt_log.error}")
         # disable navigation
         self.btn_next.config(state="disabled")
         self.btn_prev.config(state="disabled")
         self.btn_submit.config(state="disabled")
 
+# ========== Benchmark ==========
+def _sample_bank(n):
+    for i in range(n):
+        if i % 2:
+            yield PitanjeTF(f"Tvrdnja broj {i} je točna.", bool(i % 3))
+        else:
+            yield PitanjeMCQ(f"Koliko je {i} + 1?", [str(i), str(i + 1), str(i + 2), str(i - 1)], 1)
+
+
+def benchmark(n=200_000):
+    import tempfile
+    import tracemalloc
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "pitanja.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([p.to_dict() for p in _sample_bank(n)], f, ensure_ascii=False, indent=2)
+        size = os.path.getsize(path) / 1e6
+
+        tracemalloc.start()
+        t = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as f:
+            loaded = [Pitanje.from_dict(item) for item in json.load(f)]
+        elapsed = time.perf_counter() - t
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{n} pitanja ({size:.0f} MB): json.load {elapsed:.2f} s, vrh memorije {peak / 1e6:.0f} MB")
+        del loaded
+
+        tracemalloc.start()
+        t = time.perf_counter()
+        out, cancel = queue.Queue(maxsize=8), threading.Event()
+        worker = threading.Thread(target=load_questions_in_batches, args=(path, out, cancel))
+        worker.start()
+        loaded, first = [], None
+        while True:
+            kind, data, _ = out.get()
+            if kind != "batch":
+                break
+            loaded.extend(data[0])
+            if first is None:
+                first = time.perf_counter() - t
+        worker.join()
+        elapsed = time.perf_counter() - t
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  streaming: {len(loaded)} pitanja, {elapsed:.2f} s, prva serija nakon {first * 1e3:.1f} ms, "
+              f"vrh memorije {peak / 1e6:.0f} MB")
+
+
+def benchmark_save(n=1_000_000):
+    import tempfile
+    import tracemalloc
+
+    questions = list(_sample_bank(n))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "pitanja.json")
+        # the first pass is timed, the second measures memory (tracemalloc slows everything down)
+        for compact, traced in ((False, False), (True, False), (False, True)):
+            if traced:
+                tracemalloc.start()
+            t = time.perf_counter()
+            out, cancel = queue.Queue(maxsize=8), threading.Event()
+            worker = threading.Thread(target=save_questions_in_background,
+                                      args=(questions, n, path, out, cancel, compact))
+            worker.start()
+            while out.get()[0] == "progress":
+                pass
+            worker.join()
+            if traced:
+                print(f"  vrh dodatne memorije pri spremanju: {tracemalloc.get_traced_memory()[1] / 1e3:.0f} kB")
+                tracemalloc.stop()
+            else:
+                print(f"spremanje {n} pitanja{' (kompaktno)' if compact else ''}: "
+                      f"{time.perf_counter() - t:.2f} s, {os.path.getsize(path) / 1e6:.0f} MB")
+
+
+def benchmark_binary(n=1_000_000):
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as folder:
+        json_path = os.path.join(folder, "pitanja.json")
+        bin_path = os.path.join(folder, "pitanja" + BINARY_SUFFIX)
+        write_bank(_sample_bank(n), json_path)
+        t = time.perf_counter()
+        convert_bank(json_path, bin_path)
+        print(f"pretvorba {n} pitanja JSON -> {BINARY_SUFFIX}: {time.perf_counter() - t:.2f} s, "
+              f"{os.path.getsize(json_path) / 1e6:.0f} MB -> {os.path.getsize(bin_path) / 1e6:.0f} MB")
+        t = time.perf_counter()
+        bank = BinaryBank(bin_path)
+        opened = time.perf_counter() - t
+        quiz = random.sample(bank, 5)
+        print(f"  otvaranje: {opened * 1e3:.2f} ms, otvaranje + 5 nasumičnih pitanja: "
+              f"{(time.perf_counter() - t) * 1e3:.2f} ms ({quiz[0].tekst!r})")
+        t = time.perf_counter()
+        convert_bank(bin_path, json_path)
+        print(f"  pretvorba natrag u JSON: {time.perf_counter() - t:.2f} s")
+
+
+def benchmark_navigation(rounds=1000):
+    """Average Sljedeće/Prethodno latency including the Tk redraw (needs a display).
+
+    Also counts the widgets created while navigating, which does not depend
+    on the machine: the same function run on the revision before widget
+    reuse gives the baseline for both numbers.
+    """
+    def widgets(w):
+        return [w] + [d for c in w.winfo_children() for d in widgets(c)]
+
+    def created(w):
+        # tkinter numbers the children of each widget (!radiobutton, !radiobutton2, ...)
+        return sum(sum((getattr(d, "_last_child_ids", None) or {}).values()) for d in widgets(w))
+
+    root = tk.Tk()
+    app = KvizApp(root)
+    app.quiz_count.set(len(app.pitanja))
+    app.start_quiz()
+    root.update()
+    before = created(root)
+    t = time.perf_counter()
+    for k in range(rounds):
+        # walk forward and back so TF and MCQ questions alternate
+        if (k // (len(app.current_quiz_questions) - 1)) % 2 == 0:
+            app.next_question()
+        else:
+            app.prev_question()
+        root.update()
+    elapsed = time.perf_counter() - t
+    print(f"navigacija kroz pitanja: {elapsed / rounds * 1e3:.3f} ms po kliku, "
+          f"{created(root) - before} novih widgeta u {rounds} klikova")
+    root.destroy()
+
+
+def benchmark_grading(students=200_000, questions=50):
+    quiz = list(_sample_bank(questions))
+    key = AnswerKey(quiz)
+    rng = random.Random(1)
+    sheets = [[rng.randrange(-1, 4) if q.tip == "MCQ" else rng.randrange(-1, 2) for q in quiz]
+              for _ in range(students)]
+    t = time.perf_counter()
+    report = key.grade(sheets)
+    elapsed = time.perf_counter() - t
+    print(f"ocjenjivanje {students} listova x {questions} pitanja ({'NumPy' if np is not None else 'bytes'}): "
+          f"{elapsed:.3f} s, {students * questions / elapsed / 1e6:.1f} M odgovora/s")
+    # the same as the old per-answer loop
+    expected = [sum(a == expected_answer(q) for a, q in zip(sheet, quiz)) for sheet in sheets[:1000]]
+    assert list(report.scores[:1000]) == expected
+
+
+def benchmark_sampling(n=2_000_000, k=50):
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "pitanja" + BINARY_SUFFIX)
+        write_bank(_sample_bank(n), path)
+        bank = BinaryBank(path)
+        sampler = QuestionSampler(bank)
+        t = time.perf_counter()
+        sampler.buckets()
+        print(f"{n} pitanja: košare po tipu {(time.perf_counter() - t) * 1e3:.0f} ms")
+        for mix in (None, {"MCQ": 60, "TF": 40}):
+            t = time.perf_counter()
+            for seed in range(1000):
+                sampler.sample(k, mix, seed)
+            print(f"  {k} pitanja, omjer {mix}: {(time.perf_counter() - t) * 1e3 / 1000:.3f} ms po kvizu")
+
+        rng = random.Random(0)
+        weighted = QuestionSampler(bank, array("d", (rng.random() for _ in range(n))))
+        t = time.perf_counter()
+        weighted.sample(k, {"MCQ": 60, "TF": 40}, 0)
+        print(f"  težinski: tablice {time.perf_counter() - t:.2f} s (jednom)", end="")
+        t = time.perf_counter()
+        for seed in range(1000):
+            weighted.sample(k, {"MCQ": 60, "TF": 40}, seed)
+        print(f", zatim {(time.perf_counter() - t) * 1e3 / 1000:.3f} ms po kvizu")
+        assert weighted.sample(k, None, 7) == weighted.sample(k, None, 7)
+
+
+def benchmark_duplicates(n=1_000_000, every=100):
+    """Near-duplicate report on n varied questions, every `every`-th a reworded copy of an earlier one."""
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcdefghijklmnoprstuvzčćšž") for _ in range(rng.randint(3, 9))) for _ in range(20000)]
+    bank, copies = [], set()
+    for i in range(n):
+        if i % every == every - 1:
+            tekst = bank[rng.randrange(i)].tekst.split()
+            tekst[rng.randrange(len(tekst))] = rng.choice(words)       # change a word
+            tekst.insert(rng.randrange(len(tekst)), rng.choice(words))  # and add one
+            tekst = " ".join(tekst).capitalize() + "?"
+            copies.add(i)
+        else:
+            tekst = " ".join(rng.choice(words) for _ in range(rng.randint(8, 14))) + "?"
+        bank.append(PitanjeTF(tekst, True))
+
+    t = time.perf_counter()
+    groups = near_duplicate_groups(bank)
+    elapsed = time.perf_counter() - t
+    flagged = {i for g in groups for i in g[1:]}
+    print(f"{n} pitanja: izvještaj o sličnima {elapsed:.1f} s, {len(groups)} skupina, "
+          f"pronađeno {len(flagged & copies)}/{len(copies)} prerađenih kopija, lažnih: {len(flagged - copies)}")
+
+    t = time.perf_counter()
+    index = NearDuplicateIndex.build(bank)
+    print(f"  indeks za dodavanje: {time.perf_counter() - t:.1f} s")
+    t = time.perf_counter()
+    for i in range(1000):
+        index.similar(bank[i * (n // 1000)].tekst)
+    print(f"  provjera novog pitanja: {(time.perf_counter() - t) * 1e3 / 1000:.3f} ms")
+
+
+def benchmark_search(n=1_000_000):
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcdefghijklmnoprstuvzčćšž") for _ in range(rng.randint(3, 9))) for _ in range(20000)]
+    bank = [PitanjeTF(" ".join(rng.choice(words) for _ in range(rng.randint(8, 14))) + "?", True)
+            if i % 2 else PitanjeMCQ(f"Koliko je {i} + 1?", [str(i), str(i + 1), str(i + 2), str(i - 1)], 1)
+            for i in range(n)]
+    t = time.perf_counter()
+    index = SearchIndex.build(bank)
+    print(f"{n} pitanja: indeks za pretragu {time.perf_counter() - t:.1f} s, {len(index._postings)} riječi")
+    for query in [words[0], f"{words[1]} {words[2]}", words[3][:3], "koliko je 12345", "koliko", "1234",
+                  "nepostojeća riječ"]:
+        t = time.perf_counter()
+        result = index.search(query)
+        print(f"  {query!r}: {result.total}{'' if result.complete else '+'} pogodaka, "
+              f"{(time.perf_counter() - t) * 1e3:.1f} ms")
+    t = time.perf_counter()
+    index.remove(0)
+    index.add(PitanjeTF("Novo pitanje", True))
+    print(f"  brisanje i dodavanje pitanja: {(time.perf_counter() - t) * 1e3:.3f} ms")
+
+
+def benchmark_attempt_log(n=200_000):
+    import tempfile
+
+    bank = list(_sample_bank(1000))
+    attempts = []
+    for i in range(n):
+        quiz = bank[i % 995:i % 995 + 5]
+        attempts.append(attempt_record(quiz, [1, 0, None, 1, 2], 2, 1.7e9 + i, 1.7e9 + i + 60, "bench"))
+    for policy in _FSYNC_POLICIES:
+        with tempfile.TemporaryDirectory() as folder:
+            log = AttemptLog(folder, fsync=policy, segment_bytes=16 << 20)
+            t = time.perf_counter()
+            for a in attempts:
+                log.record(a)
+            queued = time.perf_counter() - t
+            log.close()
+            elapsed = time.perf_counter() - t
+            assert sum(1 for _ in iter_attempts(folder)) == n
+            print(f"{n} pokušaja, fsync={policy}: record() {queued / n * 1e6:.2f} µs, "
+                  f"sve zapisano za {elapsed:.2f} s ({n / elapsed:,.0f}/s), "
+                  f"{len(log_segments(folder))} segmenata")
+
+
+def benchmark_item_stats(attempts=200_000, k=10):
+    import tempfile
+
+    bank = list(_sample_bank(2000))
+    rng = random.Random(0)
+    ability = [rng.random() for _ in range(1000)]
+    with tempfile.TemporaryDirectory() as folder:
+        log = AttemptLog(folder, fsync="never")
+        for i in range(attempts):
+            quiz = rng.sample(bank, k)
+            a = ability[i % len(ability)]
+            answers = [expected_answer(q) if rng.random() < a else (1 - expected_answer(q) if q.tip == "TF" else rng.randrange(4))
+                       for q in quiz]
+            correct = sum(x == expected_answer(q) for x, q in zip(answers, quiz))
+            log.record(attempt_record(quiz, answers, correct, 0.0, 0.0, "bench"))
+        log.close()
+        records = list(iter_attempts(folder))
+
+        t = time.perf_counter()
+        stats = ItemStatistics()
+        for record in records:
+            stats.add_record(record)
+        streaming = time.perf_counter() - t
+        print(f"{attempts} pokušaja ({attempts * k} odgovora): postupno {streaming / (attempts * k) * 1e6:.2f} µs po odgovoru")
+        t = time.perf_counter()
+        bulk = ItemStatistics.from_attempts(records)
+        print(f"  odjednom ({'NumPy' if np is not None else 'bez NumPyja'}): {time.perf_counter() - t:.2f} s, "
+              f"iz dnevnika s čitanjem: ", end="")
+        t = time.perf_counter()
+        ItemStatistics.from_log(folder)
+        print(f"{time.perf_counter() - t:.2f} s")
+        q = question_id(bank[0])
+        a, b = stats.get(q), bulk.get(q)
+        assert a.attempts == b.attempts and a.choices == b.choices and abs(a.discrimination - b.discrimination) < 1e-9
+        print(f"  {bank[0].tekst!r}: p={a.difficulty:.2f} r={a.discrimination:+.2f} odgovori {a.choices}")
+
+
+def benchmark_adaptive(n=100_000, quizzes=200, length=30):
+    rng = random.Random(0)
+    bank = list(_sample_bank(n))
+    calibrated = [(rng.uniform(0.3, 2.5), rng.gauss(0, 1.2), 0.5 if q.tip == "TF" else 0.25) for q in bank]
+    default = [item_parameters(q) for q in bank]      # what the app uses before any answers are logged
+    cases = {"kalibrirano": calibrated, "bez statistike": None,
+             "10% kalibrirano": [c if rng.random() < 0.1 else d for c, d in zip(calibrated, default)]}
+    for name, parameters in cases.items():
+        t = time.perf_counter()
+        irt = ItemParameters.build(bank) if parameters is None else ItemParameters(bank, parameters=parameters)
+        print(f"{n} pitanja, {name}: parametri i indeks {time.perf_counter() - t:.2f} s, "
+              f"{len(irt._buckets)} košara, {len(irt._run_start) - 1} različitih parametara")
+
+        for theta in (-2.5, 0.0, 1.3):     # the index finds a best question of a full scan
+            exclude = set(rng.sample(range(n), 30))
+            best = irt.most_informative(theta, exclude, choices=1)
+            top = max(irt.information(i, theta) for i in range(n) if i not in exclude)
+            assert best not in exclude and irt.information(best, theta) == top, theta
+
+        selections, errors, asked = [], [], set()
+        for k in range(quizzes):
+            true_theta = rng.gauss(0, 1)
+            session = AdaptiveSession(irt, length, seed=k)
+            for index in range(length):
+                t = time.perf_counter()
+                i = session.next_position()
+                selections.append(time.perf_counter() - t)
+                asked.add(i)
+                session.record(index, rng.random() < irt.probability(i, true_theta))
+            errors.append((session.theta - true_theta) ** 2)
+        selections.sort()
+        print(f"  izbor sljedećeg pitanja: prosjek {sum(selections) / len(selections) * 1e3:.2f} ms, "
+              f"p99 {selections[int(len(selections) * 0.99)] * 1e3:.2f} ms, "
+              f"najviše {selections[-1] * 1e3:.2f} ms; RMSE procjene nakon {length} pitanja "
+              f"{math.sqrt(sum(errors) / len(errors)):.2f}, {len(asked)} različitih pitanja")
+
+
 # ========== Run app ==========
 def main():
     root = tk.Tk()
@@ -431,4 +2883,23 @@ def main():
     root.mainloop()
 
 if __name__ == '__main__':
+    if "--bench" in sys.argv:
+        benchmark()
+        benchmark_save()
+        benchmark_binary()
+        benchmark_grading()
+        benchmark_sampling()
+        benchmark_duplicates()
+        benchmark_search()
+        benchmark_attempt_log()
+        benchmark_item_stats()
+        benchmark_adaptive()
+        sys.exit()
+    if "--bench-ui" in sys.argv:
+        benchmark_navigation()
+        sys.exit()
+    if "--convert" in sys.argv:
+        src, dst = sys.argv[sys.argv.index("--convert") + 1:][:2]
+        convert_bank(src, dst, compact="--compact" in sys.argv)
+        sys.exit()
     main()
@@ -0,0 +1,219 @@
+# Indeksi za pretragu učenika
+#
+# Prefiks-indeks po prezimenu i imenu je niz brojeva redaka (array("I"))
+# poredan po ključu, a ključ se pri bisekciji čita iz same tablice – indeks
+# zato zauzima samo 4 bajta po učeniku i ne kopira nijedan string.
+# Hash-indeks po razredu je rječnik razred -> uzlazni niz brojeva redaka.
+#
+# Brisanje ne prenumerira indekse: indeksi pamte "id" retka (broj retka
+# kakav je bio prije brisanja), a obrisani id-evi stoje u poredanom nizu,
+# pa je redak = id - broj obrisanih id-eva manjih od njega. Tek kad se
+# obrisanih skupi dovoljno, indeksi se prenumeriraju odjednom.
+
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, islice
+
+_KRAJ = "\U0010ffff"    # veći od svakog znaka – gornja granica raspona prefiksa
+
+
+class IndeksUcenika:
+    """Prefiks-indeks (prezime, ime) i hash-indeks (razred) nad nizom učenika.
+
+    `ucenici` je bilo koji niz s len() i [] čiji elementi imaju ime, prezime
+    i razred (lista Ucenik objekata ili TablicaUcenika).
+    """
+
+    def __init__(self, ucenici):
+        self.ucenici = ucenici
+        self._po_prezimenu = array("I")
+        self._po_imenu = array("I")
+        self._po_razredu = {}
+        self._obrisani = array("I")     # poredani id-evi obrisanih redaka
+
+    def _redak(self, id_):
+        return id_ - bisect_left(self._obrisani, id_) if self._obrisani else id_
+
+    def _id(self, i):
+        """Id retka i: najmanji id s točno i živih id-eva ispred sebe."""
+        if not self._obrisani:
+            return i
+        lo, hi = i, i + len(self._obrisani)
+        while lo < hi:
+            sredina = (lo + hi) // 2
+            if sredina + 1 - bisect_right(self._obrisani, sredina) < i + 1:
+                lo = sredina + 1
+            else:
+                hi = sredina
+        return lo
+
+    def _u_retke(self, idevi):
+        if not self._obrisani:
+            return idevi
+        return array("I", (j - bisect_left(self._obrisani, j) for j in idevi))
+
+    def _prezime(self, id_):
+        return self.ucenici[self._redak(id_)].prezime.casefold()
+
+    def _ime(self, id_):
+        return self.ucenici[self._redak(id_)].ime.casefold()
+
+    def izgradi(self):
+        """Gradi sve indekse odjednom (O(n log n)) – npr. nakon učitavanja."""
+        n = len(self.ucenici)
+        self._po_prezimenu = array("I", sorted(range(n), key=self._prezime))
+        self._po_imenu = array("I", sorted(range(n), key=self._ime))
+        self._po_razredu = {}
+        self._obrisani = array("I")
+        for i in range(n):
+            self._po_razredu.setdefault(self.ucenici[i].razred.casefold(), array("I")).append(i)
+
+    def dodaj(self, i):
+        """Dodaje redak i (npr. novi učenik ili redak nakon izmjene)."""
+        id_ = self._id(i)
+        insort(self._po_prezimenu, id_, key=self._prezime)
+        insort(self._po_imenu, id_, key=self._ime)
+        redci = self._po_razredu.setdefault(self.ucenici[i].razred.casefold(), array("I"))
+        redci.insert(bisect_left(redci, id_), id_)
+
+    def ukloni(self, i, brisanje=False):
+        """Uklanja redak i; poziva se dok redak još ima stare vrijednosti.
+
+        Uz brisanje=True brojevi redaka iza i smanjuju se za jedan, kao što
+        će se dogoditi u tablici nakon del ucenici[i]. Id retka tada ide u
+        niz obrisanih (O(log n)); prenumeriranje svih indeksa (O(n)) radi se
+        tek kad obrisanih bude više od osmine redaka.
+        """
+        id_ = self._id(i)
+        for redci, kljuc in ((self._po_prezimenu, self._prezime), (self._po_imenu, self._ime)):
+            k = kljuc(id_)
+            lo = bisect_left(redci, k, key=kljuc)
+            hi = bisect_right(redci, k, key=kljuc)
+            del redci[lo + redci[lo:hi].index(id_)]
+        redci = self._po_razredu[self.ucenici[i].razred.casefold()]
+        del redci[bisect_left(redci, id_)]
+        if brisanje:
+            insort(self._obrisani, id_)
+            if len(self._obrisani) > max(1000, len(self.ucenici) // 8):
+                self._prenumeriraj()
+
+    def _prenumeriraj(self):
+        # poziva se prije del ucenici[i], dok je obrisani redak još u tablici – _redak()
+        # ne ovisi o tablici, pa id-evi postaju točno brojevi redaka nakon brisanja
+        self._po_prezimenu = self._u_retke(self._po_prezimenu)
+        self._po_imenu = self._u_retke(self._po_imenu)
+        for razred, redci in self._po_razredu.items():
+            self._po_razredu[razred] = self._u_retke(redci)
+        self._obrisani = array("I")
+
+    def _raspon(self, redci, kljuc, prefiks):
+        lo = bisect_left(redci, prefiks, key=kljuc)
+        return lo, bisect_left(redci, prefiks + _KRAJ, lo, key=kljuc)
+
+    def _odgovara(self, i, rijec):
+        return self._prezime(i).startswith(rijec) or self._ime(i).startswith(rijec)
+
+    def trazi(self, upit="", razred="", najvise=None):
+        """Vraća array brojeva redaka koji odgovaraju upitu, ili None ako filtra nema.
+
+        Svaka riječ upita mora biti početak imena ili prezimena, a razred se
+        uspoređuje točno (bez obzira na velika/mala slova). Pretraga kreće od
+        najmanjeg raspona u indeksu, a ostale uvjete provjerava samo na tim
+        kandidatima; uz `najvise` staje nakon toliko pogodaka. Redoslijed je
+        po prezimenu pa po imenu, odnosno redoslijed unosa kad je najmanji
+        skup kandidata razred.
+        """
+        rijeci = upit.casefold().split()
+        razred = razred.strip().casefold()
+        if not rijeci and not razred:
+            return None
+        u_razredu = self._po_razredu.get(razred, array("I")) if razred else None
+        if not rijeci:
+            return self._u_retke(u_razredu[:najvise])
+
+        rasponi = {r: (self._raspon(self._po_prezimenu, self._prezime, r),
+                       self._raspon(self._po_imenu, self._ime, r)) for r in rijeci}
+
+        def velicina(r):
+            (p_lo, p_hi), (i_lo, i_hi) = rasponi[r]
+            return p_hi - p_lo + i_hi - i_lo
+
+        vodeca = min(rijeci, key=velicina)
+        (p_lo, p_hi), (i_lo, i_hi) = rasponi[vodeca]
+        po_prezimenu = self._po_prezimenu[p_lo:p_hi]
+        # redak kojem i prezime i ime počinju riječju već je među pogocima po prezimenu
+        po_imenu = (i for i in self._po_imenu[i_lo:i_hi] if not self._prezime(i).startswith(vodeca))
+        ostale = [r for r in rijeci if r != vodeca]
+
+        if u_razredu is None and not ostale:
+            rezultat = po_prezimenu[:najvise]
+            if najvise is None or len(rezultat) < najvise:
+                rezultat.extend(po_imenu if najvise is None else islice(po_imenu, najvise - len(rezultat)))
+            return self._u_retke(rezultat)
+
+        if u_razredu is not None and len(u_razredu) < velicina(vodeca):
+            kandidati, ostale, skup_razreda = u_razredu, rijeci, None
+        else:
+            kandidati = chain(po_prezimenu, po_imenu)
+            skup_razreda = set(u_razredu) if u_razredu is not None else None
+
+        rezultat = array("I")
+        for i in kandidati:
+            if skup_razreda is not None and i not in skup_razreda:
+                continue
+            if all(self._odgovara(i, r) for r in ostale):
+                rezultat.append(i)
+                if najvise is not None and len(rezultat) >= najvise:
+                    break
+        return self._u_retke(rezultat)
+
+
+class PogledRezultata:
+    """Niz rezultata pretrage: pogled[k] je ucenici[redci[k]]."""
+
+    def __init__(self, ucenici, redci):
+        self.ucenici = ucenici
+        self.redci = redci
+
+    def __len__(self):
+        return len(self.redci)
+
+    def __getitem__(self, k):
+        return self.ucenici[self.redci[k]]
+
+
+def benchmark(n=1_000_000):
+    """Trajanje pretrage na n učenika (TablicaUcenika)."""
+    from tablica_ucenika import TablicaUcenika
+
+    class U:
+        def __init__(self, ime, prezime, razred):
+            self.ime, self.prezime, self.razred = ime, prezime, razred
+
+    imena = ["Ana", "Ivan", "Marko", "Petra", "Luka", "Iva", "Josip", "Marija", "Karlo", "Nika"]
+    prezimena = ["Horvat", "Kovačević", "Babić", "Marić", "Jurić", "Novak", "Kovačić", "Knežević", "Vuković", "Marković"]
+    tablica = TablicaUcenika()
+    for i in range(n):
+        tablica.append(U(f"{imena[i % 10]}{i % 997}", f"{prezimena[i // 10 % 10]}{i % 1009}", f"{i % 4 + 1}{'abcdef'[i % 6]}"))
+
+    t = time.perf_counter()
+    indeks = IndeksUcenika(tablica)
+    indeks.izgradi()
+    print(f"{n} učenika: izgradnja indeksa {time.perf_counter() - t:.2f} s")
+
+    for upit, razred in [("hor", ""), ("horvat1", ""), ("ana horvat12", ""), ("", "3a"), ("mar", "2c"), ("iva7", ""), ("m", "")]:
+        for najvise in (None, 1000):
+            t = time.perf_counter()
+            rezultat = indeks.trazi(upit, razred, najvise)
+            print(f"  trazi({upit!r}, {razred!r}, najvise={najvise}): {len(rezultat)} rezultata, "
+                  f"{(time.perf_counter() - t) * 1e3:.2f} ms")
+
+    t = time.perf_counter()
+    tablica.append(U("Novi", "Učenik", "4a"))
+    indeks.dodaj(len(tablica) - 1)
+    print(f"  dodavanje jednog učenika u indeks: {(time.perf_counter() - t) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
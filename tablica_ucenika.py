@@ -0,0 +1,222 @@
+# Kompaktna stupčana tablica učenika
+#
+# Umjesto liste Ucenik objekata (svaki s vlastitim __dict__ i tri str objekta)
+# ime i prezime stoje jedno do drugog kao UTF-8 bajtovi u jednom bytearray-u
+# (pa po učeniku treba samo jedan pomak i dvije duljine), a razred je
+# kodiran rječnikom – svaki različiti razred ("4a", "4b", ...) zapisan je samo
+# jednom, a po učeniku se pamti samo njegov kod.
+
+import sys
+import time
+import tracemalloc
+from array import array
+
+
+class RedakUcenika:
+    """Pogled na jedan redak tablice s istim atributima kao Ucenik.
+
+    Pogled ne kopira podatke: čitanje dekodira tekst iz tablice, a
+    postavljanje (u.ime = ...) mijenja tablicu. Nakon brisanja redaka ispred
+    njega pogled pokazuje na drugog učenika, pa ga ne treba dugo čuvati.
+    """
+
+    __slots__ = ("_tablica", "_i")
+
+    def __init__(self, tablica, i):
+        self._tablica = tablica
+        self._i = i
+
+    @property
+    def ime(self):
+        return self._tablica._tekst(0, self._i)
+
+    @ime.setter
+    def ime(self, vrijednost):
+        t = self._tablica
+        t._zapisi_redak(self._i, t._kodiraj(vrijednost), t._bajtovi(1, self._i))
+
+    @property
+    def prezime(self):
+        return self._tablica._tekst(1, self._i)
+
+    @prezime.setter
+    def prezime(self, vrijednost):
+        t = self._tablica
+        t._zapisi_redak(self._i, t._bajtovi(0, self._i), t._kodiraj(vrijednost))
+
+    @property
+    def razred(self):
+        return self._tablica._razredi[self._tablica._kod[self._i]]
+
+    @razred.setter
+    def razred(self, vrijednost):
+        self._tablica._kod[self._i] = self._tablica._kodiraj_razred(vrijednost)
+
+
+class TablicaUcenika:
+    """Niz učenika spremljen po stupcima.
+
+    Ponaša se kao lista za ono što aplikacije koriste (len, [], iteracija,
+    append, extend, clear, del), a tablica[i] vraća pogled klase `pogled`
+    (podrazred RedakUcenika, obično s __str__ odgovarajuće aplikacije).
+    Više polja odjednom mijenja se s izmijeni(), koja ne mijenja ništa ako
+    ijedno polje ne prolazi provjeru.
+    """
+
+    def __init__(self, pogled=RedakUcenika):
+        self._pogled = pogled
+        self._spremnik = bytearray()                        # UTF-8 imena i prezimena
+        self._pocetak = array("I")                          # pomak retka (ime pa prezime) u spremniku
+        self._duljina = (array("H"), array("H"))            # (ime, prezime) – duljina u bajtovima
+        self._kod = array("H")                              # kod razreda po učeniku
+        self._razredi = []                                  # kod -> razred
+        self._kodovi = {}                                   # razred -> kod
+        self._smece = 0                                     # bajtovi starih vrijednosti nakon izmjena
+
+    # --- sučelje liste ---
+    def __len__(self):
+        return len(self._kod)
+
+    def __getitem__(self, i):
+        return self._pogled(self, self._indeks(i))
+
+    def __iter__(self):
+        for i in range(len(self._kod)):
+            yield self._pogled(self, i)
+
+    def __delitem__(self, i):
+        self._smece += self._duljina[0][i] + self._duljina[1][i]
+        del self._pocetak[i]
+        for stupac in (0, 1):
+            del self._duljina[stupac][i]
+        del self._kod[i]
+
+    def append(self, u):
+        # sve se provjeri prije prve promjene, da stupci ostanu jednake duljine
+        ime, prezime = self._kodiraj(u.ime), self._kodiraj(u.prezime)
+        kod = self._kodiraj_razred(u.razred)
+        self._pocetak.append(len(self._spremnik))
+        self._duljina[0].append(len(ime))
+        self._duljina[1].append(len(prezime))
+        self._spremnik += ime
+        self._spremnik += prezime
+        self._kod.append(kod)
+
+    def extend(self, ucenici):
+        for u in ucenici:
+            self.append(u)
+
+    def izmijeni(self, i, ime, prezime, razred):
+        """Postavlja sva tri polja retka i; ako ijedno ne prolazi, redak ostaje kakav je bio."""
+        i = self._indeks(i)
+        b_ime, b_prezime = self._kodiraj(ime), self._kodiraj(prezime)
+        kod = self._kodiraj_razred(razred)
+        self._zapisi_redak(i, b_ime, b_prezime)
+        self._kod[i] = kod
+
+    def clear(self):
+        self.__init__(self._pogled)
+
+    def kopija(self):
+        """Neovisna kopija (memcpy stupaca) – npr. za spremanje u drugoj dretvi."""
+        k = TablicaUcenika(self._pogled)
+        k._spremnik = bytearray(self._spremnik)
+        k._pocetak = array("I", self._pocetak)
+        k._duljina = tuple(array("H", a) for a in self._duljina)
+        k._kod = array("H", self._kod)
+        k._razredi = list(self._razredi)
+        k._kodovi = dict(self._kodovi)
+        k._smece = self._smece
+        return k
+
+    def velicina_u_bajtovima(self):
+        stupci = [self._spremnik, self._kod, self._pocetak, *self._duljina]
+        return sum(sys.getsizeof(s) for s in stupci) + sum(sys.getsizeof(r) for r in self._razredi)
+
+    # --- interno ---
+    def _indeks(self, i):
+        n = len(self._kod)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("indeks učenika izvan raspona")
+        return i
+
+    def _bajtovi(self, stupac, i):
+        p = self._pocetak[i] + (self._duljina[0][i] if stupac else 0)
+        return self._spremnik[p:p + self._duljina[stupac][i]]
+
+    def _tekst(self, stupac, i):
+        return self._bajtovi(stupac, i).decode("utf-8")
+
+    @staticmethod
+    def _kodiraj(tekst):
+        b = tekst.encode("utf-8")
+        if len(b) > 0xFFFF:     # duljine su u array("H")
+            raise ValueError(f"tekst je predug: {len(b)} bajtova, najviše 65535")
+        return b
+
+    def _zapisi_redak(self, i, ime, prezime):
+        # novi redak ide na kraj spremnika; stari postaje smeće
+        self._smece += self._duljina[0][i] + self._duljina[1][i]
+        self._pocetak[i] = len(self._spremnik)
+        self._duljina[0][i] = len(ime)
+        self._duljina[1][i] = len(prezime)
+        self._spremnik += ime
+        self._spremnik += prezime
+        if self._smece > (1 << 20) and self._smece * 2 > len(self._spremnik):
+            self._sazmi_spremnik()
+
+    def _sazmi_spremnik(self):
+        novi = bytearray()
+        pocetak, (ime, prezime) = self._pocetak, self._duljina
+        for i in range(len(pocetak)):
+            p = pocetak[i]
+            pocetak[i] = len(novi)
+            novi += self._spremnik[p:p + ime[i] + prezime[i]]
+        self._spremnik = novi
+        self._smece = 0
+
+    def _kodiraj_razred(self, razred):
+        kod = self._kodovi.get(razred)
+        if kod is None:
+            kod = len(self._razredi)
+            if kod > 0xFFFF:    # kodovi su u array("H")
+                raise ValueError("previše različitih razreda (najviše 65536)")
+            self._razredi.append(sys.intern(razred))
+            self._kodovi[razred] = kod
+        return kod
+
+
+def benchmark(n=1_000_000):
+    """Memorija za n učenika: lista običnih objekata naspram TablicaUcenika."""
+
+    class ObicanUcenik:
+        def __init__(self, ime, prezime, razred):
+            self.ime = ime
+            self.prezime = prezime
+            self.razred = razred
+
+    tracemalloc.start()
+    # razred se gradi za svaki redak posebno, kao kod čitanja iz CSV-a
+    lista = [ObicanUcenik(f"Ime{i}", f"Prezime{i}", f"{i % 4 + 1}{'abcdef'[i % 6]}") for i in range(n)]
+    obicno = tracemalloc.get_traced_memory()[0]
+    del lista
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    t = time.perf_counter()
+    tablica = TablicaUcenika()
+    for i in range(n):
+        tablica.append(ObicanUcenik(f"Ime{i}", f"Prezime{i}", f"{i % 4 + 1}{'abcdef'[i % 6]}"))
+    trajanje = time.perf_counter() - t
+    kompaktno = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{n} učenika: lista objekata {obicno / n:.0f} B/učenik, "
+          f"tablica {kompaktno / n:.0f} B/učenik ({obicno / kompaktno:.1f}x manje), "
+          f"punjenje tablice {trajanje:.2f} s")
+
+
+if __name__ == "__main__":
+    benchmark()
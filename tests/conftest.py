@@ -0,0 +1,18 @@
+# Moduli su u korijenu repozitorija (nisu paket), pa ih testovi uvoze odande.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(params=["python", "numpy"])
+def engine(request, monkeypatch):
+    """Runs a kviz_znanja test once on the pure-Python path and once with NumPy."""
+    import kviz_znanja
+    if request.param == "python":
+        monkeypatch.setattr(kviz_znanja, "np", None)
+    elif kviz_znanja.np is None:
+        pytest.skip("NumPy nije instaliran")
+    return request.param
@@ -0,0 +1,192 @@
+import csv
+import io
+import os
+import queue
+import threading
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from aleksej_kurbasi import DnevnikCSV, Ucenik, citaj_csv_u_serijama, iterparse_ucenike, zapisi_xml
+from tablica_ucenika import TablicaUcenika
+
+UCENICI = [("Ana", "Horvat", "4a"), ("Željko", "O'Brien, ml.", "4b"), ('Iva "Ivi"', "Babić", "1c")]
+
+
+def zapisi_csv(putanja, ucenici):
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ime", "prezime", "razred"])
+        writer.writerows(ucenici)
+
+
+def poruke(putanja, prekid=None):
+    red = queue.Queue()
+    citaj_csv_u_serijama(putanja, red, prekid or threading.Event())
+    return [red.get_nowait() for _ in range(red.qsize())]
+
+
+def test_citanje_u_serijama(tmp_path):
+    putanja = str(tmp_path / "ucenici.csv")
+    ucenici = [(f"Ime{i}", f"Prezime{i}", "1a") for i in range(6000)]
+    zapisi_csv(putanja, ucenici)
+    procitano = poruke(putanja)
+    # prva serija je mala kako bi se prvi retci odmah prikazali
+    assert [(vrsta, len(podaci or ())) for vrsta, podaci, _ in procitano] == \
+        [("serija", 200), ("serija", 5000), ("serija", 800), ("kraj", 0)]
+    udjeli = [udio for _, _, udio in procitano]
+    assert udjeli == sorted(udjeli) and udjeli[-1] == 1.0
+    assert [(u.ime, u.prezime, u.razred) for _, serija, _ in procitano[:-1] for u in serija] == ucenici
+
+
+def test_posebni_znakovi(tmp_path):
+    putanja = str(tmp_path / "ucenici.csv")
+    zapisi_csv(putanja, UCENICI)
+    (_, serija, _), kraj = poruke(putanja)
+    assert [(u.ime, u.prezime, u.razred) for u in serija] == UCENICI and kraj[0] == "kraj"
+
+
+def test_prekid_i_greska(tmp_path):
+    putanja = str(tmp_path / "ucenici.csv")
+    zapisi_csv(putanja, [("A", "B", "1a")] * 1000)
+    prekid = threading.Event()
+    prekid.set()
+    assert poruke(putanja, prekid) == []        # prekinuto čitanje ne šalje ni "kraj"
+    ((vrsta, greska, _),) = poruke(str(tmp_path / "nema.csv"))
+    assert vrsta == "greska" and isinstance(greska, FileNotFoundError)
+
+
+def test_iterparse_kao_findall(tmp_path):
+    putanja = tmp_path / "ucenici.xml"
+    putanja.write_text("<?xml version='1.0' encoding='utf-8'?>\n<evidencija>"
+                       "<ucenik><ime>Ana</ime><prezime>Horvat &amp; kći</prezime><razred>4a</razred></ucenik>"
+                       "<ucenik><ime>Bez</ime><prezime>Razreda</prezime></ucenik>"
+                       "<grupa><ucenik><ime>U</ime><prezime>Grupi</prezime><razred>1a</razred></ucenik></grupa>"
+                       "<ucenik><razred>2b</razred><prezime>Babić</prezime><ime>Ivo</ime></ucenik>"
+                       "</evidencija>", encoding="utf-8")
+    ocekivano = [(e.findtext("ime"), e.findtext("prezime"), e.findtext("razred"))
+                 for e in ET.parse(str(putanja)).getroot().findall("ucenik")]
+    ocekivano = [u for u in ocekivano if all(u)]
+    procitano = [(u.ime, u.prezime, u.razred) for u in iterparse_ucenike(str(putanja))]
+    assert procitano == ocekivano == [("Ana", "Horvat & kći", "4a"), ("Ivo", "Babić", "2b")]
+
+
+def elementtree_xml(ucenici):
+    root = ET.Element("evidencija")
+    for u in ucenici:
+        e = ET.SubElement(root, "ucenik")
+        for tag in ("ime", "prezime", "razred"):
+            ET.SubElement(e, tag).text = getattr(u, tag)
+    izlaz = io.BytesIO()
+    ET.ElementTree(root).write(izlaz, encoding="utf-8", xml_declaration=True)
+    return izlaz.getvalue()
+
+
+def test_zapisi_xml_kao_elementtree(tmp_path):
+    putanja = tmp_path / "ucenici.xml"
+    for ucenici in ([Ucenik(*u) for u in UCENICI] + [Ucenik("A<&>", "", "4\U0001F600")], []):
+        zapisi_xml(ucenici, str(putanja), velicina_serije=2)
+        assert putanja.read_bytes() == elementtree_xml(ucenici)
+
+
+def test_xml_round_trip(tmp_path):
+    putanja = tmp_path / "ucenici.xml"
+    zapisi_xml([Ucenik(*u) for u in UCENICI * 50], str(putanja), velicina_serije=7)
+    assert [(u.ime, u.prezime, u.razred) for u in iterparse_ucenike(str(putanja))] == UCENICI * 50
+
+
+def ucitaj(putanja, dnevnik=None):
+    """Kao aplikacija: serije iz reda, zatim operacije dnevnika."""
+    red = queue.Queue()
+    citaj_csv_u_serijama(putanja, red, threading.Event(), dnevnik)
+    ucenici = []
+    while True:
+        vrsta, podaci, _udio = red.get_nowait()
+        if vrsta == "serija":
+            ucenici.extend(podaci)
+        elif vrsta == "dnevnik":
+            DnevnikCSV.primijeni(podaci, ucenici)
+            dnevnik.postavi(len(podaci))
+        elif vrsta == "greska":
+            raise podaci
+        else:
+            return [(u.ime, u.prezime, u.razred) for u in ucenici]
+
+
+@pytest.fixture
+def dnevnik(tmp_path):
+    d = DnevnikCSV(str(tmp_path / "ucenici.csv"), prag=1000)
+    d.sazmi([Ucenik(*u) for u in UCENICI[:1]])
+    return d
+
+
+def test_dnevnik_round_trip(dnevnik):
+    for u in UCENICI[1:]:
+        dnevnik.dodan(Ucenik(*u))
+    assert dnevnik.spremi() == 2
+    assert dnevnik.spremi() == 0
+    assert ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja)) == UCENICI
+
+
+def test_nedovrsena_serija_se_odbacuje(dnevnik):
+    dnevnik.dodan(Ucenik(*UCENICI[1]))
+    dnevnik.spremi()
+    with open(dnevnik.log, "a", encoding="utf-8", newline="") as f:
+        f.write("d,Iva,Babić,1c\nd,Luka,Ba")      # pad prije retka "k"
+    assert ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja)) == UCENICI[:2]
+    # rep je odrezan pa se nova serija ne lijepi na smeće
+    novi = DnevnikCSV(dnevnik.putanja)
+    ucitaj(dnevnik.putanja, novi)
+    novi.dodan(Ucenik(*UCENICI[2]))
+    novi.spremi()
+    assert ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja)) == UCENICI
+
+
+def test_dnevnik_za_drugu_snimku_se_ne_primjenjuje(dnevnik):
+    dnevnik.dodan(Ucenik(*UCENICI[1]))
+    dnevnik.spremi()
+    with open(dnevnik.putanja, "a", encoding="utf-8", newline="") as f:
+        f.write("Luka,Marić,2a\r\n")          # snimka izmijenjena izvan programa
+    assert ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja)) == [UCENICI[0], ("Luka", "Marić", "2a")]
+
+
+def test_pad_usred_sazimanja(dnevnik):
+    dnevnik.dodan(Ucenik(*UCENICI[1]))
+    dnevnik.spremi()
+    stari_log = open(dnevnik.log, "rb").read()
+    dnevnik.sazmi([Ucenik(*u) for u in UCENICI[:2]])
+    # stanje nakon zamjene snimke, a prije zamjene dnevnika
+    os.replace(dnevnik.log, dnevnik.log + ".novi")
+    with open(dnevnik.log, "wb") as f:
+        f.write(stari_log)
+    assert ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja)) == UCENICI[:2]
+    assert not os.path.exists(dnevnik.log + ".novi")
+    # pad prije zamjene snimke: .novi ne odgovara snimci i briše se
+    with open(dnevnik.log + ".novi", "wb") as f:
+        f.write(b"#dnevnik,1\nk\n")
+    assert ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja)) == UCENICI[:2]
+    assert not os.path.exists(dnevnik.log + ".novi")
+
+
+def test_sazimanje_u_pozadini_cuva_nove_promjene(dnevnik):
+    tablica = TablicaUcenika()
+    tablica.extend(Ucenik(*u) for u in UCENICI[:2])
+    dnevnik.dodan(Ucenik(*UCENICI[1]))
+    dnevnik.spremi()
+    dnevnik.sazmi_u_pozadini(tablica)
+    dnevnik.dodan(Ucenik(*UCENICI[2]))
+    dnevnik.spremi()
+    dnevnik.pricekaj()
+    assert dnevnik.broj_operacija == 1
+    assert ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja)) == UCENICI
+
+
+def test_dodan_tijekom_ucitavanja_se_sprema(dnevnik):
+    dnevnik.dodan(Ucenik(*UCENICI[1]))
+    dnevnik.spremi()
+    # aplikacija: početak učitavanja, pa dodavanje prije poruke "dnevnik"
+    dnevnik.oznaci_neuskladeno()
+    dnevnik.dodan(Ucenik(*UCENICI[2]))
+    assert ucitaj(dnevnik.putanja, dnevnik) == UCENICI[:2]
+    assert dnevnik.uskladeno and dnevnik.spremi() == 1
+    assert sorted(ucitaj(dnevnik.putanja, DnevnikCSV(dnevnik.putanja))) == sorted(UCENICI)
@@ -0,0 +1,31 @@
+import pytest
+
+from evidencija_app import PopisUcenika, Ucenik
+
+
+def test_dogadjaji_i_indeks():
+    popis = PopisUcenika()
+    dogadjaji = []
+    popis.pretplati(lambda d, i, u: dogadjaji.append((d, i, str(u))))
+    popis.indeks.izgradi()
+    popis.dodaj(Ucenik("Ana", "Horvat", "4a"))
+    popis.dodaj(Ucenik("Ivo", "Babić", "4b"))
+    popis.dodaj(Ucenik("Iva", "Horvat", "4b"))
+    popis.izmijeni(1, "Ivo", "Hodak", "4a")
+    popis.obrisi(0)
+    assert dogadjaji == [("dodan", 0, "Horvat, Ana, 4a"), ("dodan", 1, "Babić, Ivo, 4b"),
+                         ("dodan", 2, "Horvat, Iva, 4b"), ("izmijenjen", 1, "Hodak, Ivo, 4a"),
+                         ("obrisan", 0, "Horvat, Ana, 4a")]
+    assert [str(u) for u in popis] == ["Hodak, Ivo, 4a", "Horvat, Iva, 4b"]
+    assert sorted(popis.indeks.trazi("ho")) == [0, 1]
+    assert list(popis.indeks.trazi("", "4a")) == [0]
+
+
+def test_odbijena_izmjena_ostavlja_redak_u_indeksu():
+    popis = PopisUcenika()
+    popis.indeks.izgradi()
+    popis.dodaj(Ucenik("Ana", "Horvat", "4a"))
+    with pytest.raises(ValueError):
+        popis.izmijeni(0, "Iva", "x" * 70000, "4b")
+    assert list(popis.indeks.trazi("horvat")) == [0]
+    assert str(popis[0]) == "Horvat, Ana, 4a"
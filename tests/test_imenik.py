@@ -0,0 +1,110 @@
+import io
+import queue
+import random
+import threading
+
+import pytest
+
+from imenik import (Deduplikator, Kontakt, SpremisteKontakata, TrigramIndeks, citaj_vcard,
+                    izvezi_vcard_u_serijama, kljuc_emaila, kljuc_telefona, uzastopni_rasponi, vcard_kartica)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_trigram_indeks_kao_pregled_svih(seed):
+    rng = random.Random(seed)
+    slova = "abcčdeš "
+    spremiste = SpremisteKontakata()
+    for i in range(2000):
+        spremiste.dodaj(Kontakt("".join(rng.choices(slova, k=8)), f"k{i}@Mail.hr", f"09{rng.randrange(10**7):07d}"))
+    indeks = TrigramIndeks(spremiste)
+    indeks.izgradi()
+    for korak in range(300):
+        if rng.random() < 0.5:
+            spremiste.obrisi(rng.choice(list(spremiste.po_id)))
+        else:
+            k = Kontakt("".join(rng.choices(slova, k=8)), "x@y.hr", "123")
+            indeks.dodaj(spremiste.dodaj(k), k)
+        upit = rng.choice(["abc", "ČDE", "@mail", "aa ", "ššš", "091", "k12"])
+        if korak % 10 == 0:
+            ocekivano = [i for i, k in spremiste.stavke() if upit.casefold() in TrigramIndeks.tekst(k)]
+            assert indeks.trazi(upit) == ocekivano
+            assert indeks.trazi(upit, najvise=5) == ocekivano[:5]
+
+
+def test_kljucevi():
+    assert kljuc_emaila(" Ana@Mail.HR ") == kljuc_emaila("ana@mail.hr")
+    assert kljuc_telefona("091 123 4567") == kljuc_telefona("+385 91 1234567") == kljuc_telefona("00385911234567")
+    assert kljuc_telefona("091 123 4567") != kljuc_telefona("092 123 4567")
+
+
+def test_spoji_duplikate():
+    spremiste = SpremisteKontakata()
+    kontakti = [Kontakt("", "Ana@Mail.hr", "091 123 4567"),
+                Kontakt("Ana", "ana@mail.hr ", "+385911234567"),
+                Kontakt("Iva", "ana@mail.hr", "0917654321"),
+                Kontakt("Ana Druga", "ana@mail.hr", "00385911234567")]
+    assert Deduplikator().spoji(kontakti, spremiste) == 2
+    assert [k.ime for k in spremiste] == ["Ana", "Iva"]
+
+
+def test_id_se_ne_mijenja_ni_ponavlja():
+    spremiste = SpremisteKontakata()
+    idevi = [spremiste.dodaj(Kontakt(f"K{i}", "", "1")) for i in range(5)]
+    spremiste.obrisi(idevi[1])
+    spremiste.obrisi(idevi[3])
+    novi = spremiste.dodaj(Kontakt("Novi", "", "2"))
+    assert novi not in idevi and len(spremiste) == 4
+    assert [spremiste[i].ime for i in (idevi[0], idevi[2], idevi[4], novi)] == ["K0", "K2", "K4", "Novi"]
+    assert [k.ime for k in spremiste] == ["K0", "K2", "K4", "Novi"]
+    with pytest.raises(KeyError):
+        spremiste[idevi[1]]
+
+
+def test_uzastopni_rasponi():
+    assert uzastopni_rasponi((0, 1, 2, 5, 6, 9)) == [[0, 2], [5, 6], [9, 9]]
+    assert uzastopni_rasponi(()) == []
+
+
+def test_vcard_round_trip(tmp_path):
+    kontakti = [Kontakt("Ana Horvat", "ana@mail.hr", "+385 91 123"),
+                Kontakt("Đuro; Šimić, ml.\\", "d@x.hr", ""),
+                Kontakt("Ž" * 60, "", "099"),
+                Kontakt("", "samo@email.hr", "")]
+    putanja = str(tmp_path / "kontakti.vcf")
+    red = queue.Queue()
+    izvezi_vcard_u_serijama(iter(kontakti), len(kontakti), putanja, red, threading.Event(), korak=2)
+    assert red.queue[-1] == ("kraj", 4, 1.0)
+    podaci = open(putanja, "rb").read()
+    assert all(len(r) <= 75 for r in podaci.split(b"\r\n"))
+    with open(putanja, "rb") as f:
+        procitano = [(k.ime, k.email, k.telefon) for k in citaj_vcard(f)]
+    assert procitano == [(k.ime, k.email, k.telefon) for k in kontakti]
+
+
+def test_citaj_vcard_bez_fn():
+    kartica = b"BEGIN:VCARD\r\nN:Horvat;Ana;;;\r\nitem1.EMAIL;TYPE=work:a@b.hr\r\nTEL:tel:+38591\r\nEND:VCARD\r\n"
+    prazna = b"BEGIN:VCARD\r\nFN:Nitko\r\nEND:VCARD\r\n"
+    kontakti = list(citaj_vcard(io.BytesIO(kartica + prazna)))
+    assert [(k.ime, k.email, k.telefon) for k in kontakti] == [("Ana Horvat", "a@b.hr", "+38591")]
+    assert vcard_kartica(kontakti[0]).startswith("BEGIN:VCARD\r\n")
+
+
+def test_prekinuti_izvoz_ne_ostavlja_datoteku(tmp_path):
+    putanja = tmp_path / "kontakti.vcf"
+    prekid = threading.Event()
+    prekid.set()
+    kontakti = (Kontakt(f"K{i}", "", "1") for i in range(10))
+    izvezi_vcard_u_serijama(kontakti, 10, str(putanja), queue.Queue(), prekid, korak=2)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_neuspjeli_izvoz_ne_ostavlja_datoteku(tmp_path):
+    def kontakti():
+        yield Kontakt("Ana", "a@b.hr", "1")
+        raise OSError("disk je pun")
+
+    red = queue.Queue()
+    izvezi_vcard_u_serijama(kontakti(), 2, str(tmp_path / "kontakti.vcf"), red, threading.Event())
+    vrsta, greska, _ = red.get_nowait()
+    assert vrsta == "greska" and "disk" in str(greska)
+    assert list(tmp_path.iterdir()) == []
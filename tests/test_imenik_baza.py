@@ -0,0 +1,68 @@
+import csv
+import random
+
+import pytest
+
+from imenik import Deduplikator, Kontakt
+from imenik_baza import BazaKontakata, migriraj
+
+
+@pytest.fixture
+def baza(tmp_path):
+    b = BazaKontakata(str(tmp_path / "kontakti.db"))
+    yield b
+    b.zatvori()
+
+
+def test_dodaj_spaja_duplikate(baza):
+    id1, postojeci = baza.dodaj(Kontakt("", "Ana@mail.hr", "091 123 4567"))
+    assert postojeci is None
+    id2, postojeci = baza.dodaj(Kontakt("Ana", "ana@mail.hr", "+385911234567"))
+    assert id2 == id1 and postojeci.ime == "Ana"
+    assert baza.dodaj_sve([Kontakt("Iva", "ANA@mail.hr", "00385911234567"),
+                           Kontakt("Iva", "iva@mail.hr", "1")]) == (1, 1)
+    assert [k.ime for k in baza.svi_kontakti()] == ["Ana", "Iva"]
+
+
+def test_stranice_i_trazi_kao_pregled_svih(baza):
+    rng = random.Random(1)
+    kontakti = [Kontakt(rng.choice(["Ana", "ana", "Ante", "Ivo", "IVAN", "Šime", ""]) + str(i),
+                        rng.choice(["ana", "ivo", "x"]) + f"{i}@mail.hr", str(i)) for i in range(3000)]
+    baza.dodaj_sve(kontakti, velicina_serije=700)
+    obrisani = set(rng.sample(range(1, 3001), 500))
+    baza.obrisi(sorted(obrisani))
+    svi = [(i, k) for i, k in enumerate(kontakti, 1) if i not in obrisani]
+
+    stranice, nakon_id = [], 0
+    while stranica := baza.stranica(nakon_id, velicina=256):
+        stranice.extend((i, k.ime) for i, k in stranica)
+        nakon_id = stranica[-1][0]
+    assert stranice == [(i, k.ime) for i, k in svi]
+    assert baza.broj() == len(svi)
+
+    for upit in ("an", "AN", "iva", "ivo1", "Š", "x"):
+        ocekivano = {i for i, k in svi
+                     if k.ime.lower().startswith(upit.lower()) or k.email.lower().startswith(upit.lower())}
+        assert {i for i, _k in baza.trazi(upit, najvise=10**6)} == ocekivano, upit
+        assert len(baza.trazi(upit, najvise=7)) == min(7, len(ocekivano))
+
+
+def test_migriraj(tmp_path, baza):
+    putanja = tmp_path / "kontakti.csv"
+    redci = [("Ana", "ana@mail.hr", "091"), ("Ivo, ml.", "ivo@mail.hr", "092"), ("", "ANA@mail.hr", "091")]
+    with open(putanja, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(redci)
+    assert migriraj(str(putanja), baza) == (2, 1)
+    assert [(k.ime, k.email, k.telefon) for k in baza.svi_kontakti(velicina_stranice=1)] == list(redci[:2])
+    kljucevi = {r[0] for r in baza.veza.execute("SELECT kljuc FROM kontakti")}
+    assert kljucevi == {Deduplikator.kljuc(Kontakt(*r)) for r in redci}
+
+
+def test_podaci_ostaju_nakon_ponovnog_otvaranja(tmp_path):
+    putanja = str(tmp_path / "kontakti.db")
+    b = BazaKontakata(putanja)
+    b.dodaj(Kontakt("Ana", "a@b.hr", "1"))
+    b.zatvori()
+    b = BazaKontakata(putanja)
+    assert [k.ime for k in b.svi_kontakti()] == ["Ana"]
+    b.zatvori()
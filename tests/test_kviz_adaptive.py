@@ -0,0 +1,132 @@
+import random
+import threading
+
+import pytest
+
+from kviz_znanja import (AdaptiveSession, ItemParameters, ItemStat, PitanjeMCQ, PitanjeTF, item_parameters,
+                         question_id, _sample_bank)
+
+
+def random_parameters(seed, n=3000, calibrated=1.0):
+    rng = random.Random(seed)
+    parameters = []
+    for _ in range(n):
+        c = rng.choice([0.5, 0.25])
+        if rng.random() < calibrated:
+            parameters.append((round(rng.uniform(0.3, 3.0), 2), round(rng.uniform(-4, 4), 1), c))
+        else:
+            parameters.append((1.0, 0.0, c))
+    return parameters
+
+
+def ranking(items, theta, exclude):
+    return sorted((items.information(i, theta) for i in range(len(items)) if i not in exclude), reverse=True)
+
+
+@pytest.mark.parametrize("calibrated", [1.0, 0.1, 0.0])
+def test_most_informative_matches_brute_force(calibrated):
+    items = ItemParameters(None, parameters=random_parameters(1, calibrated=calibrated))
+    rng = random.Random(2)
+    for step in range(60):
+        theta = rng.uniform(-4, 4)
+        exclude = set(rng.sample(range(len(items)), rng.randrange(200)))
+        best = ranking(items, theta, exclude)
+        picked = items.most_informative(theta, exclude, rng, choices=1)
+        assert picked not in exclude
+        assert items.information(picked, theta) == pytest.approx(best[0])
+        picked = items.most_informative(theta, exclude, rng, choices=5)
+        assert picked not in exclude
+        assert items.information(picked, theta) >= best[4] * (1 - 1e-12)
+
+
+def test_used_questions_of_a_run_are_skipped():
+    # one run of identical parameters: every pick must be a new question
+    items = ItemParameters(None, parameters=[(1.0, 0.0, 0.5)] * 40 + [(0.5, 3.0, 0.5)] * 2)
+    rng = random.Random(0)
+    used = set()
+    for _ in range(42):
+        i = items.most_informative(0.0, used, rng)
+        assert i not in used
+        used.add(i)
+    assert used == set(range(42))
+    assert items.most_informative(0.0, used, rng) is None
+
+
+def test_picks_are_spread_over_the_choices():
+    items = ItemParameters(None, parameters=[(2.0, 0.0, 0.25)] * 3 + [(0.3, 4.0, 0.25)] * 100)
+    rng = random.Random(1)
+    picks = {items.most_informative(0.0, (), rng, choices=5) for _ in range(300)}
+    # the three best and two of the identical weak ones are the candidates
+    assert {0, 1, 2} <= picks and len(picks - {0, 1, 2}) > 1
+
+
+# with 300 added, over 64 join no run and the index is rebuilt once
+@pytest.mark.parametrize("added", [30, 300])
+def test_added_questions_match_a_rebuilt_index(added):
+    rng = random.Random(added)
+    bank = list(_sample_bank(200 + added))
+    # every third question is calibrated, so some added ones join no run
+    stats = {question_id(q): ItemStat(100, rng.uniform(0.3, 0.95), rng.uniform(0.2, 0.8), [0] * 5)
+             for q in bank[::3]}
+    items = ItemParameters.build(bank[:200], stats)
+    for q in bank[200:]:
+        items.add(q, stats)
+    rebuilt = ItemParameters.build(bank, stats)
+    assert len(items) == len(bank)
+    assert (items.a, items.b, items.c) == (rebuilt.a, rebuilt.b, rebuilt.c)
+    for _ in range(40):
+        theta = rng.uniform(-4, 4)
+        exclude = set(rng.sample(range(len(bank)), 30)) | set(rng.sample(range(200, len(bank)), 10))
+        picked = items.most_informative(theta, exclude, rng, choices=1)
+        assert picked not in exclude
+        assert items.information(picked, theta) == pytest.approx(ranking(items, theta, exclude)[0])
+
+
+def test_questions_added_to_a_run_are_drawn():
+    items = ItemParameters(None, parameters=[(1.0, 0.0, 0.5)] * 10)
+    for k in range(10):
+        items.add(PitanjeTF(str(k), True))
+    rng = random.Random(0)
+    used = set()
+    for _ in range(20):
+        used.add(items.most_informative(0.0, used, rng))
+    assert used == set(range(20))
+    assert items.most_informative(0.0, used, rng) is None
+
+
+def test_item_parameters():
+    tf, mcq = PitanjeTF("a", True), PitanjeMCQ("b", list("wxyz"), 0)
+    assert item_parameters(tf) == (1.0, 0.0, 0.5)
+    assert item_parameters(mcq, ItemStat(5, 0.5, 0.4, [0] * 5)) == (1.0, 0.0, 0.25)
+    a, b, c = item_parameters(mcq, ItemStat(100, 0.9, 0.5, [0] * 5))
+    assert c == 0.25 and a > 0 and b < 0
+    _, hard, _ = item_parameters(mcq, ItemStat(100, 0.3, 0.5, [0] * 5))
+    assert hard > b
+
+
+def test_build_from_bank_and_cancel():
+    bank = list(_sample_bank(100))
+    items = ItemParameters.build(bank)
+    assert len(items) == 100 and {items.c[i] for i in range(100)} == {0.5, 0.25}
+    cancel = threading.Event()
+    cancel.set()
+    assert ItemParameters.build(bank, cancel=cancel) is None
+
+
+def test_session_estimate_follows_answers():
+    items = ItemParameters(None, parameters=random_parameters(3))
+    strong, weak = AdaptiveSession(items, 15, seed=1), AdaptiveSession(items, 15, seed=1)
+    for session, correct in ((strong, True), (weak, False)):
+        errors = []
+        for k in range(15):
+            assert session.next_position() is not None
+            session.record(k, correct)
+            errors.append(session.se)
+        assert session.next_position() is None
+        assert len(set(session.positions)) == 15
+        assert errors[-1] < errors[0]
+    assert strong.theta > 1 and weak.theta < -1
+    # changing an answer recomputes the estimate from all of them
+    theta = strong.theta
+    strong.record(0, False)
+    assert strong.theta < theta
@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+
+from kviz_znanja import (AttemptLog, PitanjeMCQ, PitanjeTF, attempt_record, iter_attempts, log_segments,
+                         log_snapshot, question_id)
+
+
+def record(n):
+    return {"n": n, "tekst": "čćž" * (n % 3)}
+
+
+@pytest.mark.parametrize("fsync", ["always", "interval", "never"])
+def test_round_trip(tmp_path, fsync):
+    log = AttemptLog(str(tmp_path), fsync=fsync, fsync_interval=0.01)
+    for n in range(100):
+        log.record(record(n))
+    log.record_many(record(n) for n in range(100, 250))
+    log.close()
+    assert log.error is None and log.written == 250
+    assert list(iter_attempts(str(tmp_path))) == [record(n) for n in range(250)]
+
+
+def test_segments_rotate_in_order(tmp_path):
+    log = AttemptLog(str(tmp_path), segment_bytes=200, batch_size=3)
+    for n in range(60):
+        log.record(record(n))
+    log.close()
+    assert len(log_segments(str(tmp_path))) > 1
+    assert list(iter_attempts(str(tmp_path))) == [record(n) for n in range(60)]
+    # reopening continues in the last segment
+    log = AttemptLog(str(tmp_path), segment_bytes=200)
+    log.record(record(60))
+    log.close()
+    assert list(iter_attempts(str(tmp_path)))[-1] == record(60)
+
+
+@pytest.mark.parametrize("torn", [b'{"n": 9', b'{"n": 9}', b"\xc4"])
+def test_torn_last_line_is_cut_on_reopen(tmp_path, torn):
+    log = AttemptLog(str(tmp_path))
+    log.record_many(record(n) for n in range(3))
+    log.close()
+    segment = log_segments(str(tmp_path))[-1]
+    with open(segment, "ab") as f:
+        f.write(torn)       # crash in the middle of a write: no newline
+    assert list(iter_attempts(str(tmp_path))) == [record(n) for n in range(3)]
+    log = AttemptLog(str(tmp_path))
+    log.record(record(3))
+    log.close()
+    assert list(iter_attempts(str(tmp_path))) == [record(n) for n in range(4)]
+    assert open(segment, "rb").read().count(b"\n") == 4
+
+
+def test_torn_line_without_any_newline(tmp_path):
+    with open(os.path.join(tmp_path, "attempts-000001.jsonl"), "wb") as f:
+        f.write(b'{"n": 0' * 30000)     # longer than one block of the backwards scan
+    log = AttemptLog(str(tmp_path))
+    log.record(record(1))
+    log.close()
+    assert list(iter_attempts(str(tmp_path))) == [record(1)]
+
+
+def test_bad_lines_are_skipped(tmp_path):
+    with open(os.path.join(tmp_path, "attempts-000001.jsonl"), "wb") as f:
+        f.write(b'{"n": 0}\n{"n": 1{"n": 2}\n[1, 2]\n\xff\n{"n": 3}\n')
+    assert list(iter_attempts(str(tmp_path))) == [{"n": 0}, {"n": 3}]
+
+
+def test_snapshot_hides_newer_attempts(tmp_path):
+    log = AttemptLog(str(tmp_path), fsync="always", segment_bytes=100)
+    log.record_many(record(n) for n in range(5))
+    log.close()
+    snapshot = log_snapshot(str(tmp_path))
+    log = AttemptLog(str(tmp_path), segment_bytes=100)
+    log.record_many(record(n) for n in range(5, 10))
+    log.close()
+    assert list(iter_attempts(str(tmp_path), snapshot)) == [record(n) for n in range(5)]
+
+
+def test_attempt_record():
+    questions = [PitanjeTF("a", True), PitanjeMCQ("b", list("wxyz"), 2)]
+    r = attempt_record(questions, [1, None], 1, 10.00049, 20.5)
+    assert r == {"source": "app", "started": 10.0, "finished": 20.5,
+                 "questions": [question_id(q) for q in questions], "answers": [1, -1], "key": [1, 2],
+                 "correct": 1, "total": 2}
+    assert json.loads(json.dumps(r)) == r
+    assert question_id(PitanjeTF("a", False)) == question_id(questions[0])
+    assert question_id(PitanjeMCQ("b", list("wxyq"), 2)) != question_id(questions[1])
+
+
+def test_invalid_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        AttemptLog(str(tmp_path), fsync="sometimes")
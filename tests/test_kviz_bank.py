@@ -0,0 +1,179 @@
+import io
+import json
+import os
+import queue
+import threading
+
+import pytest
+
+from kviz_znanja import (BinaryBank, Pitanje, PitanjeMCQ, PitanjeTF, convert_bank, iter_bank_file,
+                         iter_json_array, iter_json_chunks, load_questions_in_batches, write_bank,
+                         _sample_bank)
+
+QUESTIONS = [PitanjeTF("Zemlja je okrugla.", True),
+             PitanjeMCQ('Što je "]," u JSON-u?', ["znak", "], {", "ništa\n", "\\u0041 ☃"], 2),
+             PitanjeTF("", False),
+             PitanjeMCQ("Glavni grad 🇭🇷?", ["Zagreb", "Split", "", "Osijek"], 0)]
+
+
+def export(p):
+    # the layout save_to_file has always written: tip first
+    if p.tip == "TF":
+        return {"tip": "TF", "tekst": p.tekst, "tocan": p.tocan}
+    return {"tip": "MCQ", "tekst": p.tekst, "opcije": p.opcije, "tocan_index": p.tocan_index}
+
+
+def as_tuples(questions):
+    return [tuple(p.to_dict().values()) for p in questions]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_json_chunks_match_json_dump(compact):
+    records = [export(p) for p in QUESTIONS]
+    if compact:
+        expected = json.dumps(records, ensure_ascii=False, separators=(",", ":"))
+    else:
+        expected = json.dumps(records, ensure_ascii=False, indent=2)
+    assert "".join(iter_json_chunks(QUESTIONS, compact)) == expected
+    assert "".join(iter_json_chunks([], compact)) == json.dumps([])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 20])
+def test_iter_json_array_matches_json_load(chunk_size):
+    document = json.dumps([1, -2.5e3, "a,]b", {"x": [1, {"y": "]"}]}, None, True, [], 1234567890123],
+                          indent=1)
+    assert list(iter_json_array(io.StringIO(document), chunk_size)) == json.loads(document)
+    assert list(iter_json_array(io.StringIO(" [ ] "), chunk_size)) == []
+
+
+@pytest.mark.parametrize("document", ["{}", "[1, 2", "[1 2]", "[1,]", "", "[{\"a\": }]"])
+def test_iter_json_array_rejects_invalid(document):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(document), 2))
+
+
+@pytest.mark.parametrize("suffix", [".json", ".kvb"])
+def test_bank_round_trip(tmp_path, suffix):
+    path = str(tmp_path / ("pitanja" + suffix))
+    assert write_bank(QUESTIONS, path)
+    assert as_tuples(iter_bank_file(path)) == as_tuples(QUESTIONS)
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_convert_bank_both_ways(tmp_path):
+    src, kvb, back = (str(tmp_path / name) for name in ("a.json", "b.kvb", "c.json"))
+    write_bank(_sample_bank(1000), src)
+    convert_bank(src, kvb)
+    convert_bank(kvb, back)
+    with open(src, "rb") as a, open(back, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_stopped_write_keeps_old_bank(tmp_path):
+    path = str(tmp_path / "pitanja.json")
+    write_bank(QUESTIONS, path)
+    before = open(path, "rb").read()
+    assert write_bank(_sample_bank(100), path, progress=lambda count: False, step=5) is False
+    assert open(path, "rb").read() == before
+    assert os.listdir(tmp_path) == ["pitanja.json"]
+
+
+def test_binary_bank_mutations_match_list(tmp_path):
+    path = str(tmp_path / "pitanja.kvb")
+    model = list(_sample_bank(50))
+    write_bank(model, path)
+    bank = BinaryBank(path)
+    assert as_tuples(bank) == as_tuples(model)
+    assert {tip: list(p) for tip, p in bank.positions_by_tip().items()} == \
+        {"TF": list(range(1, 50, 2)), "MCQ": list(range(0, 50, 2))}
+    snapshot = bank.copy()
+    for i in (0, 10, -1, 20):
+        del bank[i]
+        del model[i]
+    for p in QUESTIONS:
+        bank.append(p)
+        model.append(p)
+    del bank[-2]
+    del model[-2]
+    assert as_tuples(bank) == as_tuples(model)
+    assert as_tuples(bank[3:7]) == as_tuples(model[3:7])
+    assert len(snapshot) == 50
+    positions = bank.positions_by_tip()
+    assert sorted(positions["TF"] + positions["MCQ"]) == list(range(len(model)))
+    assert all(model[i].tip == tip for tip, ps in positions.items() for i in ps)
+    with pytest.raises(IndexError):
+        bank[len(model)]
+    # the saved copy is a new bank with the changes
+    write_bank(bank, str(tmp_path / "novo.kvb"))
+    with BinaryBank(str(tmp_path / "novo.kvb")) as saved:
+        assert as_tuples(saved) == as_tuples(model)
+    bank.close()
+    snapshot.close()
+
+
+def test_binary_bank_copies_share_the_mapping_until_closed(tmp_path):
+    path = str(tmp_path / "pitanja.kvb")
+    write_bank(QUESTIONS, path)
+    bank = BinaryBank(path)
+    snapshot = bank.copy()
+    bank.close()
+    bank.close()
+    assert as_tuples(snapshot) == as_tuples(QUESTIONS)
+    snapshot.close()
+    assert snapshot._mm.closed
+    with pytest.raises(ValueError):
+        snapshot[0]
+
+
+def test_binary_bank_is_not_written_over_its_own_file(tmp_path):
+    path = str(tmp_path / "pitanja.kvb")
+    write_bank(QUESTIONS, path)
+    before = open(path, "rb").read()
+    with BinaryBank(path) as bank:
+        del bank[0]
+        with pytest.raises(ValueError):
+            write_bank(bank, path)
+        with pytest.raises(ValueError):
+            convert_bank(path, path)
+        assert write_bank(bank, str(tmp_path / "novo.kvb"))
+    assert open(path, "rb").read() == before
+    assert sorted(os.listdir(tmp_path)) == ["novo.kvb", "pitanja.kvb"]
+
+
+def test_binary_bank_rejects_other_files(tmp_path):
+    path = tmp_path / "pitanja.kvb"
+    path.write_bytes(b"[]" + bytes(32))
+    with pytest.raises(ValueError):
+        BinaryBank(str(path))
+
+
+def test_load_in_batches_reports_bad_records(tmp_path):
+    path = tmp_path / "pitanja.json"
+    records = [p.to_dict() for p in _sample_bank(250)]
+    records[3] = {"tip": "??", "tekst": "x"}
+    records[200] = {"tip": "MCQ", "tekst": "x", "opcije": ["a"], "tocan_index": 0}
+    path.write_text(json.dumps(records), encoding="utf-8")
+    out = queue.Queue()
+    load_questions_in_batches(str(path), out, threading.Event(), batch_size=64, first_batch=10)
+    loaded, messages = [], []
+    while not out.empty():
+        kind, data, _fraction = out.get()
+        messages.append(kind)
+        if kind == "batch":
+            loaded += data[0]
+        elif kind == "done":
+            errors = data
+    assert messages[0] == "batch" and messages[-1] == "done"
+    assert [n for n, _ in errors] == [4, 201]
+    assert len(loaded) == 248
+    assert as_tuples(loaded) == as_tuples(Pitanje.from_dict(r) for i, r in enumerate(records) if i not in (3, 200))
+
+
+def test_load_keeps_questions_before_syntax_error(tmp_path):
+    path = tmp_path / "pitanja.json"
+    path.write_text(json.dumps([p.to_dict() for p in QUESTIONS])[:-20], encoding="utf-8")
+    out = queue.Queue()
+    load_questions_in_batches(str(path), out, threading.Event())
+    messages = [out.get() for _ in range(out.qsize())]
+    assert [kind for kind, _, _ in messages] == ["batch", "error"]
+    assert len(messages[0][1][0]) == 3
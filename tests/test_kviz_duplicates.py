@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from kviz_znanja import NearDuplicateIndex, PitanjeTF, jaccard, near_duplicate_groups, shingles
+
+WORDS = ("koliko je glavni grad hrvatske rijeka more planina otok godina broj zbroj razlika "
+         "kemijski element simbol planet sunce mjesec kralj bitka stoljeće pjesnik roman").split()
+
+
+def make_bank(seed, n=400):
+    """Random questions plus near copies of some of them (one word swapped)."""
+    rng = random.Random(seed)
+    bank = []
+    for i in range(n):
+        if bank and rng.random() < 0.3:
+            words = rng.choice(bank).tekst.split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+            bank.append(PitanjeTF(" ".join(words), True))
+        else:
+            bank.append(PitanjeTF(" ".join(rng.choices(WORDS, k=rng.randint(8, 14))) + f" {i}?", True))
+    return bank
+
+
+def test_similar_matches_brute_force():
+    bank = make_bank(1)
+    index = NearDuplicateIndex.build(bank, threshold=0.6)
+    assert len(index) == len(bank)
+    sets = [shingles(q.tekst) for q in bank]
+    for q in bank[::7]:
+        hashes = shingles(q.tekst)
+        found = index.similar(q.tekst, limit=None)
+        exact = {i: jaccard(hashes, s) for i, s in enumerate(sets)}
+        # no false positives, similarities are exact and sorted
+        assert all(exact[i] >= 0.6 and s == exact[i] for i, s in found)
+        assert [s for _, s in found] == sorted((s for _, s in found), reverse=True)
+        # very similar questions are never missed
+        assert {i for i, s in exact.items() if s >= 0.9} <= {i for i, _ in found}
+
+
+def test_add_after_build():
+    bank = make_bank(2, 50)
+    index = NearDuplicateIndex.build(bank[:40])
+    index.bank = bank
+    for i in range(40, 50):
+        index.add(i)
+    found = index.similar(bank[45].tekst, limit=None)
+    assert (45, 1.0) in found and found[0][1] == 1.0
+
+
+def check_against_brute_force(index, bank, every=7):
+    sets = [shingles(q.tekst) for q in bank]
+    for q in bank[::every]:
+        found = index.similar(q.tekst, limit=None)
+        exact = {i: jaccard(sets[i], shingles(q.tekst)) for i in range(len(bank))}
+        assert all(exact[i] >= 0.6 and s == exact[i] for i, s in found)
+        assert {i for i, s in exact.items() if s >= 0.9} <= {i for i, _ in found}
+
+
+@pytest.mark.parametrize("n, keep_every", [(400, 3), (20400, 50)])
+def test_remove_and_add_keep_index_in_step(n, keep_every):
+    bank = make_bank(5, n)
+    index = NearDuplicateIndex.build(bank)
+    for i in range(len(bank) - 1, -1, -1):
+        if i % keep_every:
+            index.remove(i)
+            del bank[i]
+    # removing more than 10000 questions compacts the chains (second case)
+    assert len(index) == len(bank)
+    extra = make_bank(6, 30)
+    for q in extra:
+        bank.append(q)
+        index.add(len(bank) - 1)
+    check_against_brute_force(index, bank, every=3 if n < 1000 else 5)
+    with pytest.raises(ValueError):
+        index.add(0)
+
+
+def test_groups_match_leaders():
+    bank = make_bank(3)
+    groups = near_duplicate_groups(bank, threshold=0.6)
+    members = [i for g in groups for i in g]
+    assert len(members) == len(set(members))
+    sets = [shingles(q.tekst) for q in bank]
+    for group in groups:
+        assert group == sorted(group) and len(group) > 1
+        leader = group[0]
+        assert all(jaccard(sets[leader], sets[i]) >= 0.6 for i in group[1:])
+    # every exact copy ends up in a group with an earlier question
+    grouped = set(members)
+    for i, q in enumerate(bank):
+        if any(bank[j].tekst == q.tekst for j in range(i)):
+            assert i in grouped
+
+
+def test_groups_can_be_stopped():
+    assert near_duplicate_groups(make_bank(4, 100), progress=lambda count: False, step=10) is None
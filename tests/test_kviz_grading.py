@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import kviz_znanja
+from kviz_znanja import AnswerKey, PitanjeMCQ, PitanjeTF, expected_answer
+
+
+def bank(n, rng):
+    return [PitanjeTF(str(i), rng.random() < 0.5) if rng.random() < 0.5
+            else PitanjeMCQ(str(i), list("abcd"), rng.randrange(4)) for i in range(n)]
+
+
+def sheet(questions, rng):
+    return [rng.choice([-1, 0, 1] if q.tip == "TF" else [-1, 0, 1, 2, 3]) for q in questions]
+
+
+@pytest.mark.parametrize("nq", [1, 7, 255, 256, 600])
+def test_grade_matches_loop(engine, nq):
+    rng = random.Random(nq)
+    questions = bank(nq, rng)
+    sheets = [sheet(questions, rng) for _ in range(300)]
+    report = AnswerKey(questions).grade(sheets)
+    expected = [sum(a == expected_answer(q) for a, q in zip(s, questions)) for s in sheets]
+    assert [int(s) for s in report.scores] == expected
+    rates = [sum(s[j] == expected_answer(q) for s in sheets) / len(sheets) for j, q in enumerate(questions)]
+    assert report.correct_rate == pytest.approx(rates)
+    assert report.percentages() == pytest.approx([100 * e / nq for e in expected])
+
+
+def test_grade_numpy_matrix(engine):
+    if engine == "python":
+        pytest.skip("samo NumPy prima matricu")
+    rng = random.Random(1)
+    questions = bank(20, rng)
+    sheets = [sheet(questions, rng) for _ in range(50)]
+    key = AnswerKey(questions)
+    matrix = kviz_znanja.np.array(sheets)
+    assert list(key.grade(matrix).scores) == list(key.grade(sheets).scores)
+    with pytest.raises(ValueError):
+        key.grade(matrix[:, :-1])
+
+
+@pytest.mark.parametrize("sheets", [[[0, 1, 0]], [[0, 1], [0, 1, 0, 1]], [[]]])
+def test_wrong_length_is_rejected(engine, sheets):
+    key = AnswerKey([PitanjeTF("a", True), PitanjeTF("b", False)])
+    with pytest.raises(ValueError, match="2 odgovora"):
+        key.grade(sheets)
+
+
+def test_no_sheets(engine):
+    report = AnswerKey([PitanjeTF("a", True)]).grade([])
+    assert list(report.scores) == [] and report.correct_rate == [0.0]
@@ -0,0 +1,79 @@
+import math
+import random
+
+import pytest
+
+from kviz_znanja import AttemptLog, ItemStatistics
+
+
+def attempts(seed, n=400):
+    rng = random.Random(seed)
+    questions = [f"q{i}" for i in range(30)]
+    key = {q: rng.randrange(4) for q in questions}
+    records = []
+    for _ in range(n):
+        ability = rng.random()
+        asked = rng.sample(questions, rng.randint(1, 8))
+        answers = [key[q] if rng.random() < ability else rng.choice([-1, 0, 1, 2, 3]) for q in asked]
+        records.append({"questions": asked, "answers": answers, "key": [key[q] for q in asked]})
+    records.append({"questions": ["q0"], "answers": [1]})      # older record without a key
+    return records
+
+
+def direct(records, question):
+    """Difficulty, discrimination and choices of one question, computed from scratch."""
+    xs, rs, choices = [], [], [0] * 5
+    for record in records:
+        if "key" not in record or question not in record["questions"]:
+            continue
+        j = record["questions"].index(question)
+        hits = [a == k for a, k in zip(record["answers"], record["key"])]
+        xs.append(int(hits[j]))
+        choices[min(max(record["answers"][j] + 1, 0), 4)] += 1
+        if len(hits) > 1:
+            rs.append((xs[-1], (sum(hits) - hits[j]) / (len(hits) - 1)))
+    discrimination = None
+    if rs:
+        m = len(rs)
+        mx, mr = sum(x for x, _ in rs) / m, sum(r for _, r in rs) / m
+        sxx = sum((x - mx) ** 2 for x, _ in rs)
+        srr = sum((r - mr) ** 2 for _, r in rs)
+        if sxx > 0 and srr > 1e-9 / m:
+            discrimination = sum((x - mx) * (r - mr) for x, r in rs) / math.sqrt(sxx * srr)
+    return len(xs), sum(xs) / len(xs), discrimination, choices
+
+
+def test_streaming_and_bulk_match_direct(engine):
+    records = attempts(1)
+    streamed = ItemStatistics()
+    for r in records:
+        streamed.add_record(r)
+    bulk = ItemStatistics.from_attempts(iter(records))
+    assert len(streamed) == len(bulk) == 30
+    for q in (f"q{i}" for i in range(30)):
+        n, difficulty, discrimination, choices = direct(records, q)
+        for stats in (streamed, bulk):
+            stat = stats.get(q)
+            assert (stat.attempts, stat.choices) == (n, choices)
+            assert stat.difficulty == pytest.approx(difficulty)
+            if discrimination is None:
+                assert stat.discrimination is None
+            else:
+                assert stat.discrimination == pytest.approx(discrimination, abs=1e-9)
+    assert streamed.get("nema") is None
+
+
+def test_from_log(engine, tmp_path):
+    records = attempts(2, 50)
+    log = AttemptLog(str(tmp_path))
+    log.record_many(records)
+    log.close()
+    stats = ItemStatistics.from_log(str(tmp_path))
+    assert stats.get("q3").attempts == direct(records, "q3")[0]
+
+
+def test_cancelled_build(engine):
+    import threading
+    cancel = threading.Event()
+    cancel.set()
+    assert ItemStatistics.from_attempts(attempts(3), cancel) is None
@@ -0,0 +1,65 @@
+from collections import Counter
+
+import pytest
+
+from kviz_znanja import AliasTable, BinaryBank, QuestionSampler, write_bank, _sample_bank
+
+
+def test_sample_is_distinct_and_repeatable():
+    bank = list(_sample_bank(1000))
+    sampler = QuestionSampler(bank)
+    positions = sampler.sample(100, seed=5)
+    assert len(set(positions)) == 100 and all(0 <= i < 1000 for i in positions)
+    assert sampler.sample(100, seed=5) == positions
+    assert sorted(sampler.sample(5000, seed=1)) == list(range(1000))
+
+
+@pytest.mark.parametrize("mix, expected", [({"MCQ": 60, "TF": 40}, {"MCQ": 6, "TF": 4}),
+                                           ({"MCQ": 1}, {"MCQ": 10}),
+                                           ({"TF": 1, "MCQ": 0}, {"TF": 10}),
+                                           ({"TF": 1, "MCQ": 1}, {"TF": 5, "MCQ": 5})])
+def test_mix(mix, expected):
+    bank = list(_sample_bank(100))
+    positions = QuestionSampler(bank).sample(10, mix, seed=3)
+    assert Counter(bank[i].tip for i in positions) == expected
+
+
+def test_small_stratum_is_made_up_by_others():
+    bank = list(_sample_bank(100))[:7]      # 4 MCQ, 3 TF
+    positions = QuestionSampler(bank).sample(6, {"TF": 90, "MCQ": 10}, seed=0)
+    assert Counter(bank[i].tip for i in positions) == {"TF": 3, "MCQ": 3}
+
+
+def test_binary_bank_samples_like_list(tmp_path):
+    path = str(tmp_path / "pitanja.kvb")
+    write_bank(_sample_bank(500), path)
+    mix = {"MCQ": 60, "TF": 40}
+    with BinaryBank(path) as bank:
+        assert QuestionSampler(bank).sample(40, mix, seed=9) == \
+            QuestionSampler(list(_sample_bank(500))).sample(40, mix, seed=9)
+
+
+def test_weighted_sampling_skips_zero_weights():
+    bank = list(_sample_bank(200))
+    weights = [0 if i % 4 else 1 for i in range(200)]
+    sampler = QuestionSampler(bank, weights)
+    for seed in range(20):
+        positions = sampler.sample(30, seed=seed)
+        assert len(set(positions)) == 30 and all(i % 4 == 0 for i in positions)
+    assert len(sampler.sample(100, seed=1)) == 50
+    # one question holds almost all the weight: the exact fallback still gives k distinct
+    heavy = QuestionSampler(bank, [1e9] + [1e-9] * 199)
+    assert len(set(heavy.sample(20, seed=2))) == 20
+
+
+def test_alias_table_distribution():
+    import random
+    weights = [1, 2, 3, 0, 4]
+    table = AliasTable(weights)
+    rng = random.Random(0)
+    counts = Counter(table.draw(rng) for _ in range(100000))
+    assert counts[3] == 0
+    for i, w in enumerate(weights):
+        assert counts[i] / 100000 == pytest.approx(w / 10, abs=0.01)
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
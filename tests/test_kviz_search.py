@@ -0,0 +1,121 @@
+import math
+import random
+
+import pytest
+
+import kviz_znanja
+from kviz_znanja import PitanjeMCQ, PitanjeTF, SearchIndex, question_tokens
+
+WORDS = ("grad grada gradovi hrvatska hrvatske rijeka more morska otok otoci zbroj broj brojevi "
+         "planet planeti sunce kralj kraljica bitka pjesnik pjesma roman").split()
+
+
+def make_bank(seed, n=600):
+    rng = random.Random(seed)
+    bank = []
+    for _ in range(n):
+        tekst = " ".join(rng.choices(WORDS, k=rng.randint(1, 8)))
+        if rng.random() < 0.5:
+            bank.append(PitanjeTF(tekst, True))
+        else:
+            bank.append(PitanjeMCQ(tekst, [" ".join(rng.choices(WORDS, k=2)) for _ in range(4)], 0))
+    return bank
+
+
+def terms_of(query):
+    words = kviz_znanja._TOKEN.findall(query.casefold())
+    terms = [[w] for w in dict.fromkeys(words[:-1])]
+    vocabulary = sorted({w for w in WORDS})
+    terms.append([w for w in vocabulary if w.startswith(words[-1])] if query[-1:].isalnum() else [words[-1]])
+    return terms
+
+
+def brute_force(bank, query):
+    """{position: BM25 score} computed straight from the questions."""
+    terms = terms_of(query)
+    tokens = [question_tokens(q) for q in bank]
+    n = len(bank)
+    avg = sum(map(len, tokens)) / n
+    k1, b = kviz_znanja._BM25_K1, kviz_znanja._BM25_B
+    scores = {}
+    for i, t in enumerate(tokens):
+        total = 0.0
+        for term in terms:
+            df = min(sum(sum(1 for other in tokens if w in other) for w in term), n)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            best = max((idf * kviz_znanja._FIELD_WEIGHTS[t[w]] for w in term if w in t), default=0.0)
+            if not best:
+                break
+            total += best
+        else:
+            scores[i] = total * (k1 + 1) / (1 + k1 * (1 - b + b * len(t) / avg))
+    return scores
+
+
+QUERIES = ["grad", "gra", "hrvatske more", "otok kralj", "pjesnik ", "planeti sun", "zbroj broj b", "xyz", "kr"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_brute_force(engine, query):
+    bank = make_bank(1)
+    index = SearchIndex.build(bank)
+    expected = brute_force(bank, query)
+    result = index.search(query, limit=10 ** 6)
+    assert result.complete and result.total == len(expected)
+    assert sorted(result.positions) == sorted(expected)
+    ranked = [expected[i] for i in result.positions]
+    assert all(x >= y - 1e-4 * x for x, y in zip(ranked, ranked[1:]))
+    # the top 10 are the 10 best (up to rounding ties)
+    top = index.search(query, limit=10).positions
+    assert len(top) == min(10, len(expected))
+    if len(expected) > 10:
+        worst_taken = min(expected[i] for i in top)
+        assert all(s <= worst_taken * (1 + 1e-4) for i, s in expected.items() if i not in top)
+
+
+def test_search_after_adds_and_removes(engine):
+    rng = random.Random(2)
+    bank = make_bank(2, 300)
+    index = SearchIndex.build(bank)
+    for _ in range(400):
+        if rng.random() < 0.5 and bank:
+            i = rng.randrange(len(bank))
+            index.remove(i)
+            del bank[i]
+        else:
+            q = make_bank(rng.random(), 1)[0]
+            bank.append(q)
+            index.add(q)
+    assert len(index) == len(bank)
+    for query in QUERIES:
+        assert sorted(index.search(query, limit=10 ** 6).positions) == sorted(brute_force(bank, query))
+
+
+def test_compaction_keeps_results(engine):
+    bank = make_bank(3, 10200)
+    index = SearchIndex.build(bank)
+    for i in range(len(bank) - 1, -1, -1):     # over 10000 removed: postings get compacted
+        if i % 100:
+            index.remove(i)
+            del bank[i]
+    assert index._dead < 100
+    for query in ("gra", "more otok"):
+        assert sorted(index.search(query, limit=10 ** 6).positions) == sorted(brute_force(bank, query))
+
+
+def test_python_scan_is_capped(monkeypatch):
+    monkeypatch.setattr(kviz_znanja, "np", None)
+    monkeypatch.setattr(kviz_znanja, "_MAX_SCAN", 50)
+    bank = [PitanjeTF(f"zajednicka rijec {i}", True) for i in range(200)]
+    index = SearchIndex.build(bank)
+    result = index.search("zajednicka", limit=10)
+    assert not result.complete and result.total == 50 and len(result.positions) == 10
+    assert index.search("rijec 7 ").complete
+
+
+def test_empty_queries():
+    index = SearchIndex.build([])
+    assert index.search("grad").total == 0
+    index.add(PitanjeTF("grad", True))
+    assert index.search("  ").total == 0
+    assert list(index.search("grad").positions) == [0]
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import random
+import struct
+
+import pytest
+
+from kviz_server import FrameError, QuizServer, _HttpClient, _WebSocketClient, encode_frame, read_frame
+from kviz_znanja import AttemptLog, expected_answer, iter_attempts, _sample_bank
+
+
+def run(scenario, server=None):
+    """Runs scenario(port) against a QuizServer on a free local port."""
+    server = server or QuizServer(list(_sample_bank(50)))
+
+    async def main():
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        try:
+            return await scenario(listener.sockets[0].getsockname()[1])
+        finally:
+            listener.close()
+            await listener.wait_closed()
+
+    return asyncio.run(main())
+
+
+async def connect(port, websocket):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if websocket:
+        client = _WebSocketClient(reader, writer)
+        await client.handshake("test")
+        return client
+    return _HttpClient(reader, writer, "test")
+
+
+async def raw(port, data):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+@pytest.mark.parametrize("websocket", [False, True])
+def test_quiz_round_trip(tmp_path, websocket):
+    bank = list(_sample_bank(50))
+    log = AttemptLog(str(tmp_path))
+    server = QuizServer(bank, log=log)
+
+    async def scenario(port):
+        client = await connect(port, websocket)
+        started = await client.call("start", count=4)
+        session = started["session"]
+        assert started["count"] == 4
+        answers = []
+        for k in range(4):
+            q = await client.call("question", session, index=k)
+            original = next(p for p in bank if p.tekst == q["tekst"])
+            answers.append(expected_answer(original) if k % 2 else -1)
+            if k % 2:
+                assert await client.call("answer", session, index=k, answer=answers[-1]) == {"index": k}
+        result = await client.call("finish", session)
+        assert "error" in await client.call("finish", session)
+        return result
+
+    assert run(scenario, server) == {"correct": 2, "total": 4, "percent": 50.0}
+    log.close()
+    (attempt,) = iter_attempts(str(tmp_path))
+    assert attempt["source"] == "server" and attempt["correct"] == 2
+    assert not server.sessions
+
+
+@pytest.mark.parametrize("websocket", [False, True])
+def test_bad_calls_get_errors(websocket):
+    async def scenario(port):
+        client = await connect(port, websocket)
+        session = (await client.call("start", count=3))["session"]
+        results = [await client.call("question", session, index=-1),
+                   await client.call("question", session, index=3),
+                   await client.call("answer", session, index=-1, answer=1),
+                   await client.call("question", 999, index=0),
+                   await client.call("answer", session, index="x", answer=1)]
+        # the session still works after the errors
+        results.append(await client.call("question", session, index=2))
+        return results
+
+    *errors, last = run(scenario)
+    assert all("error" in r for r in errors)
+    assert last["index"] == 2
+
+
+def test_websocket_rejects_non_objects():
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        client = _WebSocketClient(reader, writer)
+        await client.handshake("test")
+        replies = []
+        for message in (b"[]", b"1", b'"start"', b"{", b'{"session": 1}'):
+            writer.write(encode_frame(1, message, random.randbytes(4)))
+            replies.append(json.loads((await read_frame(reader))[1]))
+        writer.write(encode_frame(9, b"ping", random.randbytes(4)))
+        pong = await read_frame(reader)
+        replies.append(await client.call("start", count=2))
+        writer.close()
+        return replies, pong
+
+    replies, pong = run(scenario)
+    assert all("error" in r for r in replies[:-1])
+    assert pong == (10, b"ping")
+    assert replies[-1]["count"] == 2
+
+
+@pytest.mark.parametrize("request_bytes", [
+    b"GARBAGE\r\n\r\n",
+    b"POST /sessions HTTP/1.1\r\nContent-Length: x\r\n\r\n",
+    b"POST /sessions HTTP/1.1\r\nContent-Length: -5\r\n\r\n",
+    # a well-framed request with a bad body keeps the connection, so the client closes it
+    b"POST /sessions HTTP/1.1\r\nContent-Length: 2\r\nConnection: close\r\n\r\n[]",
+    b"POST /sessions HTTP/1.1\r\nContent-Length: 5\r\nConnection: close\r\n\r\n{\"cou",
+    b"GET /ws HTTP/1.1\r\nUpgrade: websocket\r\n\r\n",
+    b"POST /sessions HTTP/1.1\r\nContent-Length: 1000000000\r\n\r\n",
+    b"POST /sessions HTTP/1.1\r\nX: " + b"x" * 100000,
+])
+def test_malformed_http_gets_400(request_bytes):
+    response = run(lambda port: raw(port, request_bytes))
+    assert response.startswith(b"HTTP/1.1 400 ")
+    length = int(response.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    assert "error" in json.loads(response[-length:])
+
+
+@pytest.mark.parametrize("frame, code", [
+    # a length far over the limit is refused before any payload arrives
+    (struct.pack("!BBQ", 0x81, 0xFF, 1 << 40) + b"mask", 1009),
+    (struct.pack("!BBQ", 0x81, 0xFF, 65537) + b"mask", 1009),
+    # fragments: a text frame without FIN, and a continuation frame
+    (bytes([0x01, 0x82]) + b"mask" + bytes(a ^ b for a, b in zip(b"{}", b"ma")), 1003),
+    (encode_frame(0, b"{}", b"mask"), 1003),
+], ids=["huge", "just-over", "no-fin", "continuation"])
+def test_websocket_closes_on_unsupported_frames(frame, code):
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await _WebSocketClient(reader, writer).handshake("test")
+        writer.write(frame)
+        reply = await read_frame(reader)
+        rest = await reader.read()
+        writer.close()
+        return reply, rest
+
+    assert run(scenario) == ((8, struct.pack("!H", code)), b"")
+
+
+def test_read_frame_limit():
+    async def decode(frame, limit):
+        reader = asyncio.StreamReader()
+        reader.feed_data(frame)
+        return await read_frame(reader, limit)
+
+    assert asyncio.run(decode(encode_frame(1, b"abc"), 3)) == (1, b"abc")
+    with pytest.raises(FrameError):
+        asyncio.run(decode(encode_frame(1, b"abcd"), 3))
+
+
+def test_unknown_path_is_404_and_keeps_connection():
+    request = (b"GET /nema HTTP/1.1\r\n\r\n"
+               b"POST /sessions HTTP/1.1\r\nContent-Length: 12\r\nConnection: close\r\n\r\n{\"count\": 2}")
+    response = run(lambda port: raw(port, request))
+    assert response.startswith(b"HTTP/1.1 404 ") and b"HTTP/1.1 200 OK" in response
+
+
+@pytest.mark.parametrize("size", [0, 125, 126, 65535, 65536])
+def test_frame_round_trip(size):
+    payload = random.Random(size).randbytes(size)
+
+    async def decode(frame):
+        reader = asyncio.StreamReader()
+        reader.feed_data(frame)
+        return await read_frame(reader)
+
+    assert asyncio.run(decode(encode_frame(1, payload))) == (1, payload)
+    assert asyncio.run(decode(encode_frame(2, payload, b"\x01\x02\x03\x04"))) == (2, payload)
@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from pretraga_ucenika import IndeksUcenika, PogledRezultata
+from tablica_ucenika import TablicaUcenika
+
+IMENA = ["Ana", "Ivan", "Iva", "Marko", "Mara", "Luka", "Željka"]
+PREZIMENA = ["Horvat", "Hodak", "Babić", "Marić", "Šimić"]
+RAZREDI = ["1a", "2b", "4A"]
+UPITI = [("", "1a"), ("ma", ""), ("i h", ""), ("ana", "2b"), ("ž", ""), ("mar ma", "4a"), ("x", "")]
+
+
+class U:
+    def __init__(self, ime, prezime, razred):
+        self.ime, self.prezime, self.razred = ime, prezime, razred
+
+
+def slucajni(rng):
+    return U(rng.choice(IMENA), rng.choice(PREZIMENA), rng.choice(RAZREDI))
+
+
+def pretrazi_sve(ucenici, upit, razred):
+    rijeci = upit.casefold().split()
+    razred = razred.casefold()
+    return sorted(i for i, u in enumerate(ucenici)
+                  if (not razred or u.razred.casefold() == razred)
+                  and all(u.prezime.casefold().startswith(r) or u.ime.casefold().startswith(r) for r in rijeci))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_trazi_kao_pregled_svih_redaka(seed):
+    rng = random.Random(seed)
+    t = TablicaUcenika()
+    t.extend(slucajni(rng) for _ in range(1500))
+    indeks = IndeksUcenika(t)
+    indeks.izgradi()
+    for korak in range(2500):
+        op = rng.random()
+        if op < 0.5 and len(t):
+            i = rng.randrange(len(t))
+            indeks.ukloni(i, brisanje=True)
+            del t[i]
+        elif op < 0.75:
+            t.append(slucajni(rng))
+            indeks.dodaj(len(t) - 1)
+        elif len(t):
+            i = rng.randrange(len(t))
+            indeks.ukloni(i)
+            t[i].ime = rng.choice(IMENA)
+            indeks.dodaj(i)
+        if korak % 50 == 0:
+            for upit, razred in UPITI:
+                assert sorted(indeks.trazi(upit, razred)) == pretrazi_sve(t, upit, razred), (korak, upit)
+
+
+def test_najvise_i_bez_filtra():
+    t = TablicaUcenika()
+    t.extend(U("Ana", f"Horvat{i}", "4a") for i in range(100))
+    indeks = IndeksUcenika(t)
+    indeks.izgradi()
+    assert indeks.trazi("", "") is None
+    assert len(indeks.trazi("hor", najvise=10)) == 10
+    rezultat = indeks.trazi("ana horvat5")
+    assert [u.prezime for u in PogledRezultata(t, rezultat)] == ["Horvat5"] + [f"Horvat{i}" for i in range(50, 60)]
@@ -0,0 +1,77 @@
+import pytest
+
+from tablica_ucenika import TablicaUcenika
+
+
+class U:
+    def __init__(self, ime, prezime, razred):
+        self.ime, self.prezime, self.razred = ime, prezime, razred
+
+
+def retci(tablica):
+    return [(u.ime, u.prezime, u.razred) for u in tablica]
+
+
+def test_append_i_citanje():
+    podaci = [("Ana", "Horvat", "4a"), ("Željko", "Đurić", "4b"), ("", "Ćosić", "4a")]
+    t = TablicaUcenika()
+    t.extend(U(*p) for p in podaci)
+    assert len(t) == 3
+    assert retci(t) == podaci
+    assert (t[-1].ime, t[-1].prezime) == ("", "Ćosić")
+    with pytest.raises(IndexError):
+        t[3]
+
+
+def test_izmjena_brisanje_i_sazimanje():
+    t = TablicaUcenika()
+    ocekivano = []
+    for i in range(200):
+        t.append(U(f"Ime{i}", f"Prezime{i}", f"{i % 4 + 1}a"))
+        ocekivano.append([f"Ime{i}", f"Prezime{i}", f"{i % 4 + 1}a"])
+    # dovoljno izmjena da se spremnik sažme (više od 1 MiB smeća)
+    for k in range(3000):
+        i = k % 200
+        t[i].prezime = f"Novo{k}" * 60
+        t[i].razred = "1c"
+        ocekivano[i][1:] = [f"Novo{k}" * 60, "1c"]
+    for i in (150, 0, 10):
+        del t[i]
+        del ocekivano[i]
+    assert retci(t) == [tuple(r) for r in ocekivano]
+    assert t._smece < len(t._spremnik)
+
+
+def test_kopija_je_neovisna():
+    t = TablicaUcenika()
+    t.append(U("Ana", "Horvat", "4a"))
+    k = t.kopija()
+    t[0].ime = "Iva"
+    t.append(U("Luka", "Babić", "4b"))
+    assert retci(k) == [("Ana", "Horvat", "4a")]
+
+
+def test_predugo_ime_ne_mijenja_tablicu():
+    t = TablicaUcenika()
+    t.append(U("Ana", "Horvat", "4a"))
+    with pytest.raises(ValueError):
+        t.append(U("x" * 70000, "Babić", "4b"))
+    with pytest.raises(ValueError):
+        t[0].prezime = "y" * 70000
+    t.append(U("Luka", "Babić", "4b"))
+    assert retci(t) == [("Ana", "Horvat", "4a"), ("Luka", "Babić", "4b")]
+
+
+def test_izmijeni_je_sve_ili_nista():
+    t = TablicaUcenika()
+    t.extend([U("Ana", "Horvat", "4a"), U("Ivo", "Babić", "4b")])
+    for polja in (("Iva", "x" * 70000, "1c"), ("y" * 70000, "Marić", "1c")):
+        with pytest.raises(ValueError):
+            t.izmijeni(1, *polja)
+        assert retci(t) == [("Ana", "Horvat", "4a"), ("Ivo", "Babić", "4b")]
+    t.izmijeni(-1, "Iva", "Marić", "1c")
+    t[0].prezime = "Hodak"
+    t[0].ime = "Željka"
+    assert retci(t) == [("Željka", "Hodak", "4a"), ("Iva", "Marić", "1c")]
+    with pytest.raises(IndexError):
+        t.izmijeni(2, "A", "B", "C")